@@ -5,16 +5,14 @@ from sklearn.metrics import accuracy_score
 import joblib
 import numpy as np
 import matplotlib.pyplot as plt
+from dataset import load_dataset, FEATURE_NAMES
 
-# Load your dataset
-df = pd.read_csv('Exoplanets Info - Exoplanet_Data_Sorted_by_ESI_forAI.csv')  # Replace with your dataset path
+# Load the preprocessed dataset (parsed once, then served from a cached snapshot)
+dataset = load_dataset()
 
-df= df.fillna(0)
-
-# Define your feature columns and target column
-features = ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter', 'Magnitude']
-X = df[features]  # Feature set
-y = df['Explore']  # Target label (0 or 1 for explore)
+# Feature columns and target column are defined in dataset.py
+X = dataset.frame()  # Feature set
+y = dataset.target()  # Target label (0 or 1 for explore)
 
 
 # Split the dataset into training and test sets (80% train, 20% test)
@@ -27,6 +25,8 @@ print(f"Test set size: {X_test.shape[0]} samples")
 # Train a Random Forest model
 model = RandomForestClassifier(n_estimators=100, random_state=42)
 model.fit(X_train, y_train)
+# Saved with the model so the web app fills missing inputs the same way (see dataset.py)
+model.fill_values_ = dataset.fill_values
 
 # Make predictions on the test set
 y_pred = model.predict(X_test)
@@ -42,7 +42,7 @@ joblib.dump(model, 'exoplanet_explore_model.pkl')
 model = joblib.load('exoplanet_explore_model.pkl')
 
 # Define the feature names (these should match the features used during training)
-feature_names = ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter', 'Magnitude']
+feature_names = FEATURE_NAMES
 
 # Get the feature importances from the trained model
 importances = model.feature_importances_
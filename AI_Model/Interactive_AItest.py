@@ -1,37 +1,29 @@
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import joblib
+import os
+import sys
+from dataset import FEATURE_NAMES
+from predict import MODEL_PATH, model_is_current, train_model, load_predictor, predict_rows
 
-# Step 1: Load your dataset (replace with the correct dataset path)
-df = pd.read_csv('Exoplanets Info - Exoplanet_Data_Sorted_by_ESI_forAI.csv')
+# The prediction cache lives with the web app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'WebApp-Elements'))
+from prediction_cache import PredictionCache, feature_key  # noqa: E402
 
-# Step 2: Define the logic to populate the 'Explore' column
-# Example rule: if ESI >= 0.9, the exoplanet is a good candidate for exploration
-df['Explore'] = df['ESI'].apply(lambda x: 1 if x >= 0.9 else 0)
+feature_names = FEATURE_NAMES
 
-# Step 3: Define your feature columns (now including 'Incline Angle(deg)')
-feature_names = ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter', 'Magnitude', 'Distance', 'Incline Angle(deg)']
-X = df[feature_names]  # Feature set
-y = df['Explore']  # Target label (0 or 1 for explore)
+# Steps 1-7: load the dataset, train a Random Forest on 80% of it and save it (see predict.py),
+# only when there is no saved model at least as new as the dataset
+if model_is_current(MODEL_PATH):
+    print(f"Using the trained model in {MODEL_PATH}")
+else:
+    print(f"Trained {MODEL_PATH} (test accuracy {train_model(MODEL_PATH):.3f})")
 
-# Step 4: Handle missing values by filling NaN with the mean of each column
-X.fillna(X.mean(), inplace=True)
+# Step 8: Load the compiled trees (.npz); no sklearn needed, and single predictions
+# skip sklearn's per-call overhead
+engine = load_predictor(MODEL_PATH)
 
-# Step 5: Split the dataset into training (80%) and testing (20%)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Step 6: Train a Random Forest model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Step 7: Save the trained model for later use
-joblib.dump(model, 'exoplanet_explore_model.pkl')
-
-# Step 8: Load the trained model (if needed)
-model = joblib.load('exoplanet_explore_model.pkl')
+# Repeat predictions for the same (rounded) inputs are answered from the cache
+prediction_cache = PredictionCache()
+model_version = str(os.path.getmtime(MODEL_PATH))
 
 # Step 9: Recommendations for input ranges
 recommendations = {
@@ -55,11 +47,15 @@ def get_user_input_and_predict():
     for feature in feature_names:
         user_data[feature] = float(input(f"Enter value for {feature} (Recommended range {recommendations[feature]}): "))
 
-    # Convert user input into a DataFrame for model prediction
-    user_input_df = pd.DataFrame([user_data])
+    # One row of features in the model's order, for the compiled trees
+    row = np.array([[user_data[name] for name in engine.feature_names]], dtype=np.float64)
 
-    # Make a prediction using the trained model
-    prediction = model.predict(user_input_df)
+    # Make a prediction using the trained model, unless these inputs were already scored
+    key = feature_key(user_data, engine.feature_names, model_version)
+    prediction = prediction_cache.get(key)
+    if prediction is None:
+        prediction = predict_rows(engine, row)[0][0]
+        prediction_cache.put(key, prediction)
 
     # Output the result
     if prediction == 1:
@@ -68,4 +64,10 @@ def get_user_input_and_predict():
         print("\nPrediction: Do not explore this exoplanet.")
 
 # Step 11: Run the function to take user input and make predictions
-get_user_input_and_predict()
+while True:
+    get_user_input_and_predict()
+    if input("\nPredict another exoplanet? (y/n): ").strip().lower() != 'y':
+        break
+
+stats = prediction_cache.stats()
+print(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses")
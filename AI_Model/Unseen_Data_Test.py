@@ -1,8 +1,8 @@
 import pandas as pd
-import joblib
+from forest_engine import load_forest
 
-# Load the trained model
-model = joblib.load('exoplanet_explore_model.pkl')
+# Load the trained model as a compiled forest (no sklearn call per prediction)
+model = load_forest('exoplanet_explore_model.pkl')
 
 # Unseen data (replace this with actual unseen data)
 # Ensure that this data has the same feature columns as the data you trained the model on.
@@ -10,11 +10,13 @@ unseen_data = pd.DataFrame({
     'ESI': [1, 0.65, 0.90],  # Replace with actual data
     'Mass (Compared to Jupiter)': [1.1, 0.9, 0.5],
     'Radius compared to Jupiter': [1.2, 0.8, 0.9],
-    'Magnitude': [12.1, 13.5, 11.7]
+    'Magnitude': [12.1, 13.5, 11.7],
+    'Distance': [12.5, 39.6, 101.4],
+    'Incline Angle(deg)': [89.8, 89.7, 89.9]
 })
 
 # Make predictions using the trained model
-predictions = model.predict(unseen_data)
+predictions = model.predict(unseen_data[model.feature_names].to_numpy())
 
 # Print the predictions (1 = Explore, 0 = Not Explore)
 for i, pred in enumerate(predictions):
@@ -0,0 +1,59 @@
+"""
+Benchmark: sklearn's model.predict versus the compiled NumPy forest,
+for one row (as the web form and CLI predict) and for 100k rows.
+Also checks that both give identical predictions.
+
+    python bench_forest_engine.py [--model exoplanet_explore_model.pkl] [--rows 100000]
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from dataset import load_dataset
+from forest_engine import compile_forest
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default='exoplanet_explore_model.pkl')
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    start = time.perf_counter()
+    engine = compile_forest(model)
+    print(f"compile: {(time.perf_counter() - start) * 1000:.1f} ms, {len(engine.feature):,} nodes in {len(engine.roots)} trees")
+
+    # Resample the real dataset (with jitter) to get a large realistic batch
+    dataset = load_dataset()
+    columns = [dataset.feature_names.index(name) for name in engine.feature_names]
+    base = np.asarray(dataset.X)[:, columns]
+    rng = np.random.default_rng(0)
+    X = base[rng.integers(0, len(base), args.rows)] * rng.normal(1, 0.05, (args.rows, base.shape[1]))
+    frame = pd.DataFrame(X, columns=engine.feature_names)
+
+    assert np.array_equal(model.predict(frame), engine.predict(X)), 'predictions differ'
+    print(f"identical predictions on {args.rows:,} rows")
+
+    one_frame = frame.iloc[:1]
+    one_row = X[:1]
+    print(f"1 row:    sklearn {best_of(lambda: model.predict(pd.DataFrame(one_frame)), 50):8.3f} ms   "
+          f"compiled {best_of(lambda: engine.predict(one_row), 50):8.3f} ms")
+    print(f"{args.rows:,} rows: sklearn {best_of(lambda: model.predict(frame), 3):8.1f} ms   "
+          f"compiled {best_of(lambda: engine.predict(X), 3):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: wall-clock time of one prediction from the command line, each
+run in a fresh interpreter with a model in a temporary directory.
+
+  1. no saved model: predict.py trains and saves it first (what
+     Interactive_AItest.py used to do on every run)
+  2. current .pkl, no compiled .npz yet: unpickled once and exported
+  3. current .pkl and .npz: predict only, sklearn and pandas never imported
+
+Then the slowest top-level imports of case 3, from python -X importtime.
+
+    python bench_predict.py [--runs 3] [--top 8]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from forest_engine import compiled_path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLANET = ['--esi', '0.95', '--mass', '0.003', '--radius', '0.109', '--magnitude', '15.1',
+          '--distance', '12.5', '--inclination', '89']
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def predict(model_path, *flags):
+    """Seconds for one predict.py run."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(HERE, 'predict.py'), '--model', model_path, *PLANET, *flags],
+                   cwd=HERE, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def slowest_imports(model_path, top):
+    """(cumulative seconds, module) for the slowest top-level imports of a predict-only run."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(HERE, 'predict.py'),
+                          '--model', model_path, '--no-train', *PLANET],
+                         cwd=HERE, check=True, capture_output=True, text=True).stderr
+    modules = []
+    for line in err.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and not match.group(3):
+            modules.append((int(match.group(2)) / 1e6, match.group(4)))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per case (median reported)')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'exoplanet_explore_model.pkl')
+        npz_path = compiled_path(model_path)
+
+        def remove(*paths):
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        cases = [
+            ('train, then predict', lambda: remove(model_path, npz_path), ()),
+            ('current .pkl, export .npz', lambda: remove(npz_path), ('--no-train',)),
+            ('current .pkl and .npz', lambda: None, ('--no-train',)),
+        ]
+        print(f"median of {args.runs} runs")
+        for label, prepare, flags in cases:
+            times = []
+            for _ in range(args.runs):
+                prepare()
+                times.append(predict(model_path, *flags))
+            print(f"  {label:28s} {np.median(times) * 1000:8.0f} ms")
+
+        print("  slowest top-level imports, predict only (python -X importtime, cumulative):")
+        for seconds, module in slowest_imports(model_path, args.top):
+            print(f"    {seconds * 1000:8.1f} ms  {module}")
+
+
+if __name__ == '__main__':
+    main()
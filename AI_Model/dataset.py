@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+AI_MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The scripts were written against the _forAI export; fall back to the copy checked into the repo
+DEFAULT_SOURCES = [
+    os.path.join(AI_MODEL_DIR, 'Exoplanets Info - Exoplanet_Data_Sorted_by_ESI_forAI.csv'),
+    os.path.join(AI_MODEL_DIR, 'Exoplanets Info - Exoplanet_Data_Sorted_by_ESI.csv'),
+]
+CACHE_DIR = os.path.join(AI_MODEL_DIR, '.dataset_cache')
+
+# Feature columns every training and evaluation script uses, in model order
+FEATURE_NAMES = ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter', 'Magnitude', 'Distance', 'Incline Angle(deg)']
+TARGET = 'Explore'
+# Rule used when the CSV has no Explore column: ESI >= 0.9 is a good candidate for exploration
+EXPLORE_ESI_THRESHOLD = 0.9
+
+# Bump when the preprocessing below changes so old snapshots are rebuilt
+PREPROCESSING_VERSION = 1
+
+
+def default_source():
+    for path in DEFAULT_SOURCES:
+        if os.path.exists(path):
+            return path
+    return DEFAULT_SOURCES[0]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f'preprocessing-v{PREPROCESSING_VERSION}'.encode())
+    return digest.hexdigest()[:16]
+
+
+class Dataset:
+    """
+    Preprocessed training data loaded from a columnar snapshot.
+    X (rows x FEATURE_NAMES) and y are memory-mapped .npy arrays;
+    meta records the source file, its hash and how it was preprocessed.
+    """
+
+    def __init__(self, X, y, meta):
+        self.X = X
+        self.y = y
+        self.meta = meta
+        self.feature_names = meta['feature_names']
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def fill_values(self):
+        """{feature: value} used to fill missing inputs; training scripts save it on the model as fill_values_."""
+        return dict(self.meta['preprocessing']['fill_values'])
+
+    def frame(self):
+        """Features as a DataFrame, so sklearn records feature_names_in_ for the web app."""
+        import pandas as pd
+        return pd.DataFrame(self.X, columns=self.feature_names)
+
+    def target(self):
+        import pandas as pd
+        return pd.Series(self.y, name=TARGET)
+
+
+def preprocess(df):
+    """
+    The one place raw CSV rows become model inputs:
+    Explore is taken from the file (missing -> 0) or derived from ESI,
+    and missing feature values are filled with the column mean.
+    """
+    if TARGET in df:
+        y = df[TARGET].fillna(0).astype(np.int64).to_numpy()
+        target_source = 'column'
+    else:
+        y = np.where(df['ESI'] >= EXPLORE_ESI_THRESHOLD, 1, 0).astype(np.int64)
+        target_source = f'ESI >= {EXPLORE_ESI_THRESHOLD}'
+
+    features = df[FEATURE_NAMES].astype(np.float64)
+    means = features.mean()
+    X = features.fillna(means).to_numpy()
+
+    preprocessing = {
+        'target': target_source,
+        'imputation': 'column mean',
+        'fill_values': {name: float(value) for name, value in means.items()},
+    }
+    return np.ascontiguousarray(X), y, preprocessing
+
+
+def build_snapshot(source, snapshot_dir):
+    # pandas is only needed to parse the CSV; loading a snapshot is NumPy only
+    import pandas as pd
+    df = pd.read_csv(source)
+    X, y, preprocessing = preprocess(df)
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    np.save(os.path.join(snapshot_dir, 'X.npy'), X)
+    np.save(os.path.join(snapshot_dir, 'y.npy'), y)
+    meta = {
+        'source': os.path.abspath(source),
+        'hash': os.path.basename(snapshot_dir),
+        'rows': int(len(y)),
+        'feature_names': FEATURE_NAMES,
+        'preprocessing': preprocessing,
+        'preprocessing_version': PREPROCESSING_VERSION,
+    }
+    # meta.json is written last, so a snapshot without it is incomplete
+    with open(os.path.join(snapshot_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_dataset(source=None, cache_dir=CACHE_DIR):
+    """
+    Load the preprocessed dataset, parsing the CSV only the first time a
+    given file (by content hash) is seen.
+    """
+    source = source or default_source()
+    snapshot_dir = os.path.join(cache_dir, file_hash(source))
+    meta_path = os.path.join(snapshot_dir, 'meta.json')
+
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    else:
+        meta = build_snapshot(source, snapshot_dir)
+
+    X = np.load(os.path.join(snapshot_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(snapshot_dir, 'y.npy'), mmap_mode='r')
+    return Dataset(X, y, meta)
@@ -0,0 +1,179 @@
+"""
+Flattened RandomForest inference in pure NumPy.
+
+compile_forest() packs every tree of a fitted sklearn RandomForestClassifier
+into shared arrays (feature, threshold, children, leaf class probabilities);
+CompiledForest walks rows through the trees one level per NumPy step and
+gives the same predictions as model.predict. It removes sklearn's per-call
+overhead for small batches (the web form and CLI score one row at a time);
+for very large batches sklearn's compiled traversal is still faster, see
+bench_forest_engine.py.
+
+The training fill values a model was fitted with (model.fill_values_, see
+dataset.py) are packed too, so callers can impute missing inputs the way
+the training data was (CompiledForest.impute).
+
+    python forest_engine.py [exoplanet_explore_model.pkl]   # writes exoplanet_explore_model.npz
+"""
+import os
+import sys
+
+import numpy as np
+
+LEAF = -1
+# Above this many rows, evaluate tree by tree instead of all trees at once
+BY_TREE_MIN_ROWS = 512
+
+
+class CompiledForest:
+    """Packed forest arrays plus a batched evaluator."""
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, max_depth,
+                 classes, feature_names, fill_values=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        self.feature_names = [str(name) for name in feature_names]
+        # Per-feature training fill value (NaN = none recorded); None for models saved without them
+        self.fill_values = None if fill_values is None else np.asarray(fill_values, dtype=np.float64)
+
+    def impute(self, X):
+        """X with missing values replaced by the training fill values (X itself if there is nothing to fill)."""
+        X = np.asarray(X, dtype=np.float64)
+        if self.fill_values is None:
+            return X
+        missing = np.isnan(X) & ~np.isnan(self.fill_values)
+        if not missing.any():
+            return X
+        return np.where(missing, self.fill_values, X)
+
+    def leaves(self, X):
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)."""
+        # sklearn compares float32 inputs against float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            internal = feature != LEAF
+            if not internal.any():
+                break
+            x = X[rows, np.where(internal, feature, 0)]
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+        return node
+
+    def _proba_by_tree(self, X):
+        """
+        Large batches: walk one tree at a time over all rows, dropping rows
+        as they reach a leaf, which touches far fewer elements than leaves().
+        """
+        X_T = np.ascontiguousarray(np.asarray(X, dtype=np.float32).T)
+        n_rows = X_T.shape[1]
+        proba = np.zeros((n_rows, self.value.shape[1]))
+        all_rows = np.arange(n_rows)
+        for root in self.roots:
+            node = np.full(n_rows, root, dtype=np.int64)
+            active = all_rows if self.feature[root] != LEAF else all_rows[:0]
+            while active.size:
+                current = node[active]
+                x = X_T[self.feature[current], active]
+                go_left = np.where(np.isnan(x), self.missing_left[current], x <= self.threshold[current])
+                current = np.where(go_left, self.left[current], self.right[current])
+                node[active] = current
+                active = active[self.feature[current] != LEAF]
+            proba += self.value[node]
+        return proba / len(self.roots)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if len(X) > BY_TREE_MIN_ROWS:
+            return self._proba_by_tree(X)
+        leaves = self.leaves(X)
+        # Sum one class column at a time rather than materializing (rows, trees, classes)
+        return np.stack([self.value[:, c][leaves].mean(axis=1) for c in range(self.value.shape[1])], axis=1)
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path):
+        extra = {} if self.fill_values is None else {'fill_values': self.fill_values}
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 missing_left=self.missing_left, value=self.value, roots=self.roots,
+                 max_depth=self.max_depth, classes=self.classes, feature_names=np.array(self.feature_names),
+                 **extra)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        arrays = np.load(path, mmap_mode=mmap_mode)
+        return cls(**{key: arrays[key] for key in arrays.files})
+
+
+def compile_forest(model):
+    """Pack a fitted RandomForestClassifier's trees into a CompiledForest."""
+    features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        features.append(np.where(is_leaf, LEAF, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        # Child indices become global; leaves point at themselves
+        own = np.arange(tree.node_count) + offset
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset).astype(np.int32))
+        missing.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=bool))
+        # Per-leaf class probabilities, as DecisionTreeClassifier.predict_proba computes them
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        values.append(np.divide(value, totals, out=np.zeros_like(value), where=totals > 0))
+        max_depth = max(max_depth, tree.max_depth)
+        offset += tree.node_count
+
+    feature_names = getattr(model, 'feature_names_in_', [f'x{i}' for i in range(model.n_features_in_)])
+    fills = getattr(model, 'fill_values_', None)
+    return CompiledForest(
+        feature=np.concatenate(features), threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts), right=np.concatenate(rights),
+        missing_left=np.concatenate(missing), value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.int32), max_depth=max_depth,
+        classes=np.asarray(model.classes_), feature_names=feature_names,
+        fill_values=None if fills is None else [fills.get(str(name), np.nan) for name in feature_names],
+    )
+
+
+def compiled_path(model_path):
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def export_forest(model_path, output_path=None):
+    """Compile a .pkl model and write the packed arrays next to it."""
+    import joblib
+    output_path = output_path or compiled_path(model_path)
+    compile_forest(joblib.load(model_path)).save(output_path)
+    return output_path
+
+
+def load_forest(model_path='exoplanet_explore_model.pkl'):
+    """The compiled .npz when it is up to date, otherwise compile the .pkl in memory."""
+    npz_path = compiled_path(model_path)
+    if os.path.exists(npz_path) and (not os.path.exists(model_path)
+                                     or os.path.getmtime(npz_path) >= os.path.getmtime(model_path)):
+        return CompiledForest.load(npz_path)
+    import joblib
+    return compile_forest(joblib.load(model_path))
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else 'exoplanet_explore_model.pkl'
+    print(f"Wrote {export_forest(source)}")
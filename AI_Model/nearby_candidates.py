@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# The spatial index and coordinate transform live with the web app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'WebApp-Elements'))
+from coordinates import galactic_to_cartesian  # noqa: E402
+from spatial import PlanetIndex  # noqa: E402
+
+DATASET = 'Exoplanets Info - Exoplanet_Data_Sorted_by_ESI.csv'
+
+
+# Build the spatial index over the training catalog (ids are 1-based row numbers)
+def build_index(df):
+    planets = pd.DataFrame({
+        'id': np.arange(1, len(df) + 1),
+        'ESI': df['ESI'].to_numpy(),
+        'Explore': df['Explore'].to_numpy() if 'Explore' in df else np.zeros(len(df), dtype=int),
+    })
+    planets['x'], planets['y'], planets['z'] = galactic_to_cartesian(df['Longitude'], df['Latitude'], df['Distance'])
+    index = PlanetIndex()
+    index.add_rows(planets)
+    index.all.rebuild()
+    index.habitable.rebuild()
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spatial queries over the exoplanet catalog')
+    parser.add_argument('--csv', default=DATASET)
+    parser.add_argument('--planet', help='Search around this planet instead of Earth')
+    parser.add_argument('--radius', type=float, help='List planets within this many light-years')
+    parser.add_argument('--k', type=int, default=5, help='Number of nearest habitable candidates')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    index = build_index(df)
+    names = df['Exoplanet'].tolist()
+
+    origin = None
+    if args.planet:
+        matches = np.flatnonzero(df['Exoplanet'] == args.planet)
+        if not len(matches):
+            sys.exit(f'Unknown planet: {args.planet}')
+        origin = int(matches[0]) + 1
+
+    where = args.planet or 'Earth'
+    if args.radius is not None:
+        ids, dists = index.within(args.radius, origin)
+        print(f"\nPlanets within {args.radius} ly of {where}:")
+        for i, d in zip(ids, dists):
+            print(f"  {names[i - 1]}: {d:.1f} ly")
+
+    ids, dists = index.nearest_habitable(args.k, origin)
+    print(f"\n{args.k} nearest habitable candidates to {where}:")
+    for i, d in zip(ids, dists):
+        print(f"  {names[i - 1]}: {d:.1f} ly")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Predict-only CLI for the explore model. When a current model is saved (an
+exoplanet_explore_model.pkl at least as new as the training CSV) nothing is
+trained and sklearn is never imported: predictions come from the compiled
+forest (forest_engine.py) in the .npz next to the .pkl, written on first use.
+
+    python predict.py --esi 0.95 --mass 0.003 --radius 0.109 --magnitude 15.1 --distance 12.5 --inclination 89
+    python predict.py planets.csv        # adds Predicted Explore and its probability, CSV on stdout
+    python predict.py                    # prompts for each feature
+
+A missing or stale model is trained first, as Interactive_AItest.py does,
+unless --no-train is given.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from dataset import FEATURE_NAMES, default_source
+from forest_engine import compiled_path, export_forest, load_forest
+
+MODEL_PATH = 'exoplanet_explore_model.pkl'
+
+# Command-line option for each model feature
+FEATURE_OPTIONS = {
+    'ESI': 'esi',
+    'Mass (Compared to Jupiter)': 'mass',
+    'Radius compared to Jupiter': 'radius',
+    'Magnitude': 'magnitude',
+    'Distance': 'distance',
+    'Incline Angle(deg)': 'inclination',
+}
+
+
+def model_is_current(model_path=MODEL_PATH, source=None):
+    """True if the .pkl exists and is at least as new as the training CSV."""
+    source = source or default_source()
+    if not os.path.exists(model_path):
+        return False
+    return not os.path.exists(source) or os.path.getmtime(model_path) >= os.path.getmtime(source)
+
+
+def train_model(model_path=MODEL_PATH):
+    """Train and save the forest the way Interactive_AItest.py always has; returns its test accuracy."""
+    # sklearn is only imported when a model actually has to be trained
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from dataset import load_dataset
+
+    dataset = load_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(dataset.frame(), dataset.target(),
+                                                        test_size=0.2, random_state=42)
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+    model.fill_values_ = dataset.fill_values  # see forest_engine.CompiledForest.impute
+    joblib.dump(model, model_path)
+    export_forest(model_path)
+    return accuracy_score(y_test, model.predict(X_test))
+
+
+def load_predictor(model_path=MODEL_PATH, train=True):
+    """Compiled forest for the current model, training one first if it is missing or stale."""
+    if not model_is_current(model_path):
+        if not train:
+            sys.exit(f'{model_path} is missing or older than the dataset; run without --no-train to train it')
+        print(f"Training {model_path} (test accuracy {train_model(model_path):.3f})", file=sys.stderr)
+    npz_path = compiled_path(model_path)
+    if not os.path.exists(npz_path) or os.path.getmtime(npz_path) < os.path.getmtime(model_path):
+        export_forest(model_path)  # unpickles the .pkl once; later runs load the .npz
+    return load_forest(model_path)
+
+
+def predict_rows(engine, X):
+    """(Explore flags, probability of Explore = 1) for rows of features in the engine's order."""
+    proba = engine.predict_proba(engine.impute(X))
+    classes = list(engine.classes)
+    explore = engine.classes[np.argmax(proba, axis=1)]
+    return explore, proba[:, classes.index(1)] if 1 in classes else np.zeros(len(X))
+
+
+def predict_csv(engine, path):
+    import pandas as pd
+    df = pd.read_csv(path)
+    missing = [name for name in engine.feature_names if name not in df]
+    if missing:
+        sys.exit(f'{path} has no column(s) {missing}')
+    df['Predicted Explore'], df['Explore probability'] = predict_rows(engine, df[engine.feature_names].to_numpy(dtype=np.float64))
+    df.to_csv(sys.stdout, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Predict Explore for exoplanets with the saved model')
+    parser.add_argument('csv', nargs='?', help='CSV with the feature columns; omit to give one planet')
+    for name, option in FEATURE_OPTIONS.items():
+        parser.add_argument(f'--{option}', type=float, help=name)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--no-train', action='store_true', help='Fail instead of training a missing or stale model')
+    args = parser.parse_args()
+
+    engine = load_predictor(args.model, train=not args.no_train)
+    if args.csv:
+        predict_csv(engine, args.csv)
+        return
+
+    features = {}
+    for name in FEATURE_NAMES:
+        value = getattr(args, FEATURE_OPTIONS[name])
+        features[name] = value if value is not None else float(input(f"Enter value for {name}: "))
+    explore, probability = predict_rows(engine, np.array([[features[name] for name in engine.feature_names]]))
+    verdict = 'Explore this exoplanet.' if explore[0] == 1 else 'Do not explore this exoplanet.'
+    print(f"Prediction: {verdict} (probability {probability[0]:.2f})")
+
+
+if __name__ == '__main__':
+    main()
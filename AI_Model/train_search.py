@@ -0,0 +1,143 @@
+"""
+Cross-validated hyperparameter and feature-subset search for the explore model.
+
+Every (forest parameters, feature subset) configuration is scored fold by fold
+in parallel across all cores. After each fold the weaker configurations are
+dropped (successive halving), so bad configurations stop early. The winner is
+refit on the full dataset and written with its metrics.
+
+    python train_search.py [--n-jobs -1] [--folds 5] [--eta 2]
+"""
+import argparse
+import itertools
+import json
+import math
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+from dataset import load_dataset, FEATURE_NAMES
+
+MODEL_PATH = 'exoplanet_explore_model.pkl'
+METRICS_PATH = 'exoplanet_explore_model_metrics.json'
+
+PARAM_GRID = {
+    'n_estimators': [100, 300],
+    'max_depth': [None, 4, 8],
+    'min_samples_leaf': [1, 3],
+    'max_features': ['sqrt', None],
+}
+# ESI is always kept; the other features are searched over
+FEATURE_SUBSETS = [
+    FEATURE_NAMES,
+    ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter', 'Magnitude'],
+    ['ESI', 'Mass (Compared to Jupiter)', 'Radius compared to Jupiter'],
+    ['ESI', 'Distance', 'Magnitude'],
+]
+
+
+def configurations():
+    keys = list(PARAM_GRID)
+    for values in itertools.product(*(PARAM_GRID[key] for key in keys)):
+        for features in FEATURE_SUBSETS:
+            yield {'params': dict(zip(keys, values)), 'features': features}
+
+
+def fit_fold(config_id, config, fold, train_idx, test_idx, X, y, random_state):
+    """Train and score one configuration on one fold; runs in a worker process."""
+    columns = [FEATURE_NAMES.index(name) for name in config['features']]
+    start = time.perf_counter()
+    # One core per forest: the parallelism is across configurations and folds
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **config['params'])
+    model.fit(X[np.ix_(train_idx, columns)], y[train_idx])
+    score = accuracy_score(y[test_idx], model.predict(X[np.ix_(test_idx, columns)]))
+    return config_id, fold, score, time.perf_counter() - start
+
+
+def search(X, y, n_jobs=-1, n_folds=5, eta=2, random_state=42):
+    """Successive-halving search; returns (results per configuration, winning config id)."""
+    # Every fold needs at least one example of each class
+    n_folds = max(2, min(n_folds, int(np.bincount(y).min())))
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X, y))
+
+    configs = list(configurations())
+    results = {i: {'config': c, 'scores': [], 'fold_seconds': []} for i, c in enumerate(configs)}
+    alive = list(results)
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for fold, (train_idx, test_idx) in enumerate(folds):
+            rung_start = time.perf_counter()
+            outcomes = parallel(
+                delayed(fit_fold)(i, results[i]['config'], fold, train_idx, test_idx, X, y, random_state)
+                for i in alive
+            )
+            for config_id, _, score, seconds in outcomes:
+                results[config_id]['scores'].append(score)
+                results[config_id]['fold_seconds'].append(seconds)
+
+            print(f"fold {fold + 1}/{n_folds}: {len(alive)} configurations "
+                  f"in {time.perf_counter() - rung_start:.2f}s wall-clock")
+
+            # Keep the best 1/eta (by mean score so far) for the next fold
+            if fold < n_folds - 1:
+                alive.sort(key=lambda i: np.mean(results[i]['scores']), reverse=True)
+                alive = alive[:max(1, math.ceil(len(alive) / eta))]
+
+    best = max(alive, key=lambda i: (np.mean(results[i]['scores']), -np.sum(results[i]['fold_seconds'])))
+    return results, best, n_folds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validated search for the explore model')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Worker processes (-1 = all cores)')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--eta', type=float, default=2, help='Keep 1/eta of configurations after each fold')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--metrics', default=METRICS_PATH)
+    args = parser.parse_args()
+
+    dataset = load_dataset()
+    X = np.asarray(dataset.X)
+    y = np.asarray(dataset.y)
+
+    start = time.perf_counter()
+    results, best, n_folds = search(X, y, n_jobs=args.n_jobs, n_folds=args.folds, eta=args.eta)
+    search_seconds = time.perf_counter() - start
+    winner = results[best]
+
+    # Refit the winner on all rows; a DataFrame keeps feature_names_in_ for the web app
+    model = RandomForestClassifier(random_state=42, n_jobs=-1, **winner['config']['params'])
+    model.fit(dataset.frame()[winner['config']['features']], dataset.target())
+    # The training fill values travel with the model, so every predictor imputes the same way
+    model.fill_values_ = dataset.fill_values
+    joblib.dump(model, args.model)
+
+    metrics = {
+        'params': winner['config']['params'],
+        'features': winner['config']['features'],
+        'cv_accuracy_mean': float(np.mean(winner['scores'])),
+        'cv_accuracy_std': float(np.std(winner['scores'])),
+        'fold_accuracy': winner['scores'],
+        'fold_seconds': winner['fold_seconds'],
+        'folds': n_folds,
+        'configurations_tried': len(results),
+        'search_seconds': search_seconds,
+        'dataset': {'source': dataset.meta['source'], 'hash': dataset.meta['hash'], 'rows': len(dataset)},
+    }
+    with open(args.metrics, 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    print(f"\nSearched {len(results)} configurations in {search_seconds:.2f}s")
+    print(f"Best: {winner['config']['params']} on {winner['config']['features']}")
+    print(f"CV accuracy: {metrics['cv_accuracy_mean'] * 100:.2f}% (+/- {metrics['cv_accuracy_std'] * 100:.2f}%)")
+    print(f"Per-fold seconds: {', '.join(f'{s:.2f}' for s in winner['fold_seconds'])}")
+    print(f"Saved {args.model} and {args.metrics}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,78 +1,48 @@
+import sys
+import time
+
+# dash imports IPython for its notebook support whenever it is installed, which
+# is about 0.4 s of a cold start. A server never needs it, so it is hidden
+# while dash loads, unless we are inside a notebook (IPython already loaded).
+_hide_ipython = 'IPython' not in sys.modules
+if _hide_ipython:
+    sys.modules['IPython'] = None
 import dash
-from dash.dependencies import Output, Input, State
-from dash import dcc, html
+from dash.dependencies import Output, Input, State, ClientsideFunction
+from dash import dcc, html, ctx, no_update, Patch
 from dash import dash_table
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
-import sqlite3
+if _hide_ipython:
+    del sys.modules['IPython']
+from flask import jsonify, request, Response, g
+# numpy and plotly.graph_objects (and the modules built on them) are imported
+# in the callbacks that use them; the snapshot's catalog still needs numpy at startup
+from model_server import get_model, export_compiled_model
+from prediction_cache import get_prediction_cache
+from submission_queue import get_submission_queue
+from store import get_store, EXOPLANET_COLUMNS
+from frame_cache import get_frame_cache
+from table_query import build_where, build_order_by
+from labels import hover_customdata, HOVER_TEMPLATE
+from color_metrics import BUTTON_METRICS, DEFAULT_METRIC, METRICS, all_metric_values, metric_payload, metric_values, color_list, marker_style
+from transport import figure_column, typed_array, BINARY_TRANSPORT
+from views import CAMERA_PRESETS, PRESET_LABELS, DEFAULT_VIEW, TOGGLE_VIEWS
+from lod import level_of_detail, camera_from_relayout, LOD_POINT_BUDGET
+from shared_cache import get_shared_cache
+from metrics import timed, timer, observe, registry, start_log_dump
+from orbits import get_orbit_frame_cache, ORBIT_TICK_MS
+from startup_snapshot import load_snapshot, write_snapshot
 
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point for production servers (see serve.py)
+
+# Load the trained explore model once at startup; callbacks reuse it
+get_model()
+# Catalog and default figure from the last run (see startup_snapshot.py), if still current
+startup_snapshot = load_snapshot()
 
-# Machine learning model function
-def should_explore_ml_model(exoplanet_data):
-    """
-    This function represents the machine learning model
-    that will determine whether the exoplanet should be explored.
-    It should return 1 (explore) or 0 (don't explore).
-    """
-    # Example decision logic based on dummy ML model
-    if (exoplanet_data['ESI'] >= 0.93 and 
-        0.1 <= exoplanet_data['Mass'] <= 0.5 and 
-        0.5 <= exoplanet_data['Radius'] <= 0.8 and
-        exoplanet_data['Magnitude'] < 15):
-        return 1  # Explore
-    else:
-        return 0  # Not Explore
-
-# Connect to the SQLite database (or MySQL/Postgres)
-def connect_db():
-    conn = sqlite3.connect('exoplanet_data.db')  # Replace with your database
-    return conn
-
-# Function to create the table if it doesn't exist
+# Create the table if it doesn't exist (all database access goes through store.py)
 def create_exoplanet_table():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS exoplanets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        Magnitude REAL,
-        Distance REAL,
-        ESI REAL,
-        Radius REAL,
-        Mass REAL,
-        Inclination REAL,
-        Explore INTEGER
-    )''')
-    conn.commit()
-    conn.close()
-
-# Fetch exoplanet data from SQL
-def fetch_exoplanet_data():
-    conn = connect_db()
-    query = "SELECT * FROM exoplanets"
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
-
-# Insert new exoplanet into the SQL database
-def insert_exoplanet(exoplanet_data):
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO exoplanets (Magnitude, Distance, ESI, Radius, Mass, Inclination, Explore)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        exoplanet_data['Magnitude'],
-        exoplanet_data['Distance'],
-        exoplanet_data['ESI'],
-        exoplanet_data['Radius'],
-        exoplanet_data['Mass'],
-        exoplanet_data['Inclination'],
-        exoplanet_data['Explore']
-    ))
-    conn.commit()
-    conn.close()
+    get_store().create_table()
 
 # Layout for Dash app
 app.layout = html.Div(style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'center', 'width': '100%', 'height': '150vh'},
@@ -84,48 +54,125 @@ app.layout = html.Div(style={'display': 'flex', 'flexDirection': 'column', 'alig
             html.H4('Add New Exoplanet'),
             dcc.Input(id='input-magnitude', type='number', placeholder='Magnitude'),
             dcc.Input(id='input-distance', type='number', placeholder='Distance (ly)'),
-            dcc.Input(id='input-esi', type='number', placeholder='ESI'),
+            dcc.Input(id='input-esi', type='number', placeholder='ESI (blank = computed)'),
             dcc.Input(id='input-radius', type='number', placeholder='Radius (Compared to Jupiter)'),
             dcc.Input(id='input-mass', type='number', placeholder='Mass (Compared to Jupiter)'),
             dcc.Input(id='input-inclination', type='number', placeholder='Inclination Plane'),
+            dcc.Input(id='input-flux', type='number', placeholder='Stellar flux (Earth = 1, optional)'),
+            html.Div(id='esi-estimate'),  # ESI computed from radius, mass and flux (habitability.py)
             html.Button('Submit Exoplanet', id='submit-exoplanet', n_clicks=0),
-            html.Div(id='submission-status')  # Feedback message after submission
+            html.Div(id='submission-status'),  # Feedback message after submission
+            dcc.Store(id='submission-ticket'),  # Ticket of the submission being scored in the background
+            dcc.Interval(id='submission-poll', interval=250, disabled=True)
         ]),
         
         html.Button('Toggle View (God/Earth)', id='toggle-view'),
         html.Button('ESI', id='button-1'),
         html.Button('Orbital Period', id='button-2'),
         html.Button('Mass (Compared to Jupiter)', id='button-3'),
+        dcc.Dropdown(id='camera-preset', options=[{'label': label, 'value': name} for name, label in PRESET_LABELS.items()],
+                     value=DEFAULT_VIEW, clearable=False, style={'width': '200px'}),
         
         dcc.Graph(id='exoplanet-globe', style={'width': '100%', 'height': '100%'}, config={'displayModeBar': True}),
         
         dash_table.DataTable(
             id='exoplanet-table',
-            columns=[{"name": col, "id": col} for col in ['Magnitude', 'Distance', 'ESI', 'Radius', 'Mass', 'Inclination', 'Explore']],
+            columns=[{"name": col, "id": col, "type": "numeric"} for col in EXOPLANET_COLUMNS],
+            page_current=0,
             page_size=10,
+            # Paging, sorting and filtering run as SQL on the server, one page at a time
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[],
+            filter_action='custom',
+            filter_query='',
             style_table={'overflowX': 'auto'},
         ),
         
-        dcc.Interval(id='interval-component', interval=240*1000, n_intervals=0)
+        # Spatial queries around Earth or a chosen planet
+        html.Div([
+            html.H4('Nearby Planets'),
+            dcc.Input(id='nearby-origin', type='number', placeholder='Planet id (blank = Earth)'),
+            dcc.Input(id='nearby-radius', type='number', placeholder='Within (ly)'),
+            dcc.Input(id='nearby-k', type='number', placeholder='k nearest habitable'),
+            html.Button('Search', id='nearby-search', n_clicks=0),
+            html.Div(id='nearby-results')
+        ]),
+
+        # Best exploration candidates under the given limits (see ranking.py)
+        html.Div([
+            html.H4('Top Candidates'),
+            dcc.Input(id='rank-k', type='number', value=10, min=1, max=500, placeholder='How many'),
+            dcc.Input(id='rank-max-distance', type='number', placeholder='Max distance (ly)'),
+            dcc.Input(id='rank-max-magnitude', type='number', placeholder='Max magnitude'),
+            dcc.Input(id='rank-min-esi', type='number', placeholder='Min ESI'),
+            html.Button('Rank', id='rank-search', n_clicks=0),
+            dash_table.DataTable(
+                id='rank-table',
+                columns=[{"name": col, "id": col, "type": "numeric" if col != 'Name' else "text"}
+                         for col in ['rank', 'id', 'Name', 'score', 'probability', 'ESI', 'Distance', 'Magnitude']],
+                style_table={'overflowX': 'auto'},
+            ),
+        ]),
+
+        # Every planet around its own star, moved along its Kepler orbit (see orbits.py)
+        html.Div([
+            html.H4('Orbits'),
+            html.Button('Play Orbits', id='orbit-play', n_clicks=0),
+            dcc.Graph(id='orbit-view', style={'width': '100%', 'height': '600px'}),
+            dcc.Interval(id='orbit-interval', interval=ORBIT_TICK_MS, disabled=True),
+            dcc.Store(id='orbit-version'),  # Catalog version of the orbits this browser is playing
+        ], style={'width': '100%'}),
+        
+        dcc.Interval(id='interval-component', interval=240*1000, n_intervals=0),
+        dcc.Store(id='last-seen'),  # Highest exoplanet id and catalog generation this browser has received
+        # Everything below is used by the clientside callbacks in assets/globe.js
+        dcc.Store(id='metric-colors'),  # Colors of every metric for the points on screen
+        dcc.Store(id='color-metric', data=DEFAULT_METRIC),  # Metric the globe is colored by
+        dcc.Store(id='globe-config', data={'presets': CAMERA_PRESETS, 'toggle': TOGGLE_VIEWS, 'buttons': BUTTON_METRICS}),
     ]
 )
 
-# Callback to handle new exoplanet submission
+# Callback to handle new exoplanet submission.
+# The planet is queued for the background worker (scored and inserted in micro-batches);
+# the callback returns at once and the poll interval reports when it has been stored.
 @app.callback(
     Output('submission-status', 'children'),
+    Output('submission-ticket', 'data'),
+    Output('submission-poll', 'disabled'),
     Input('submit-exoplanet', 'n_clicks'),
+    Input('submission-poll', 'n_intervals'),
+    State('submission-ticket', 'data'),
     State('input-magnitude', 'value'),
     State('input-distance', 'value'),
     State('input-esi', 'value'),
     State('input-radius', 'value'),
     State('input-mass', 'value'),
-    State('input-inclination', 'value')
+    State('input-inclination', 'value'),
+    State('input-flux', 'value')
 )
-def handle_exoplanet_submission(n_clicks, magnitude, distance, esi, radius, mass, inclination):
+@timed('handle_exoplanet_submission')
+def handle_exoplanet_submission(n_clicks, n_polls, ticket, magnitude, distance, esi, radius, mass, inclination, flux):
+    if ctx.triggered_id == 'submission-poll':
+        status = get_submission_queue().status(ticket)
+        if status['state'] == 'queued':
+            return no_update, no_update, False
+        if status['state'] == 'done':
+            verdict = 'worth exploring' if status['Explore'] == 1 else 'not flagged for exploration'
+            return f'Exoplanet successfully submitted! ({verdict})', None, True
+        return f"Submission failed: {status.get('error', 'unknown ticket')}", None, True
+
     if n_clicks > 0:
         # Check that all fields are filled
-        if magnitude is None or distance is None or esi is None or radius is None or mass is None or inclination is None:
-            return 'Please fill in all fields before submitting.'
+        if magnitude is None or distance is None or radius is None or mass is None or inclination is None:
+            return 'Please fill in all fields before submitting.', no_update, no_update
+        # A blank ESI is computed from the physical parameters
+        computed = esi is None
+        if computed:
+            esi, _ = estimate_esi(radius, mass, flux)
+            if esi is None:
+                return 'ESI could not be computed from these values; please enter it.', no_update, no_update
         
         # Create exoplanet data dictionary
         exoplanet_data = {
@@ -137,67 +184,388 @@ def handle_exoplanet_submission(n_clicks, magnitude, distance, esi, radius, mass
             'Inclination': inclination
         }
         
-        # Pass data to the machine learning model
-        exoplanet_data['Explore'] = should_explore_ml_model(exoplanet_data)
-        
-        # Insert into the database
-        insert_exoplanet(exoplanet_data)
-        
-        return f'Exoplanet successfully submitted!'
+        # Scoring by the machine learning model and the insert happen on the worker
+        ticket = get_submission_queue().submit(exoplanet_data)
+        return f'Submitting exoplanet... (computed ESI {esi:.2f})' if computed else 'Submitting exoplanet...', ticket, False
+
+    return '', no_update, no_update  # No message initially
 
-    return ''  # No message initially
+# ESI and the formula used, from the form's radius and mass (Jupiter units) and optional flux
+def estimate_esi(radius, mass, flux=None):
+    from habitability import esi_scores, ESI_METHODS
+    scores = esi_scores([radius], [mass], None if flux is None else [flux])
+    method = int(scores['method'][0])
+    if method < 0:
+        return None, None
+    return round(float(scores['ESI'][0]), 2), ESI_METHODS[method]
 
-# Callback to update the table and graph
+# Callback to preview the ESI a blank ESI field would be submitted with
 @app.callback(
-    Output('exoplanet-globe', 'figure'),
-    Output('exoplanet-table', 'data'),
-    Input('interval-component', 'n_intervals'),
-    Input('toggle-view', 'n_clicks'),
-    Input('button-1', 'n_clicks'),
-    Input('button-2', 'n_clicks'),
-    Input('button-3', 'n_clicks')
+    Output('esi-estimate', 'children'),
+    Input('input-radius', 'value'),
+    Input('input-mass', 'value'),
+    Input('input-flux', 'value')
 )
-def update_figure(n_intervals, toggle_n_clicks, btn1, btn2, btn3):
-    df = fetch_exoplanet_data()
-
-    # Convert spherical to Cartesian coordinates for 3D plot
-    df['x'] = df['Distance'] * np.cos(np.radians(df['Inclination']))
-    df['y'] = df['Distance'] * np.sin(np.radians(df['Inclination']))
-    df['z'] = df['Distance']  # Use Distance as z-coordinate
-
-    # Default to ESI-based colorscale
-    colorscale = [[0, 'red'], [1, 'green']]
-    data_name = 'ESI (1 = green, 0 = red)'
-    
+def update_esi_estimate(radius, mass, flux):
+    if radius is None or mass is None:
+        return ''
+    esi, method = estimate_esi(radius, mass, flux)
+    if esi is None:
+        return 'ESI cannot be computed from these values.'
+    source = 'radius and stellar flux' if method == 'radius_flux' else 'radius and mass only; add the stellar flux for the catalog ESI'
+    return f'Computed ESI: {esi:.2f} ({source})'
+
+# Status of a queued submission, for clients polling outside Dash
+@app.server.route('/api/submissions/<ticket>')
+def submission_status(ticket):
+    return jsonify(get_submission_queue().status(ticket))
+
+# Whole-request timing: for Dash callbacks this is the callback plus Dash's
+# JSON serialization, so e.g. http.update_figure - update_figure is the serialization cost
+@app.server.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Optional periodic metrics log (METRICS_LOG_INTERVAL seconds), started on the
+    # first request in each process so forked workers (serve.py, gunicorn) log their own numbers
+    start_log_dump()
+
+@app.server.after_request
+def record_request_time(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        name = request.endpoint or 'unknown'
+        if request.path.endswith('_dash-update-component'):
+            body = request.get_json(silent=True) or {}
+            callback = app.callback_map.get(body.get('output'), {}).get('callback')
+            name = getattr(callback, '__name__', 'dash_callback')
+        observe(f'http.{name}', time.perf_counter() - start)
+    return response
+
+# Stage timings and counters in Prometheus text format
+@app.server.route('/metrics')
+def metrics():
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Prediction cache hit/miss counters
+@app.server.route('/api/prediction-cache')
+def prediction_cache_stats():
+    return jsonify(get_prediction_cache().stats())
+
+# Build the full globe figure from the cached frame, colored by metric.
+# Also returns every metric's colors for the points on screen (for clientside recoloring).
+def build_figure(df, camera=None, metric=DEFAULT_METRIC):
+    # Large catalogs: individual points near the camera, binned density for the rest
+    with timer('update_figure.lod'):
+        detail, density = level_of_detail(df, camera, color_values=all_metric_values(df))
+    with timer('update_figure.colors'):
+        payload = metric_payload(df, detail, density)
+    colors = payload[metric]
+    with timer('update_figure.hover'):
+        customdata = hover_customdata(detail)
+    with timer('update_figure.build'):
+        fig = globe_figure(detail, density, colors, customdata)
+    return fig, payload
+
+# Plotly figure for the globe from the prepared points, colors and hover data
+# (binary overrides GLOBE_TRANSPORT for x/y/z, e.g. in bench_pointcloud.py)
+def globe_figure(detail, density, colors, customdata, binary=None):
+    import numpy as np
+    import plotly.graph_objects as go
+    # float32 typed arrays, or plain lists that interval ticks can Patch-extend
+    # in the browser with GLOBE_TRANSPORT=json (see transport.py)
     planet_trace = go.Scatter3d(
-        x=df['x'],
-        y=df['y'], 
-        z=df['z'], 
+        x=figure_column(detail['x'], binary),
+        y=figure_column(detail['y'], binary), 
+        z=figure_column(detail['z'], binary), 
         mode='markers',
-        name=data_name, 
-        marker=dict(
-            size=10, color=df['ESI'],
-            colorscale=colorscale, opacity=0.8,
-            cmin=df['ESI'].min(), cmax=df['ESI'].max()
-        ),
-        text=df.apply(lambda row: f"Exoplanet: {row['Explore']}<br>Distance: {row['Distance']}<br>ESI: {row['ESI']}", axis=1),
-        hoverinfo='text',
+        name=colors['name'], 
+        marker=dict(size=10, color=colors['color'], opacity=0.8, **colors['marker']),
+        customdata=customdata,
+        hovertemplate=HOVER_TEMPLATE,
     )
 
     # Create the figure
     fig = go.Figure(data=[planet_trace])
 
+    if density is not None:
+        fig.add_trace(go.Scatter3d(
+            x=density['x'], y=density['y'], z=density['z'],
+            mode='markers',
+            name='Other planets (binned)',
+            marker=dict(
+                size=np.clip(3 + 2 * np.log2(density['count']), 3, 20),
+                color=colors['density'],
+                colorscale=colors['marker']['colorscale'], opacity=0.3,
+                cmin=colors['marker']['cmin'], cmax=colors['marker']['cmax']
+            ),
+            customdata=density['count'],
+            hovertemplate='%{customdata} planets<extra></extra>',
+        ))
+
     # Configure the layout for the globe
     fig.update_layout(
+        uirevision='globe',  # Keep the user's camera when the figure is rebuilt
         scene=dict(
             xaxis=dict(visible=False, backgroundcolor="black"),
             yaxis=dict(visible=False, backgroundcolor="black"),
             zaxis=dict(visible=False, backgroundcolor="black"),
         )
     )
+    return fig
+
+# Default-view figure as plain data, so it can be stored in the shared cache
+def shared_figure(catalog, metric):
+    fig, payload = build_figure(catalog, metric=metric)
+    return fig.to_plotly_json(), payload
+
+# Shared-cache key of the default-camera figure for the frame cache's catalog version
+def figure_key(cache, metric):
+    return f"globe:{cache.generation}:{cache.last_id}:{metric}:{'binary' if BINARY_TRANSPORT else 'json'}"
+
+# Save the startup snapshot: compiled model, catalog and the figure a first page load asks for
+def save_startup_snapshot():
+    export_compiled_model()
+    return write_snapshot(lambda catalog, cache: {figure_key(cache, DEFAULT_METRIC): shared_figure(catalog, DEFAULT_METRIC)})
 
-    return fig, df.to_dict('records')
+# Append only the new rows to the figure (and the per-metric colors) already in the browser
+def build_patches(df, new_rows, metric=DEFAULT_METRIC):
+    payload = metric_payload(df)
+    fig_patch = Patch()
+    trace = fig_patch['data'][0]
+    trace['x'].extend(new_rows['x'].tolist())
+    trace['y'].extend(new_rows['y'].tolist())
+    trace['z'].extend(new_rows['z'].tolist())
+    trace['marker']['color'].extend(color_list(metric_values(new_rows, metric)))
+    trace['customdata'].extend(hover_customdata(new_rows, binary=False))
+    trace['marker']['cmin'] = payload[metric]['marker']['cmin']
+    trace['marker']['cmax'] = payload[metric]['marker']['cmax']
+
+    colors_patch = Patch()
+    for name in METRICS:
+        colors_patch[name]['color'].extend(color_list(metric_values(new_rows, name)))
+        colors_patch[name]['marker'] = payload[name]['marker']
+    return fig_patch, colors_patch
+
+# Callback to update the graph with new or changed planets.
+# View toggling, camera presets and metric recoloring run in the browser (assets/globe.js).
+@app.callback(
+    Output('exoplanet-globe', 'figure'),
+    Output('last-seen', 'data'),
+    Output('metric-colors', 'data'),
+    Input('interval-component', 'n_intervals'),
+    Input('exoplanet-globe', 'relayoutData'),
+    State('last-seen', 'data'),
+    State('color-metric', 'data')
+)
+@timed('update_figure')
+def update_figure(n_intervals, relayout_data, last_seen, metric):
+    cache = get_frame_cache()
+    camera = camera_from_relayout(relayout_data)
+    metric = metric if metric in METRICS else DEFAULT_METRIC
+
+    # Camera moves only matter when level-of-detail is picking which points to send
+    if ctx.triggered_id == 'exoplanet-globe':
+        if camera is None or cache.catalog is None or len(cache.catalog) <= LOD_POINT_BUDGET:
+            return no_update, no_update, no_update
+
+    # Interval ticks only send what this browser hasn't seen yet,
+    # unless existing planets changed since it last got a full figure
+    # (typed arrays can't be extended in place, so the binary transport resends the figure)
+    if ctx.triggered_id == 'interval-component' and last_seen:
+        with timer('update_figure.db_read'):
+            new_rows = cache.rows_after(last_seen['id'])
+        if cache.generation == last_seen['generation'] and (new_rows.empty or not BINARY_TRANSPORT):
+            if new_rows.empty:
+                return no_update, no_update, no_update
+            last_seen = {'id': int(new_rows['id'][-1]), 'generation': cache.generation}
+            with timer('update_figure.patch'):
+                fig_patch, colors_patch = build_patches(cache.catalog, new_rows, metric)
+            return fig_patch, last_seen, colors_patch
+
+    # First load rebuilds the figure, but from the cached frame.
+    # The default-camera figure is shared between worker processes per catalog version.
+    with timer('update_figure.db_read'):
+        catalog = cache.refresh()
+    last_seen = {'id': cache.last_id, 'generation': cache.generation}
+    if camera is not None:
+        fig, payload = build_figure(catalog, camera, metric)
+        return fig, last_seen, payload
+    fig, payload = get_shared_cache('figures').get_or_build(figure_key(cache, metric), lambda: shared_figure(catalog, metric))
+    return fig, last_seen, payload
+
+# Clientside: Toggle View flips the camera preset between God and Earth view
+app.clientside_callback(
+    ClientsideFunction(namespace='globe', function_name='toggle_view'),
+    Output('camera-preset', 'value'),
+    Input('toggle-view', 'n_clicks'),
+    State('globe-config', 'data'),
+    prevent_initial_call=True
+)
+
+# Clientside: move the camera to the chosen preset
+app.clientside_callback(
+    ClientsideFunction(namespace='globe', function_name='apply_preset'),
+    Output('exoplanet-globe', 'figure', allow_duplicate=True),
+    Input('camera-preset', 'value'),
+    State('globe-config', 'data'),
+    prevent_initial_call=True
+)
+
+# Clientside: recolor by ESI / Orbital Period / Mass from the colors already in the browser
+app.clientside_callback(
+    ClientsideFunction(namespace='globe', function_name='recolor'),
+    Output('exoplanet-globe', 'figure', allow_duplicate=True),
+    Output('color-metric', 'data'),
+    Input('button-1', 'n_clicks'),
+    Input('button-2', 'n_clicks'),
+    Input('button-3', 'n_clicks'),
+    State('metric-colors', 'data'),
+    State('globe-config', 'data'),
+    prevent_initial_call=True
+)
+
+# Clientside: Play/Pause for the orbit animation only toggles the playback interval
+app.clientside_callback(
+    ClientsideFunction(namespace='orbits', function_name='toggle_playback'),
+    Output('orbit-interval', 'disabled'),
+    Output('orbit-play', 'children'),
+    Input('orbit-play', 'n_clicks')
+)
+
+# Orbit view at one frame: planets around a shared star at the origin,
+# distances shown as sqrt(AU), colored by orbital period
+def build_orbit_figure(frames, index):
+    import numpy as np
+    import plotly.graph_objects as go
+    x, y, z = frames.frame(index)
+    colors = np.log10(frames.period)
+    cmin, cmax = (float(colors.min()), float(colors.max())) if len(colors) else (0.0, 1.0)
+    extent = frames.extent()
+    fig = go.Figure(data=[
+        go.Scatter3d(
+            x=typed_array(x), y=typed_array(y), z=typed_array(z),
+            mode='markers',
+            name='Planets',
+            marker=dict(size=3, color=typed_array(colors), opacity=0.8, **marker_style('OrbitalPeriod', cmin, cmax)),
+            customdata=typed_array(np.column_stack([frames.ids, frames.period])),
+            hovertemplate='Planet #%{customdata[0]}<br>Period: %{customdata[1]:.1f} days<extra></extra>',
+        ),
+        go.Scatter3d(x=[0], y=[0], z=[0], mode='markers', name='Star',
+                     marker=dict(size=8, color='yellow'), hoverinfo='skip'),
+    ])
+    axis = dict(range=[-extent, extent], visible=False, backgroundcolor='black')
+    fig.update_layout(
+        uirevision='orbits',
+        title=f'Day {frames.times[index % len(frames)]:.0f}',
+        scene=dict(xaxis=axis, yaxis=axis, zaxis=axis, aspectmode='cube'),
+    )
+    return fig
+
+# Move the planets already in the browser to another frame
+def build_orbit_patch(frames, index):
+    x, y, z = frames.frame(index)
+    patch = Patch()
+    patch['data'][0]['x'] = typed_array(x)
+    patch['data'][0]['y'] = typed_array(y)
+    patch['data'][0]['z'] = typed_array(z)
+    patch['layout']['title'] = f'Day {frames.times[index % len(frames)]:.0f}'
+    return patch
+
+# Callback to step the orbit animation: each tick only sends the next frame's
+# positions; a new catalog version (or the first load) sends the whole figure
+@app.callback(
+    Output('orbit-view', 'figure'),
+    Output('orbit-version', 'data'),
+    Input('orbit-interval', 'n_intervals'),
+    Input('last-seen', 'data'),  # New or changed planets arrived
+    State('orbit-version', 'data')
+)
+@timed('update_orbits')
+def update_orbits(n_intervals, last_seen, shown_version):
+    cache = get_frame_cache()
+    with timer('update_orbits.db_read'):
+        catalog = cache.refresh()
+    version = f'{cache.generation}-{cache.last_id}'
+    frames = get_orbit_frame_cache().get(catalog, version)
+    index = n_intervals or 0
+    if version == shown_version:
+        if ctx.triggered_id != 'orbit-interval':
+            return no_update, no_update
+        with timer('update_orbits.frame'):
+            return build_orbit_patch(frames, index), no_update
+    return build_orbit_figure(frames, index), version
+
+# Callback to serve one page of the table straight from SQL
+@app.callback(
+    Output('exoplanet-table', 'data'),
+    Output('exoplanet-table', 'page_count'),
+    Input('exoplanet-table', 'page_current'),
+    Input('exoplanet-table', 'page_size'),
+    Input('exoplanet-table', 'sort_by'),
+    Input('exoplanet-table', 'filter_query'),
+    Input('last-seen', 'data')  # New or changed planets arrived
+)
+@timed('update_table')
+def update_table(page_current, page_size, sort_by, filter_query, last_seen):
+    store = get_store()
+    where, params = build_where(filter_query)
+    rows = store.fetch_page(where, params, build_order_by(sort_by),
+                            limit=page_size, offset=page_current * page_size, columns=EXOPLANET_COLUMNS)
+    page_count = max(1, -(-store.count(where, params) // page_size))
+    return rows, page_count
+
+# Callback for the nearby-planets panel
+@app.callback(
+    Output('nearby-results', 'children'),
+    Input('nearby-search', 'n_clicks'),
+    State('nearby-origin', 'value'),
+    State('nearby-radius', 'value'),
+    State('nearby-k', 'value')
+)
+@timed('search_nearby')
+def search_nearby(n_clicks, origin, radius, k):
+    if not n_clicks:
+        return ''
+    from spatial import get_spatial_index
+    index = get_spatial_index()
+    origin = int(origin) if origin is not None else None
+    if origin is not None and origin not in index.positions:
+        return f'No planet with id {origin}.'
+
+    results = []
+    if radius is not None:
+        ids, dists = index.within(radius, origin)
+        results.append(html.P(f'{len(ids)} planets within {radius} ly: ' +
+                              ', '.join(f'#{i} ({d:.1f} ly)' for i, d in zip(ids[:50], dists[:50]))))
+    if k:
+        ids, dists = index.nearest_habitable(int(k), origin)
+        results.append(html.P(f'{len(ids)} nearest habitable candidates: ' +
+                              ', '.join(f'#{i} ({d:.1f} ly)' for i, d in zip(ids, dists))))
+    return results or 'Enter a radius and/or k.'
+
+# Callback for the top-candidates panel
+@app.callback(
+    Output('rank-table', 'data'),
+    Input('rank-search', 'n_clicks'),
+    State('rank-k', 'value'),
+    State('rank-max-distance', 'value'),
+    State('rank-max-magnitude', 'value'),
+    State('rank-min-esi', 'value')
+)
+@timed('rank_candidates')
+def rank_candidates(n_clicks, k, max_distance, max_magnitude, min_esi):
+    if not n_clicks:
+        return []
+    from ranking import top_candidates
+    filters = {
+        'Distance': (None, max_distance),
+        'Magnitude': (None, max_magnitude),
+        'ESI': (min_esi, None),
+    }
+    top = top_candidates(int(k or 10), filters)
+    return top.round({'score': 3, 'probability': 3, 'ESI': 2, 'Distance': 1, 'Magnitude': 2}).to_dict('records')
 
+# Development server; use serve.py (or gunicorn app:server) for production
 if __name__ == '__main__':
     create_exoplanet_table()  # Ensure table exists
-    app.run_server(debug=True)
+    app.run(debug=True)
@@ -5,7 +5,7 @@ from dash import html
 from dash import dash_table
 import plotly.graph_objects as go
 import pandas as pd
-import numpy as np  # Import NumPy
+from coordinates import galactic_to_cartesian
 
 app = dash.Dash(__name__)
 
@@ -54,9 +54,7 @@ def update_figure(n):
     df = fetch_exoplanet_data()
 
     # Convert galactic coordinates (longitudes and latitudes) to 3D Cartesian coordinates
-    df['x'] = df['Distance (ly)'] * np.cos(np.radians(df['Galactic Latitude'])) * np.cos(np.radians(df['Galactic Longitude']))
-    df['y'] = df['Distance (ly)'] * np.cos(np.radians(df['Galactic Latitude'])) * np.sin(np.radians(df['Galactic Longitude']))
-    df['z'] = df['Distance (ly)'] * np.sin(np.radians(df['Galactic Latitude']))
+    df['x'], df['y'], df['z'] = galactic_to_cartesian(df['Galactic Longitude'], df['Galactic Latitude'], df['Distance (ly)'])
 
     # Create a 3D scatter plot
     fig = go.Figure(data=[go.Scatter3d(
@@ -5,7 +5,7 @@ from dash import html
 from dash import dash_table
 import plotly.graph_objects as go
 import pandas as pd
-import numpy as np  # Import NumPy
+from coordinates import galactic_to_cartesian
 
 app = dash.Dash(__name__)
 
@@ -44,9 +44,7 @@ app.layout = html.Div(style={'display': 'flex', 'flexDirection': 'column', 'alig
 def update_figure(n):
     df = fetch_exoplanet_data()
     # Convert galactic coordinates (longitudes and latitudes) to 3D Cartesian coordinates
-    df['x'] = df['Distance'] * np.cos(np.radians(df['Latitude'])) * np.cos(np.radians(df['Longitude']))
-    df['y'] = df['Distance'] * np.cos(np.radians(df['Latitude'])) * np.sin(np.radians(df['Longitude']))
-    df['z'] = df['Distance'] * np.sin(np.radians(df['Latitude']))
+    df['x'], df['y'], df['z'] = galactic_to_cartesian(df['Longitude'], df['Latitude'], df['Distance'])
 
     # Create a 3D scatter plot
     fig = go.Figure(data=[go.Scatter_polar(
@@ -0,0 +1,104 @@
+"""
+Local stand-in for the NASA Exoplanet Archive's TAP endpoint, so
+archive_sync.py can be exercised without the network.
+
+    python archive_fixture.py archive.csv [--port 8765]
+    ARCHIVE_BASE_URL=http://127.0.0.1:8765 python archive_sync.py
+
+Answers GET /TAP/sync (whatever the query) with the CSV file, an ETag (hash
+of its content) and Last-Modified (its mtime), and 304 Not Modified when a
+conditional request's validators still match. Editing the file changes both.
+"""
+import argparse
+import hashlib
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from archive_sync import TAP_PATH
+
+CHUNK_BYTES = 1 << 16
+
+
+class ArchiveFixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if urlparse(self.path).path != TAP_PATH:
+            self.send_error(404)
+            return
+        path = self.server.csv_path
+        with open(path, 'rb') as f:
+            body = f.read()
+        mtime = os.path.getmtime(path)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        last_modified = formatdate(mtime, usegmt=True)
+
+        # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+        if_none_match = self.headers.get('If-None-Match')
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(',')]
+        elif if_modified_since is not None:
+            try:
+                not_modified = int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        self.server.hits[304 if not_modified else 200] += 1
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        if not_modified:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        for start in range(0, len(body), CHUNK_BYTES):
+            self.wfile.write(body[start:start + CHUNK_BYTES])
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_fixture_server(csv_path, host='127.0.0.1', port=0, verbose=False):
+    """Server for csv_path (port 0 picks a free one); server.hits counts 200s and 304s."""
+    server = ThreadingHTTPServer((host, port), ArchiveFixtureHandler)
+    server.daemon_threads = True
+    server.csv_path = csv_path
+    server.verbose = verbose
+    server.hits = {200: 0, 304: 0}
+    return server
+
+
+def start_fixture_server(csv_path, host='127.0.0.1', port=0):
+    """Serve csv_path from a daemon thread. Returns (server, base_url); call server.shutdown() when done."""
+    server = make_fixture_server(csv_path, host, port)
+    threading.Thread(target=server.serve_forever, name='archive-fixture', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a CSV file as a stand-in for the archive TAP endpoint')
+    parser.add_argument('csv_path')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = make_fixture_server(args.csv_path, args.host, args.port, verbose=True)
+    print(f"Serving {args.csv_path} at http://{args.host}:{server.server_address[1]}{TAP_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
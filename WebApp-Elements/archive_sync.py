@@ -0,0 +1,171 @@
+"""
+Sync the exoplanet table from the NASA Exoplanet Archive.
+
+    python archive_sync.py [--force] [--base-url URL]
+
+Each sync asks the archive's TAP service for the pscomppars table as CSV
+(the ARCHIVE_COLUMN_MAP columns ingest.py understands). Responses are kept
+in an on-disk HTTP cache with their ETag/Last-Modified, so the next sync
+is a conditional request and an unchanged archive answers 304 with no body.
+A changed one is streamed to disk in chunks, then ingested with
+only_changed: rows identical to the stored planet are dropped before
+scoring, and only new or changed planets are written. The cached body is
+marked applied only once that ingest has committed, so a failed apply is
+retried from the cached copy by the next sync even though the archive then
+answers 304.
+
+Planets that disappear from the archive are left in the table, which also
+holds the repo's CSV planets and form submissions.
+
+ARCHIVE_BASE_URL (or --base-url) can point at archive_fixture.py, a local
+stand-in, to test without the network.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlencode
+
+import requests
+
+from ingest import ARCHIVE_COLUMN_MAP, DEFAULT_CHUNKSIZE, ingest_file
+from metrics import timer
+from store import DEFAULT_DB_PATH
+
+ARCHIVE_BASE_URL = os.environ.get('ARCHIVE_BASE_URL', 'https://exoplanetarchive.ipac.caltech.edu')
+ARCHIVE_TABLE = os.environ.get('ARCHIVE_TABLE', 'pscomppars')
+# Downloaded responses and their validators (next to the database by default)
+ARCHIVE_CACHE_DIR = os.environ.get('ARCHIVE_CACHE_DIR', os.path.splitext(DEFAULT_DB_PATH)[0] + '_archive')
+ARCHIVE_TIMEOUT = float(os.environ.get('ARCHIVE_TIMEOUT', 60))  # seconds to connect / between reads
+TAP_PATH = '/TAP/sync'
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+
+
+def archive_query(table=ARCHIVE_TABLE):
+    return f"select {','.join(ARCHIVE_COLUMN_MAP)} from {table}"
+
+
+def archive_url(base_url=ARCHIVE_BASE_URL, table=ARCHIVE_TABLE):
+    return base_url.rstrip('/') + TAP_PATH + '?' + urlencode({'query': archive_query(table), 'format': 'csv'})
+
+
+class HttpCache:
+    """
+    Responses cached on disk by URL: the body in <hash>.csv and the
+    validators (ETag, Last-Modified) in <hash>.json. fetch() sends them back
+    as If-None-Match / If-Modified-Since, and keeps the cached body on a 304.
+    Bodies are streamed into a .part file and renamed when complete, so an
+    interrupted download never replaces a good copy. A new body is saved
+    with 'applied': False until the caller calls mark_applied().
+    """
+
+    def __init__(self, directory=ARCHIVE_CACHE_DIR, session=None, timeout=ARCHIVE_TIMEOUT):
+        self.directory = directory
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, key + '.csv'), os.path.join(self.directory, key + '.json')
+
+    def metadata(self, url):
+        """Validators and download info for url, or None if there is no cached body."""
+        body_path, meta_path = self.paths(url)
+        if not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fetch(self, url, force=False):
+        """
+        (path to the body on disk, whether it changed). With force the
+        request is unconditional and the body is always downloaded again.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        body_path, meta_path = self.paths(url)
+        meta = None if force else self.metadata(url)
+        headers = {}
+        if meta and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304 and meta:
+                return body_path, False
+            response.raise_for_status()
+            size = 0
+            with open(body_path + '.part', 'wb') as f:
+                for block in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                    f.write(block)
+                    size += len(block)
+            os.replace(body_path + '.part', body_path)
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched': time.time(),
+                'bytes': size,
+                'applied': False,
+            }
+        self._write_metadata(meta_path, meta)
+        return body_path, True
+
+    def mark_applied(self, url):
+        """Record that the cached body for url has been fully applied."""
+        meta = self.metadata(url)
+        meta['applied'] = True
+        self._write_metadata(self.paths(url)[1], meta)
+
+    @staticmethod
+    def _write_metadata(meta_path, meta):
+        with open(meta_path + '.part', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.part', meta_path)
+
+
+def sync_archive(base_url=ARCHIVE_BASE_URL, store=None, cache=None, force=False, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Download the archive table if it changed and apply the changed rows.
+    Returns ingest_file's totals plus 'modified' and 'bytes' downloaded
+    (only 'modified': False when the archive answered 304 and the cached
+    body was already applied).
+    """
+    cache = cache or HttpCache()
+    url = archive_url(base_url)
+    with timer('archive_sync.download'):
+        path, downloaded = cache.fetch(url, force=force)
+    # Bodies cached before the applied flag existed count as applied
+    if not downloaded and cache.metadata(url).get('applied', True):
+        return {'modified': False, 'bytes': 0}
+    with timer('archive_sync.apply'):
+        totals = ingest_file(path, store, chunksize=chunksize, only_changed=True)
+    cache.mark_applied(url)
+    totals.update(modified=True, bytes=cache.metadata(url)['bytes'] if downloaded else 0)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync the exoplanet table from the NASA Exoplanet Archive')
+    parser.add_argument('--base-url', default=ARCHIVE_BASE_URL)
+    parser.add_argument('--force', action='store_true', help='Download again even if the archive is unchanged')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = sync_archive(args.base_url, force=args.force, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+    if not totals['modified']:
+        print(f"Archive unchanged since the last sync ({elapsed:.2f}s)")
+        return
+    print(f"Downloaded {totals['bytes'] / 1024:.0f} KiB: {totals['read']} rows read, "
+          f"{totals['inserted']} inserted, {totals['updated']} updated, {totals['unchanged']} unchanged, "
+          f"{totals['skipped']} skipped in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+// Clientside callbacks for the globe (registered in app.py).
+// They only use data already in the browser, so view changes and metric
+// recoloring never reach the Python server.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    globe: {
+        // Toggle View flips between the God and Earth presets
+        toggle_view: function (n_clicks, config) {
+            if (!n_clicks) {
+                return window.dash_clientside.no_update;
+            }
+            return config.toggle[n_clicks % config.toggle.length];
+        },
+
+        // Move the camera to a preset; only the camera is patched, the points stay put
+        apply_preset: function (preset, config) {
+            const camera = config.presets[preset];
+            if (!camera) {
+                return window.dash_clientside.no_update;
+            }
+            return new window.dash_clientside.Patch()
+                .assign(['layout', 'scene', 'camera'], camera)
+                .build();
+        },
+
+        // Swap the marker colors for the metric whose button was clicked,
+        // using the per-metric colors the server sent with the figure
+        recolor: function (esi_clicks, period_clicks, mass_clicks, colors, config) {
+            const triggered = window.dash_clientside.callback_context.triggered_id;
+            const metric = config.buttons[triggered];
+            if (!metric || !colors || !colors[metric]) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            const data = colors[metric];
+            const patch = new window.dash_clientside.Patch()
+                .assign(['data', 0, 'name'], data.name)
+                .merge(['data', 0, 'marker'], data.marker)
+                .assign(['data', 0, 'marker', 'color'], data.color);
+            if (data.density !== null) {
+                patch.assign(['data', 1, 'marker', 'color'], data.density)
+                    .merge(['data', 1, 'marker'], {
+                        colorscale: data.marker.colorscale,
+                        cmin: data.marker.cmin,
+                        cmax: data.marker.cmax
+                    });
+            }
+            return [patch.build(), metric];
+        }
+    },
+
+    orbits: {
+        // Play/Pause only switches the playback interval on and off
+        toggle_playback: function (n_clicks) {
+            const playing = n_clicks % 2 === 1;
+            return [!playing, playing ? 'Pause Orbits' : 'Play Orbits'];
+        }
+    }
+});
@@ -0,0 +1,98 @@
+"""
+Benchmark: archive syncs against the local fixture server (archive_fixture.py)
+with a synthetic pscomppars export, in a temporary database.
+
+  1. first sync: download and insert everything
+  2. sync again, archive unchanged: one 304, nothing read or written
+  3. a fraction of the planets change: download, diff, write only those
+  4. a full re-sync the old way: unconditional download, every row scored
+     and upserted
+
+    python bench_archive_sync.py [--planets 20000] [--changed 0.01]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from archive_fixture import start_fixture_server
+from archive_sync import HttpCache, archive_url, sync_archive
+from ingest import ingest_file
+from store import ExoplanetStore
+
+
+def synthetic_archive(n, rng):
+    return pd.DataFrame({
+        'pl_name': [f'Synthetic {i} b' for i in range(n)],
+        'sy_dist': 10 ** rng.uniform(0, 3.5, n),
+        'pl_bmassj': 10 ** rng.uniform(-3, 1, n),
+        'pl_radj': 10 ** rng.uniform(-1.3, 0.3, n),
+        'pl_orbincl': rng.uniform(0, 90, n),
+        'sy_vmag': rng.uniform(5, 20, n),
+        'pl_orbeccen': rng.beta(1, 4, n),
+        'pl_orbper': 10 ** rng.uniform(-0.5, 4, n),
+        'discoverymethod': rng.choice(['Transit', 'Radial Velocity', 'Imaging'], n),
+        'glon': rng.uniform(0, 360, n),
+        'glat': rng.uniform(-90, 90, n),
+        'pl_insol': 10 ** rng.uniform(-1, 3, n),
+    })
+
+
+def report(label, elapsed, totals):
+    if not totals['modified']:
+        detail = 'not modified (304)'
+    else:
+        detail = (f"{totals['bytes'] / 1024:.0f} KiB, {totals['inserted']} inserted, "
+                  f"{totals['updated']} updated, {totals['unchanged']} unchanged")
+    print(f"  {label:34s} {elapsed * 1000:8.0f} ms  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=20_000)
+    parser.add_argument('--changed', type=float, default=0.01, help='fraction of planets edited between syncs')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'pscomppars.csv')
+        archive = synthetic_archive(args.planets, rng)
+        archive.to_csv(csv_path, index=False)
+        store = ExoplanetStore(os.path.join(tmp, 'bench.db'))
+        cache = HttpCache(os.path.join(tmp, 'http_cache'))
+        server, base_url = start_fixture_server(csv_path)
+        print(f"{args.planets:,} planets, {args.changed:.0%} changed between syncs")
+
+        def sync(label, force=False):
+            start = time.perf_counter()
+            totals = sync_archive(base_url, store=store, cache=cache, force=force)
+            report(label, time.perf_counter() - start, totals)
+
+        sync('first sync')
+        sync('unchanged archive')
+
+        edited = rng.choice(args.planets, int(args.planets * args.changed), replace=False)
+        archive.loc[edited, 'sy_vmag'] += 0.1
+        archive.to_csv(csv_path, index=False)
+        os.utime(csv_path, (time.time() + 1, time.time() + 1))  # Last-Modified has 1 s resolution
+        sync('after edits (diff + apply)')
+
+        # Undo the edits so the full re-import has the same amount to change
+        archive.loc[edited, 'sy_vmag'] -= 0.1
+        archive.to_csv(csv_path, index=False)
+        start = time.perf_counter()
+        path, _ = cache.fetch(archive_url(base_url), force=True)
+        totals = ingest_file(path, store)
+        totals.update(modified=True, bytes=os.path.getsize(csv_path))
+        report('full re-import (no diff)', time.perf_counter() - start, totals)
+
+        print(f"  server responses: {server.hits[200]} full, {server.hits[304]} not modified")
+        server.shutdown()
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: memory per planet of the in-process catalog, as the pandas
+DataFrame the app used to keep (plus its to_dict('records') copy) and as
+the structured-array PlanetCatalog it keeps now.
+
+    python bench_catalog.py [--sizes 10000 100000]
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from catalog import PlanetCatalog
+from store import ExoplanetStore
+
+METHODS = ['Transit', 'Radial Velocity', 'Microlensing', 'Imaging', 'Astrometry']
+
+
+def synthetic_rows(n, rng):
+    return [{
+        'Name': f'Synthetic-{i} b',
+        'ESI': float(rng.uniform(0, 1)),
+        'Magnitude': float(rng.uniform(2, 16)),
+        'Distance': float(rng.uniform(4, 3000)),
+        'Radius': float(rng.uniform(0.3, 20)),
+        'Mass': float(10 ** rng.uniform(-3, 1.5)),
+        'Inclination': float(rng.uniform(0, 90)),
+        'Longitude': float(rng.uniform(0, 360)),
+        'Latitude': float(rng.uniform(-90, 90)),
+        'OrbitalPeriod': float(10 ** rng.uniform(-1, 5)),
+        'Eccentricity': float(rng.uniform(0, 0.5)),
+        'DiscoveryMethod': METHODS[i % len(METHODS)],
+        'Explore': int(rng.integers(0, 2)),
+    } for i in range(n)]
+
+
+def traced(fn):
+    """(result, bytes still allocated by fn when it returns)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def row(name, nbytes, n):
+    print(f"  {name:40s} {nbytes / 1024 / 1024:9.2f} MiB  {nbytes / n:8.1f} B/planet")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ExoplanetStore(os.path.join(tmp, 'bench.db'))
+            store.create_table()
+            store.insert_many(synthetic_rows(n, rng))
+            print(f"{n:,} planets")
+
+            df = store.fetch_all()
+            row('before: DataFrame (deep)', int(df.memory_usage(deep=True).sum()), n)
+            _, records_bytes = traced(lambda: df.to_dict('records'))
+            row('before: to_dict records copy', records_bytes, n)
+
+            names, rows = store.fetch_rows_since(0)
+            catalog, traced_bytes = traced(lambda: PlanetCatalog.from_rows(names, rows))
+            row('after: PlanetCatalog array', catalog.rows.nbytes, n)
+            row('after: PlanetCatalog + string tables', catalog.nbytes(), n)
+            row('after: PlanetCatalog (tracemalloc)', traced_bytes, n)
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: ESI for a whole archive, vectorized (habitability.esi_scores)
+versus a per-planet Python loop doing the same arithmetic with math.
+
+    python bench_habitability.py [--planets 1000000]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from habitability import compute_esi, esi_scores, JUPITER_RADIUS_EARTH, JUPITER_MASS_EARTH
+
+
+def synthetic_archive(n, rng):
+    """Jupiter-unit radius/mass, Earth-unit flux, with ~30% of each column missing."""
+    def holes(values):
+        return np.where(rng.uniform(size=n) < 0.3, np.nan, values)
+    return {
+        'radius': holes(10 ** rng.uniform(-1.3, 0.3, n)),
+        'mass': holes(10 ** rng.uniform(-3, 1, n)),
+        'flux': holes(10 ** rng.uniform(-1, 3, n)),
+    }
+
+
+def python_loop(radius, mass, flux):
+    """Radius/flux ESI, else interior ESI, one planet at a time."""
+    out = []
+    for r, m, s in zip(radius, mass, flux):
+        r *= JUPITER_RADIUS_EARTH
+        m *= JUPITER_MASS_EARTH
+        if math.isnan(r) and not math.isnan(m):
+            r = m ** 0.279 if m < 2.04 else 1.008 * 2.04 ** 0.279 * (m / 2.04) ** 0.589 if m < 132 else \
+                1.008 * 2.04 ** 0.279 * (132 / 2.04) ** 0.589 * (m / 132) ** -0.044
+        if not math.isnan(r) and not math.isnan(s):
+            out.append(1 - math.sqrt(0.5 * ((s - 1) / (s + 1)) ** 2 + 0.5 * ((r - 1) / (r + 1)) ** 2))
+        elif not math.isnan(r) and not math.isnan(m):
+            d = m / r ** 3
+            out.append((1 - abs(r - 1) / (r + 1)) ** (0.57 / 2) * (1 - abs(d - 1) / (d + 1)) ** (1.07 / 2))
+        else:
+            out.append(math.nan)
+    return np.round(np.array(out), 2)
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=1_000_000)
+    parser.add_argument('--loop-sample', type=int, default=100_000, help='planets timed with the Python loop')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    archive = synthetic_archive(args.planets, rng)
+    print(f"{args.planets:,} planets")
+
+    sample = {k: v[:args.loop_sample] for k, v in archive.items()}
+    loop, ms = timed(lambda: python_loop(sample['radius'], sample['mass'], sample['flux']), repeat=1)
+    print(f"  {'Python loop (scaled from sample)':36s} {ms * args.planets / args.loop_sample:10.0f} ms")
+
+    esi, ms = timed(lambda: compute_esi(archive['radius'], archive['mass'], archive['flux']))
+    print(f"  {'compute_esi (vectorized)':36s} {ms:10.0f} ms")
+    _, ms = timed(lambda: esi_scores(archive['radius'], archive['mass'], archive['flux']))
+    print(f"  {'esi_scores (all scores)':36s} {ms:10.0f} ms")
+
+    n = args.loop_sample
+    agree = np.allclose(esi[:n], loop, equal_nan=True)
+    print(f"  vectorized matches the loop: {agree}; "
+          f"{np.count_nonzero(~np.isnan(esi)):,} of {args.planets:,} scored")
+
+
+if __name__ == '__main__':
+    main()
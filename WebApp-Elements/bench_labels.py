@@ -0,0 +1,89 @@
+"""
+Benchmark: hover text built with a row-wise df.apply (the old update_figure)
+versus customdata + hovertemplate and vectorized string concatenation.
+Reports build time and JSON size of the hover payload at 10k and 100k planets.
+
+    python bench_labels.py [--sizes 10000 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from labels import hover_customdata, HOVER_TEMPLATE
+from model_server import EXPLORE_ESI_THRESHOLD
+
+
+# Baselines the app used before customdata: pre-formatted strings by Series concatenation
+def hover_text(df):
+    return ('Exoplanet: ' + df['Explore'].astype(str) +
+            '<br>Distance: ' + df['Distance'].astype(str) +
+            '<br>ESI: ' + df['ESI'].astype(str))
+
+
+def explore_from_esi(esi):
+    return np.where(np.asarray(esi) >= EXPLORE_ESI_THRESHOLD, 1, 0)
+
+
+def synthetic_planets(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Distance': np.round(rng.uniform(1, 5000, n), 1),
+        'ESI': np.round(rng.uniform(0, 1, n), 2),
+        'x': rng.normal(size=n), 'y': rng.normal(size=n), 'z': rng.normal(size=n),
+    })
+    df['Explore'] = explore_from_esi(df['ESI'])
+    return df
+
+
+# Each builder returns the hover-related trace properties, which is all that differs between the paths
+def apply_hover(df):
+    text = df.apply(lambda row: f"Exoplanet: {row['Explore']}<br>Distance: {row['Distance']}<br>ESI: {row['ESI']}", axis=1)
+    return {'text': text.tolist(), 'hoverinfo': 'text'}
+
+
+def concat_hover(df):
+    return {'text': hover_text(df).tolist(), 'hoverinfo': 'text'}
+
+
+def customdata_hover(df):
+    return {'customdata': hover_customdata(df), 'hovertemplate': HOVER_TEMPLATE}
+
+
+def measure(build, df):
+    start = time.perf_counter()
+    props = build(df)
+    built = time.perf_counter()
+    payload = to_json_plotly(props)
+    done = time.perf_counter()
+    return (built - start) * 1000, (done - built) * 1000, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        df = synthetic_planets(n)
+        print(f"{n:,} planets")
+        for name, build in [('df.apply text', apply_hover),
+                            ('Series concat text', concat_hover),
+                            ('customdata + template', customdata_hover)]:
+            build_ms, json_ms, size = measure(build, df)
+            print(f"  {name:<24} build {build_ms:8.1f} ms  to_json {json_ms:7.1f} ms  payload {size / 1e6:6.2f} MB")
+
+        # Derived Explore column: Series.apply vs np.where
+        start = time.perf_counter()
+        df['ESI'].apply(lambda x: 1 if x >= EXPLORE_ESI_THRESHOLD else 0)
+        apply_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        explore_from_esi(df['ESI'])
+        where_ms = (time.perf_counter() - start) * 1000
+        print(f"  Explore label: apply {apply_ms:.2f} ms, np.where {where_ms:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: per-call overhead of the instrumentation in metrics.py, enabled
+and disabled (METRICS_ENABLED=0), compared with an uninstrumented call.
+
+    python bench_metrics.py [--calls 1000000]
+"""
+import argparse
+import time
+
+import metrics
+
+
+def work():
+    return None
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def with_timer():
+    with metrics.timer('bench.timer'):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    baseline = per_call_ns(work, args.calls)
+    print(f"  {'plain call':28s} {baseline:8.0f} ns")
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        decorated = metrics.timed('bench.decorator')(work)
+        label = 'enabled' if enabled else 'disabled'
+        print(f"  {'@timed, ' + label:28s} {per_call_ns(decorated, args.calls) - baseline:+8.0f} ns")
+        print(f"  {'with timer(), ' + label:28s} {per_call_ns(with_timer, args.calls) - baseline:+8.0f} ns")
+    metrics.registry.clear()
+
+
+if __name__ == '__main__':
+    main()
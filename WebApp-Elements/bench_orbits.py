@@ -0,0 +1,110 @@
+"""
+Benchmark: Kepler-orbit animation frames for N planets x F frames.
+
+Compares a per-planet Python Newton loop (timed on a sample and scaled up)
+with the vectorized engine in float64 and float32, then times what the
+browser waits for: the first frame of a fresh window (one chunk is solved
+lazily) and a playback tick (slice one frame + build and serialize the Patch).
+
+    python bench_orbits.py [--planets 10000] [--frames 360]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+from dash import Patch
+from dash._utils import to_json
+
+from orbits import orbit_elements, orbit_positions, orbit_frames, initial_phase, semi_major_axis
+from transport import typed_array
+
+
+def synthetic_catalog(n, rng):
+    return {
+        'id': np.arange(1, n + 1),
+        'OrbitalPeriod': 10 ** rng.uniform(-0.5, 4, n),
+        'Eccentricity': np.where(rng.uniform(size=n) < 0.3, np.nan, rng.beta(1, 4, n)),
+        'Inclination': rng.uniform(0, 90, n),
+    }
+
+
+def python_loop(ids, period, eccentricity, inclination, times):
+    """One planet and one frame at a time, as a straightforward port would do it."""
+    out = np.empty((len(times), 3, len(ids)))
+    phase = initial_phase(ids)
+    a = semi_major_axis(period)
+    for j in range(len(ids)):
+        e = eccentricity[j]
+        b = a[j] * math.sqrt(1 - e * e)
+        for k, t in enumerate(times):
+            M = (2 * math.pi * t / period[j] + phase[j]) % (2 * math.pi)
+            E = M + 0.85 * e * math.copysign(1, math.sin(M))
+            for _ in range(16):
+                step = (E - e * math.sin(E) - M) / (1 - e * math.cos(E))
+                E -= step
+                if abs(step) < 1e-10:
+                    break
+            y = b * math.sin(E)
+            out[k, 0, j] = a[j] * (math.cos(E) - e)
+            out[k, 1, j] = y * math.cos(inclination[j])
+            out[k, 2, j] = y * math.sin(inclination[j])
+    return out
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def tick(frames, index):
+    x, y, z = frames.frame(index)
+    patch = Patch()
+    patch['data'][0]['x'] = typed_array(x)
+    patch['data'][0]['y'] = typed_array(y)
+    patch['data'][0]['z'] = typed_array(z)
+    patch['layout']['title'] = f'Day {frames.times[index % len(frames)]:.0f}'
+    return to_json(patch)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=10_000)
+    parser.add_argument('--frames', type=int, default=360)
+    parser.add_argument('--loop-sample', type=int, default=100, help='planets timed with the Python loop')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    catalog = synthetic_catalog(args.planets, rng)
+    ids, period, eccentricity, inclination = orbit_elements(catalog)
+    times = np.linspace(0, 365.25, args.frames, endpoint=False)
+    print(f"{args.planets:,} planets x {args.frames} frames")
+
+    sample = slice(0, args.loop_sample)
+    loop, ms = timed(lambda: python_loop(ids[sample], period[sample], eccentricity[sample],
+                                         inclination[sample], times), repeat=1)
+    print(f"  {'Python loop (scaled from sample)':36s} {ms * args.planets / args.loop_sample:10.0f} ms")
+
+    exact, ms = timed(lambda: orbit_positions(ids, period, eccentricity, inclination, times, dtype=np.float64))
+    print(f"  {'vectorized, float64':36s} {ms:10.0f} ms")
+    fast, ms = timed(lambda: orbit_positions(ids, period, eccentricity, inclination, times))
+    print(f"  {'vectorized, float32 (used by app)':36s} {ms:10.0f} ms")
+
+    a = semi_major_axis(period)
+    print(f"  max error vs loop (float64) {np.max(np.abs(exact[:, :, sample] - loop)):.1e} AU, "
+          f"float32 vs float64 {np.max(np.abs(fast - exact) / a):.1e} of the orbit size")
+
+    _, ms = timed(lambda: orbit_frames(catalog, args.frames).frame(0))
+    print(f"  {'first frame of a new window':36s} {ms:10.1f} ms")
+    frames = orbit_frames(catalog, args.frames).compute_all()
+    body, ms = timed(lambda: tick(frames, 7), repeat=20)
+    print(f"  {'playback tick (patch + JSON)':36s} {ms:10.2f} ms  ({len(body) / 1024:.0f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
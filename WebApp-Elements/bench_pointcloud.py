@@ -0,0 +1,76 @@
+"""
+Benchmark: payload size and serialization time of the globe's point cloud,
+as the figure app.globe_figure builds with float32 Plotly typed arrays
+(GLOBE_TRANSPORT=binary, the default, see transport.py) and with number
+lists (GLOBE_TRANSPORT=json), each also gzipped as a compressing proxy
+would send it.
+
+    python bench_pointcloud.py [--sizes 10000 100000]
+"""
+import argparse
+import gzip
+import time
+
+import numpy as np
+import pandas as pd
+from dash._utils import to_json
+
+from color_metrics import METRICS, DEFAULT_METRIC, metric_values, color_range, marker_style
+from labels import hover_customdata
+from transport import figure_column
+
+
+def synthetic_frame(n, rng):
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'x': rng.normal(0, 500, n), 'y': rng.normal(0, 500, n), 'z': rng.normal(0, 500, n),
+        'ESI': rng.uniform(0, 1, n),
+        'OrbitalPeriod': np.where(rng.uniform(size=n) < 0.1, np.nan, 10 ** rng.uniform(-1, 5, n)),
+        'Mass': 10 ** rng.uniform(-3, 1.5, n),
+        'Distance': rng.uniform(4, 3000, n),
+        'Explore': rng.integers(0, 2, n),
+    })
+
+
+# The globe figure app.py sends for every planet, in either transport
+def globe_figure(df, binary, metric=DEFAULT_METRIC):
+    from app import globe_figure
+    values = metric_values(df, metric)
+    cmin, cmax = color_range(values)
+    colors = {'name': METRICS[metric]['title'], 'color': figure_column(values, binary),
+              'marker': marker_style(metric, cmin, cmax)}
+    return globe_figure(df, None, colors, hover_customdata(df, binary), binary)
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def row(name, body, ms):
+    print(f"  {name:34s} {len(body) / 1024:10.1f} KiB  {ms:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        df = synthetic_frame(n, rng)
+        print(f"{n:,} planets")
+        for label, binary in [('float32 typed arrays', True), ('number lists', False)]:
+            body, ms = timed(lambda: to_json(globe_figure(df, binary)))
+            row(f'figure JSON, {label}', body, ms)
+            compressed, ms = timed(lambda: gzip.compress(body.encode(), compresslevel=5))
+            row('  gzip (compress only)', compressed, ms)
+
+
+if __name__ == '__main__':
+    main()
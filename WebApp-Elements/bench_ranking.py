@@ -0,0 +1,92 @@
+"""
+Benchmark: filtered top-K queries on the ScoreIndex (ranking.py) versus
+filtering and sorting the whole catalog each time, plus the cost of adding
+planets one batch at a time.
+
+    python bench_ranking.py [--planets 1000000] [--k 10]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ranking import ScoreIndex, composite_score
+
+QUERIES = {
+    'no filter': {},
+    'Distance < 100, Magnitude < 15': {'Distance': (None, 100), 'Magnitude': (None, 15)},
+    'Distance < 20 (rare)': {'Distance': (None, 20)},
+    'ESI >= 0.9, Mass < 0.01': {'ESI': (0.9, None), 'Mass': (None, 0.01)},
+}
+
+
+def synthetic_columns(n, start, rng):
+    columns = {
+        'id': np.arange(start, start + n),
+        'Distance': 10 ** rng.uniform(0.5, 4, n),
+        'Magnitude': rng.uniform(5, 20, n),
+        'ESI': rng.beta(2, 3, n),
+        'Radius': 10 ** rng.uniform(-1.3, 0.3, n),
+        'Mass': 10 ** rng.uniform(-3, 1, n),
+        'probability': rng.uniform(size=n),
+        'Explore': rng.integers(0, 2, n),
+        'Name': np.full(n, -1),  # codes into a name table; unused here
+    }
+    columns['score'] = composite_score(columns['probability'], columns['ESI'], columns['Distance'])
+    return columns
+
+
+def full_sort(columns, k, filters):
+    """Mask every planet, then sort all the matches."""
+    mask = np.ones(len(columns['id']), dtype=bool)
+    for column, (low, high) in filters.items():
+        if low is not None:
+            mask &= columns[column] >= low
+        if high is not None:
+            mask &= columns[column] < high
+    order = np.argsort(-columns['score'][mask], kind='stable')[:k]
+    return columns['id'][mask][order]
+
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=1_000_000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--batch', type=int, default=1000, help='planets per incremental insert')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = synthetic_columns(args.planets, 1, rng)
+    index = ScoreIndex()
+    _, ms = timed(lambda: (index.add(columns), index.rebuild()), repeat=1)
+    print(f"{args.planets:,} planets, k={args.k} (initial build {ms:.0f} ms)")
+
+    for label, filters in QUERIES.items():
+        expected, full_ms = timed(lambda: full_sort(columns, args.k, filters))
+        top, index_ms = timed(lambda: index.top_k(args.k, filters))
+        assert np.array_equal(top['id'], expected)
+        print(f"  {label:34s} full sort {full_ms:8.2f} ms   index {index_ms:7.3f} ms")
+
+    # Incremental inserts: most go to the pending buffer, a few trigger a rebuild
+    batches = [synthetic_columns(args.batch, args.planets + 1 + i * args.batch, rng) for i in range(50)]
+    start = time.perf_counter()
+    for batch in batches:
+        index.add(batch)
+    ms = (time.perf_counter() - start) * 1000 / len(batches)
+    _, query_ms = timed(lambda: index.top_k(args.k, QUERIES['Distance < 100, Magnitude < 15']))
+    print(f"  insert {args.batch} planets: {ms:.2f} ms per batch on average; "
+          f"query with {len(index.pending['id']):,} pending: {query_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
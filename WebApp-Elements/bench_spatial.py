@@ -0,0 +1,69 @@
+"""
+Benchmark: radius and k-nearest queries against the spatial index
+versus a linear scan, at 100k synthetic planets.
+
+    python bench_spatial.py [--points 100000] [--queries 1000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from coordinates import galactic_to_cartesian
+from spatial import PlanetIndex
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--radius', type=float, default=50.0)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.points
+    df = pd.DataFrame({'id': np.arange(1, n + 1), 'ESI': rng.uniform(0, 1, n), 'Explore': 0})
+    df['x'], df['y'], df['z'] = galactic_to_cartesian(rng.uniform(0, 360, n),
+                                                      np.degrees(np.arcsin(rng.uniform(-1, 1, n))),
+                                                      rng.uniform(1, 3000, n))
+    points = df[['x', 'y', 'z']].to_numpy()
+    habitable = points[df['ESI'].to_numpy() >= 0.9]
+
+    start = time.perf_counter()
+    index = PlanetIndex()
+    index.add_rows(df)
+    print(f"build {n:,} points: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Incremental inserts land in the pending buffer
+    extra = df.iloc[:500].assign(id=np.arange(n + 1, n + 501))
+    start = time.perf_counter()
+    index.add_rows(extra)
+    print(f"insert 500 points: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    centers = [tuple(p) for p in points[rng.integers(0, n, args.queries)]]
+
+    def scan_within(c):
+        d = np.linalg.norm(points - c, axis=1)
+        return np.flatnonzero(d <= args.radius)
+
+    def scan_nearest(c):
+        d = np.linalg.norm(habitable - c, axis=1)
+        return np.argpartition(d, args.k)[:args.k]
+
+    print(f"within {args.radius} ly: index {per_query_us(lambda c: index.within(args.radius, c), centers):8.1f} us/query, "
+          f"scan {per_query_us(scan_within, centers):8.1f} us/query")
+    print(f"{args.k} nearest habitable: index {per_query_us(lambda c: index.nearest_habitable(args.k, c), centers):8.1f} us/query, "
+          f"scan {per_query_us(scan_nearest, centers):8.1f} us/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: cold start of the web app, each run in a fresh interpreter
+against a throwaway database of synthetic planets.
+
+  1. no snapshot: STARTUP_SNAPSHOT=0 and only the .pkl model, so the first
+     import unpickles it with sklearn and the first figure reads every row
+  2. with the startup snapshot (python startup_snapshot.py), which also
+     writes the compiled .npz model next to the .pkl
+
+For each: wall-clock `import app`, time to the first globe figure (the
+callback a new browser tab makes, through Flask's test client), and which
+heavy modules were imported. Then the slowest of the imports app.py
+makes itself in the snapshot run, from python -X importtime.
+
+    python bench_startup.py [--planets 20000] [--model path/to/exoplanet_explore_model.pkl] [--runs 3]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from load_test import FIGURE_CALLBACK, synthetic_planets
+from model_server import DEFAULT_MODEL_PATH
+from store import ExoplanetStore
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ['sklearn', 'scipy.spatial', 'pandas', 'joblib']
+
+CHILD = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.server.test_client()
+response = client.post('/_dash-update-component', json={FIGURE_CALLBACK!r})
+assert response.status_code == 200, response.status_code
+ready = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'first_figure': ready - imported,
+                  'heavy': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def run_child(env):
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=HERE, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def report(label, env, runs, tmp):
+    # Every run gets its own shared cache, so figures left by an earlier run don't count
+    results = [run_child(dict(env, SHARED_CACHE_PATH=os.path.join(tmp, f'{label}-{i}_cache.db')))
+               for i in range(runs)]
+    import_s = np.median([r['import'] for r in results])
+    figure_s = np.median([r['first_figure'] for r in results])
+    heavy = ', '.join(results[-1]['heavy']) or 'none'
+    print(f"  {label:30s} {import_s * 1000:8.0f} {figure_s * 1000:10.1f} {(import_s + figure_s) * 1000:8.0f}  {heavy}")
+
+
+def slowest_imports(env, top):
+    """(cumulative seconds, module) for the slowest imports made directly by app.py."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=HERE, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    modules = []
+    for line in err.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 2:  # one level below app itself
+            modules.append((int(match.group(2)) / 1e6, match.group(4)))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=20_000)
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='trained .pkl (rule-based fallback if missing)')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters per case (median reported)')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   EXOPLANET_DB_PATH=os.path.join(tmp, 'bench.db'),
+                   SNAPSHOT_PATH=os.path.join(tmp, 'bench_snapshot.pkl'),
+                   EXPLORE_MODEL_PATH=os.path.join(tmp, 'model.pkl'))
+        store = ExoplanetStore(env['EXOPLANET_DB_PATH'])
+        store.create_table()
+        store.insert_many(synthetic_planets(args.planets, np.random.default_rng(0)))
+        store.close()
+        # A copy, so the first case starts without a compiled .npz next to it
+        if os.path.exists(args.model):
+            shutil.copy(args.model, env['EXPLORE_MODEL_PATH'])
+            model = 'trained model'
+        else:
+            model = 'no model file, rule-based fallback'
+        print(f"{args.planets:,} planets, {model}, median of {args.runs} runs")
+        print(f"  {'':30s} {'import ms':>8s} {'figure ms':>10s} {'total ms':>8s}  heavy modules imported")
+
+        report('no snapshot, .pkl model', dict(env, STARTUP_SNAPSHOT='0'), args.runs, tmp)
+
+        subprocess.run([sys.executable, 'startup_snapshot.py'], cwd=HERE, check=True, stdout=subprocess.DEVNULL,
+                       env=dict(env, SHARED_CACHE_PATH=os.path.join(tmp, 'write_cache.db')))
+        report('snapshot, compiled model', env, args.runs, tmp)
+
+        print("  slowest imports in app.py with the snapshot (python -X importtime, cumulative):")
+        for seconds, module in slowest_imports(dict(env, SHARED_CACHE_PATH=os.path.join(tmp, 'importtime_cache.db')),
+                                               args.top):
+            print(f"    {seconds * 1000:8.1f} ms  {module}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: read latency while another thread keeps inserting.
+
+Compares the old access pattern (a fresh sqlite3.connect per call, default
+rollback journal) with the pooled WAL store in store.py.
+
+    python bench_store.py [--seconds 3] [--readers 4] [--rows 5000]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from store import ExoplanetStore, CREATE_TABLE_SQL, EXOPLANET_COLUMNS, SELECT_ALL_SQL
+
+# The original seven-column insert, as the app ran it before store.py
+LEGACY_INSERT_SQL = f"INSERT INTO exoplanets ({', '.join(EXOPLANET_COLUMNS)}) VALUES ({', '.join('?' * len(EXOPLANET_COLUMNS))})"
+
+
+def sample_row(i):
+    return dict(zip(EXOPLANET_COLUMNS, (10 + i % 7, 4.2 + i % 300, 0.5 + (i % 50) / 100, 0.1, 0.01, 89.5, i % 2)))
+
+
+def legacy_values(row):
+    return tuple(row[col] for col in EXOPLANET_COLUMNS)
+
+
+# Old pattern: open/close a connection for every call, rollback journal
+def legacy_read(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(SELECT_ALL_SQL).fetchall()
+    conn.close()
+
+
+def legacy_insert(db_path, i):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(LEGACY_INSERT_SQL, legacy_values(sample_row(i)))
+    conn.commit()
+    conn.close()
+
+
+def seed_legacy(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.execute(CREATE_TABLE_SQL)
+    conn.executemany(LEGACY_INSERT_SQL, [legacy_values(sample_row(i)) for i in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+def seed_store(store, rows):
+    # Through the store's own insert path, so the rows match whatever INSERT_SQL currently expects
+    store.create_table()
+    store.insert_many([sample_row(i) for i in range(rows)])
+
+
+def run(read, insert, seconds, readers):
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+    inserts = [0]
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            insert(i)
+            i += 1
+        inserts[0] = i
+
+    def reader(out):
+        while not stop.is_set():
+            start = time.perf_counter()
+            read()
+            out.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(out,)) for out in latencies]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    lat = np.concatenate([np.asarray(out) for out in latencies]) * 1000
+    return len(lat), inserts[0], np.percentile(lat, 50), np.percentile(lat, 99), lat.max()
+
+
+def report(name, result, seconds):
+    reads, inserts, p50, p99, worst = result
+    print(f"{name:<22} reads/s {reads / seconds:>9.0f}  inserts/s {inserts / seconds:>7.0f}  "
+          f"read p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  max {worst:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        seed_legacy(legacy_path, args.rows)
+        result = run(lambda: legacy_read(legacy_path),
+                     lambda i: legacy_insert(legacy_path, i),
+                     args.seconds, args.readers)
+        report('connect-per-call', result, args.seconds)
+
+        store_path = os.path.join(tmp, 'store.db')
+        store = ExoplanetStore(store_path)
+        seed_store(store, args.rows)
+        result = run(lambda: store.connection().execute(SELECT_ALL_SQL).fetchall(),
+                     lambda i: store.insert(sample_row(i)),
+                     args.seconds, args.readers)
+        report('pooled WAL store', result, args.seconds)
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
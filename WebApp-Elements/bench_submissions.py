@@ -0,0 +1,126 @@
+"""
+Benchmark: bursty form submissions, handled synchronously (score + insert
+per planet, as the callback used to) versus through the micro-batching
+submission queue.
+
+Latency is measured from submission until the planet is committed; for the
+queue the callback itself only pays the enqueue, reported separately.
+"queued" clients wait for each ticket before sending the next planet;
+"queued burst" clients fire everything at once (as Dash callbacks do, since
+they return after the enqueue) and the clock stops when the queue drains.
+
+    python bench_submissions.py [--clients 16] [--per-client 50] [--model PATH]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from model_server import ExploreModel, DEFAULT_MODEL_PATH
+from store import ExoplanetStore
+from submission_queue import SubmissionQueue
+
+
+def random_planet(rng):
+    return {
+        'Magnitude': float(rng.uniform(8, 16)),
+        'Distance': float(rng.uniform(4, 3000)),
+        'ESI': float(rng.uniform(0.2, 1)),
+        'Radius': float(rng.uniform(0.05, 2)),
+        'Mass': float(rng.uniform(0.01, 3)),
+        'Inclination': float(rng.uniform(80, 90)),
+    }
+
+
+def run(clients, per_client, handle):
+    """Each client thread fires per_client submissions back to back; handle returns the enqueue time."""
+    latencies = [[] for _ in range(clients)]
+    enqueue = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(i):
+        rng = np.random.default_rng(i)
+        planets = [random_planet(rng) for _ in range(per_client)]
+        barrier.wait()
+        for planet in planets:
+            start = time.perf_counter()
+            enqueue[i].append(handle(planet) - start)
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, np.concatenate(latencies) * 1000, np.concatenate(enqueue) * 1000
+
+
+def report(name, total, result):
+    elapsed, latency, enqueue = result
+    print(f"{name:12s} {total / elapsed:8.0f} planets/s   latency p50 {np.percentile(latency, 50):7.2f} ms"
+          f"  p99 {np.percentile(latency, 99):7.2f} ms   callback p99 {np.percentile(enqueue, 99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--per-client', type=int, default=50)
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+    total = args.clients * args.per_client
+    model = ExploreModel(args.model)
+    print(f"{total} submissions from {args.clients} clients, model version {model.version}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ExoplanetStore(os.path.join(tmp, 'sync.db'))
+        store.create_table()
+
+        def synchronous(planet):
+            planet['Explore'] = int(model.predict_many([planet])[0])
+            store.insert(planet)
+            return time.perf_counter()
+
+        report('synchronous', total, run(args.clients, args.per_client, synchronous))
+        assert store.count() == total
+
+        store = ExoplanetStore(os.path.join(tmp, 'queue.db'))
+        store.create_table()
+        submissions = SubmissionQueue(store=store, model=model)
+
+        def queued(planet):
+            ticket = submissions.submit(planet)
+            enqueued = time.perf_counter()
+            assert submissions.wait(ticket)['state'] == 'done'
+            return enqueued
+
+        report('queued', total, run(args.clients, args.per_client, queued))
+        assert store.count() == total
+        print(f"queue: {submissions.batches} batches, {submissions.processed / submissions.batches:.1f} planets per batch")
+
+        store = ExoplanetStore(os.path.join(tmp, 'burst.db'))
+        store.create_table()
+        submissions = SubmissionQueue(store=store, model=model)
+        tickets = []
+
+        def burst(planet):
+            tickets.append(submissions.submit(planet))
+            return time.perf_counter()
+
+        elapsed, _, enqueue = run(args.clients, args.per_client, burst)
+        drain_start = time.perf_counter()
+        statuses = [submissions.wait(ticket) for ticket in tickets]
+        elapsed += time.perf_counter() - drain_start
+        latency = np.array([s['finished'] - s['submitted'] for s in statuses]) * 1000
+        report('queued burst', total, (elapsed, latency, enqueue))
+        assert store.count() == total
+        print(f"queue: {submissions.batches} batches, {submissions.processed / submissions.batches:.1f} planets per batch")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import sys
+
+import numpy as np
+
+# One record per planet. float32 wherever the values are only plotted or binned;
+# ESI stays float64 because it is compared against thresholds (0.9 is not exact in float32).
+# Name and DiscoveryMethod are int codes into shared string tables (-1 = missing).
+CATALOG_DTYPE = np.dtype([
+    ('id', '<u4'),
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('ESI', '<f8'),
+    ('Magnitude', '<f4'), ('Distance', '<f4'), ('Radius', '<f4'), ('Mass', '<f4'), ('Inclination', '<f4'),
+    ('Longitude', '<f4'), ('Latitude', '<f4'),
+    ('OrbitalPeriod', '<f4'), ('Eccentricity', '<f4'),
+    ('Explore', 'i1'),
+    ('Name', '<i4'), ('DiscoveryMethod', '<i2'),
+])
+STRING_COLUMNS = ['Name', 'DiscoveryMethod']
+MISSING_CODE = -1
+
+
+def as_entered(values):
+    """
+    float32 catalog values as float64 via their shortest decimal form, so 31.2
+    comes back as 31.2 rather than 31.200000762939453 (what astype(float64) gives).
+    Goes through strings, so keep it to result-sized arrays.
+    """
+    return np.asarray(values, dtype=np.float32).astype(str).astype(np.float64)
+
+
+class StringTable:
+    """Append-only table of interned strings; each distinct value is stored once."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, strings):
+        codes = np.empty(len(strings), dtype=np.int64)
+        for i, value in enumerate(strings):
+            if value is None:
+                codes[i] = MISSING_CODE
+                continue
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(sys.intern(value))
+            codes[i] = code
+        return codes
+
+    def decode(self, codes):
+        table = np.array(self.values + [None], dtype=object)
+        # MISSING_CODE (-1) indexes the trailing None
+        return table[codes]
+
+    def nbytes(self):
+        return sys.getsizeof(self.values) + sum(sys.getsizeof(value) for value in self.values)
+
+
+class PlanetCatalog:
+    """
+    Read-only planet table shared by every callback: one contiguous
+    structured array (see CATALOG_DTYPE) plus the string tables.
+    Supports the small part of the DataFrame interface the app uses:
+    catalog['ESI'] (a read-only array view), 'ESI' in catalog, len(),
+    .empty and .take(positions).
+    """
+
+    def __init__(self, rows, strings):
+        rows.flags.writeable = False
+        self.rows = rows
+        self.strings = strings
+
+    @classmethod
+    def empty_catalog(cls, strings=None):
+        strings = strings or {name: StringTable() for name in STRING_COLUMNS}
+        return cls(np.zeros(0, dtype=CATALOG_DTYPE), strings)
+
+    @classmethod
+    def from_rows(cls, names, rows, strings=None):
+        """Build from DB rows (tuples, with column names) without going through pandas."""
+        catalog = cls.empty_catalog(strings)
+        records = np.zeros(len(rows), dtype=CATALOG_DTYPE)
+        if rows:
+            columns = dict(zip(names, zip(*rows)))
+            for field in CATALOG_DTYPE.names:
+                if field not in columns:
+                    if field in STRING_COLUMNS or field == 'Explore':
+                        records[field] = MISSING_CODE
+                    else:
+                        records[field] = np.nan
+                elif field in STRING_COLUMNS:
+                    records[field] = catalog.strings[field].encode(columns[field])
+                elif field == 'Explore':
+                    values = np.array(columns[field], dtype=np.float64)  # None -> NaN
+                    records[field] = np.where(np.isnan(values), MISSING_CODE, values)
+                else:
+                    records[field] = np.array(columns[field], dtype=np.float64)
+        return cls(records, catalog.strings)
+
+    def to_snapshot(self):
+        """(rows, {column: strings}) in plain types for pickling; see from_snapshot."""
+        return self.rows, {name: list(table.values) for name, table in self.strings.items()}
+
+    @classmethod
+    def from_snapshot(cls, rows, strings):
+        tables = {}
+        for name, values in strings.items():
+            tables[name] = StringTable()
+            tables[name].encode(values)  # codes come back in the same order
+        return cls(np.require(rows, dtype=CATALOG_DTYPE, requirements='C'), tables)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, column):
+        return column in CATALOG_DTYPE.names
+
+    def __getitem__(self, column):
+        if column in STRING_COLUMNS:
+            return self.strings[column].decode(self.rows[column])
+        return self.rows[column]
+
+    @property
+    def columns(self):
+        return list(CATALOG_DTYPE.names)
+
+    @property
+    def empty(self):
+        return len(self.rows) == 0
+
+    def take(self, positions):
+        return PlanetCatalog(self.rows[positions], self.strings)
+
+    def append(self, other):
+        """New catalog with other's rows after these (both must share the string tables)."""
+        if other.empty:
+            return self
+        return PlanetCatalog(np.concatenate([self.rows, other.rows]), self.strings)
+
+    def nbytes(self):
+        """Array bytes plus the string tables (shared across catalog versions)."""
+        return self.rows.nbytes + sum(table.nbytes() for table in self.strings.values())
@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+
+from transport import figure_column
+
+# What the ESI / Orbital Period / Mass buttons color the globe by.
+# Periods and masses span several orders of magnitude, so they are colored on a log scale.
+METRICS = {
+    'ESI': {
+        'column': 'ESI',
+        'title': 'ESI (1 = green, 0 = red)',
+        'colorscale': [[0, 'red'], [1, 'green']],
+        'log': False,
+    },
+    'OrbitalPeriod': {
+        'column': 'OrbitalPeriod',
+        'title': 'Orbital Period (log10 days)',
+        'colorscale': 'Viridis',
+        'log': True,
+    },
+    'Mass': {
+        'column': 'Mass',
+        'title': 'Mass (log10 Jupiter masses)',
+        'colorscale': 'Plasma',
+        'log': True,
+    },
+}
+BUTTON_METRICS = {'button-1': 'ESI', 'button-2': 'OrbitalPeriod', 'button-3': 'Mass'}
+DEFAULT_METRIC = 'ESI'
+
+
+def metric_values(df, metric):
+    """
+    Float array to color by; NaN where the planet has no (or no positive, for log) value.
+    df may also be a dict of arrays (an unpacked point cloud).
+    """
+    spec = METRICS[metric]
+    if spec['column'] not in df:
+        return np.full(len(df['x'] if isinstance(df, dict) else df), np.nan)
+    values = np.asarray(df[spec['column']], dtype=np.float64)
+    if spec['log']:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(values > 0, np.log10(values), np.nan)
+    return values
+
+
+def all_metric_values(df):
+    """(n_rows, n_metrics) array, one column per metric in METRICS order."""
+    return np.column_stack([metric_values(df, metric) for metric in METRICS])
+
+
+def color_list(values):
+    """Plain list for the figure (so Patch can extend it); NaN is sent to the browser as null."""
+    return np.asarray(values, dtype=np.float64).tolist()
+
+
+def color_range(values):
+    if np.isnan(values).all():
+        return 0.0, 1.0
+    return float(np.nanmin(values)), float(np.nanmax(values))
+
+
+def marker_style(metric, cmin, cmax):
+    """Everything about the marker that changes with the metric, apart from the colors."""
+    spec = METRICS[metric]
+    return dict(colorscale=spec['colorscale'], cmin=cmin, cmax=cmax, showscale=True,
+                colorbar=dict(title=dict(text=spec['title'])))
+
+
+class MetricColors:
+    """
+    Color arrays for each metric over the frame cache's catalog,
+    as plain lists or typed arrays depending on GLOBE_TRANSPORT.
+    Computed once per metric per frame: the frame cache swaps in a new
+    catalog whenever planets are inserted or changed, which drops these.
+    Switching metrics on an unchanged catalog is then a dictionary lookup.
+    """
+
+    def __init__(self):
+        self.df = None
+        self._colors = {}  # metric -> (figure colors, cmin, cmax)
+        self._lock = threading.Lock()
+
+    def get(self, df, metric):
+        with self._lock:
+            if df is not self.df:
+                self.df = df
+                self._colors = {}
+            if metric not in self._colors:
+                values = metric_values(df, metric)
+                self._colors[metric] = (figure_column(values), *color_range(values))
+            return self._colors[metric]
+
+
+def metric_payload(df, detail=None, density=None):
+    """
+    Colors of every metric for the points (and density bins) on screen, sent
+    to the browser alongside the figure so the metric buttons can recolor it
+    without a server round trip. density['value'] has one column per metric.
+    """
+    colors = get_metric_colors()
+    payload = {}
+    for i, metric in enumerate(METRICS):
+        full, cmin, cmax = colors.get(df, metric)
+        payload[metric] = {
+            'name': METRICS[metric]['title'],
+            'color': full if detail is None or detail is df else figure_column(metric_values(detail, metric)),
+            'density': None if density is None else figure_column(density['value'][:, i]),
+            'marker': marker_style(metric, cmin, cmax),
+        }
+    return payload
+
+
+_colors = None
+_colors_lock = threading.Lock()
+
+
+# Shared per-metric colors used by the globe callbacks
+def get_metric_colors():
+    global _colors
+    if _colors is None:
+        with _colors_lock:
+            if _colors is None:
+                _colors = MetricColors()
+    return _colors
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def galactic_to_cartesian(longitude, latitude, distance, dtype=np.float64):
+    """
+    Galactic (l, b, d) -> heliocentric (x, y, z) in the units of distance.
+    longitude/latitude are in degrees; all inputs may be scalars or arrays.
+    Works in a single vectorized pass and returns three arrays of dtype.
+    """
+    l = np.deg2rad(np.asarray(longitude, dtype=dtype))
+    b = np.deg2rad(np.asarray(latitude, dtype=dtype))
+    d = np.asarray(distance, dtype=dtype)
+
+    # cos(b) is shared by x and y, so compute it once
+    d_cos_b = d * np.cos(b)
+    x = d_cos_b * np.cos(l)
+    y = d_cos_b * np.sin(l)
+    z = d * np.sin(b)
+    return x, y, z
+
+
+def inclination_to_cartesian(distance, inclination, dtype=np.float64):
+    """
+    Projection the web app has always used for planets entered through the
+    form, which carry no sky position: inclination as the angle, distance as z.
+    """
+    angle = np.deg2rad(np.asarray(inclination, dtype=dtype))
+    d = np.asarray(distance, dtype=dtype)
+    return d * np.cos(angle), d * np.sin(angle), d.copy()
+
+
+def cartesian_columns(distance, inclination, longitude=None, latitude=None, dtype=np.float64):
+    """
+    x, y, z for a batch of planets. Rows with a galactic position use it;
+    rows without one (NaN/None longitude or latitude) fall back to the
+    inclination projection.
+    """
+    distance = np.asarray(distance, dtype=dtype)
+    x, y, z = inclination_to_cartesian(distance, inclination, dtype=dtype)
+    if longitude is None or latitude is None:
+        return x, y, z
+
+    longitude = np.asarray(longitude, dtype=dtype)
+    latitude = np.asarray(latitude, dtype=dtype)
+    has_position = ~(np.isnan(longitude) | np.isnan(latitude))
+    if has_position.any():
+        gx, gy, gz = galactic_to_cartesian(longitude[has_position], latitude[has_position],
+                                           distance[has_position], dtype=dtype)
+        x[has_position] = gx
+        y[has_position] = gy
+        z[has_position] = gz
+    return x, y, z
@@ -0,0 +1,81 @@
+"""
+Counts the server callbacks each UI interaction causes, following the same
+chain the Dash renderer does: a callback fires when one of its inputs
+changes, and every output it writes can trigger further callbacks.
+
+Checks that view toggling, camera presets, metric recoloring and orbit
+play/pause stay in the browser (zero server callbacks). Exits non-zero if
+one of them would reach the Python server.
+
+    python count_callbacks.py
+"""
+import sys
+
+from app import app
+
+# Interactions that must be handled entirely by clientside callbacks
+CLIENTSIDE_ONLY = [
+    'toggle-view.n_clicks',
+    'camera-preset.value',
+    'button-1.n_clicks',
+    'button-2.n_clicks',
+    'button-3.n_clicks',
+    'orbit-play.n_clicks',
+]
+# Interactions that are expected to reach the server, listed for comparison
+SERVER_INTERACTIONS = [
+    'interval-component.n_intervals',
+    'submit-exoplanet.n_clicks',
+    'exoplanet-table.page_current',
+    'nearby-search.n_clicks',
+    'rank-search.n_clicks',
+    'orbit-interval.n_intervals',
+]
+
+
+def prop_ids(dependencies):
+    return {f"{d['id']}.{d['property']}" for d in dependencies}
+
+
+def output_ids(callback):
+    # Multi-output keys look like '..a.b...c.d..'; allow_duplicate outputs carry an '@hash'
+    outputs = callback['output'].strip('.').split('...')
+    return {output.split('@')[0] for output in outputs}
+
+
+def triggered_callbacks(changed, callbacks):
+    """Every callback fired, directly or through chained outputs, when changed changes."""
+    fired = []
+    pending = [changed]
+    seen = {changed}
+    while pending:
+        prop = pending.pop()
+        for callback in callbacks:
+            if prop in prop_ids(callback['inputs']) and callback not in fired:
+                fired.append(callback)
+                for output in output_ids(callback) - seen:
+                    seen.add(output)
+                    pending.append(output)
+    return fired
+
+
+def main():
+    callbacks = app._callback_list
+    failed = False
+    print(f"{'interaction':34s} {'server':>6s} {'clientside':>10s}")
+    for interaction in CLIENTSIDE_ONLY + SERVER_INTERACTIONS:
+        fired = triggered_callbacks(interaction, callbacks)
+        server = [c for c in fired if not c.get('clientside_function')]
+        clientside = len(fired) - len(server)
+        print(f"{interaction:34s} {len(server):6d} {clientside:10d}")
+        if interaction in CLIENTSIDE_ONLY and server:
+            failed = True
+            for callback in server:
+                print(f"    reaches the server via {callback['output']}")
+    if failed:
+        sys.exit('Some view interactions still make server callbacks')
+    print('View toggling, camera presets, recoloring and orbit play/pause make no server callbacks')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+
+from catalog import PlanetCatalog
+from store import get_store
+
+
+class ExoplanetFrameCache:
+    """
+    Long-lived copy of the exoplanet table, held as a compact PlanetCatalog
+    (see catalog.py) that all callbacks share read-only.
+    refresh() only asks the database for rows past the last id it has seen
+    and appends them, so an interval tick costs one indexed range query
+    instead of a full SELECT *. x/y/z come precomputed from the store.
+    When existing rows are modified (e.g. a catalog re-import) the store's
+    generation changes and the cache reloads everything once.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.catalog = None
+        self.last_id = 0
+        self.generation = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        store = self.store or get_store()
+        with self._lock:
+            generation = store.generation()
+            if generation != self.generation:
+                self.catalog = None
+                self.last_id = 0
+                self.generation = generation
+            names, rows = store.fetch_rows_since(self.last_id)
+            if self.catalog is None:
+                self.catalog = PlanetCatalog.from_rows(names, rows)
+            elif rows:
+                # New rows share the string tables, so names already seen are not stored again
+                self.catalog = self.catalog.append(PlanetCatalog.from_rows(names, rows, self.catalog.strings))
+            if len(self.catalog):
+                self.last_id = int(self.catalog['id'][-1])
+            return self.catalog
+
+    def seed(self, catalog, generation):
+        """
+        Start from a catalog loaded elsewhere (the startup snapshot, see
+        startup_snapshot.py); refresh() then only fetches rows added since.
+        """
+        with self._lock:
+            self.catalog = catalog
+            self.generation = generation
+            self.last_id = int(catalog['id'][-1]) if len(catalog) else 0
+
+    def rows_after(self, last_id):
+        """Cached rows a client that has seen everything up to last_id is missing."""
+        catalog = self.refresh()
+        if last_id is None or last_id <= 0:
+            return catalog
+        # ids are appended in increasing order, so a binary search finds the split point
+        start = int(np.searchsorted(catalog['id'], last_id, side='right'))
+        return catalog.take(slice(start, None))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# Shared frame cache used by the Dash callbacks
+def get_frame_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExoplanetFrameCache()
+    return _cache
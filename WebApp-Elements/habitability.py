@@ -0,0 +1,166 @@
+"""
+Earth Similarity Index and related habitability scores, computed from
+physical parameters over whole columns at once (NumPy, no per-planet loop).
+
+The ESI stored for a planet is the radius/stellar-flux form the PHL uses for
+the catalog this repo's CSVs come from, so computed values line up with the
+given ones (and the ESI >= 0.9 explore rule):
+
+    ESI = 1 - sqrt(((S - 1) / (S + 1))^2 / 2 + ((R - 1) / (R + 1))^2 / 2)
+
+Without a flux it falls back to the interior ESI. The full Schulze-Makuch
+et al. (2011) scores are returned alongside, each property x compared with
+Earth's x0 as
+
+    ESI_x = (1 - |x - x0| / (x + x0)) ** (w_x / n)
+
+  interior ESI   radius and bulk density
+  surface ESI    escape velocity and temperature
+  global ESI     sqrt(interior * surface)
+
+Radius and mass come in
+Jupiter units (as in the catalog); everything else is in Earth/Sun units
+apart from temperatures (K). The temperature compared is the equilibrium
+temperature, against Earth's 255 K.
+
+Flux is only estimated from the orbital period when the host star's
+luminosity is known: most catalog hosts are M dwarfs, and assuming a
+Sun-like star would overstate their planets' flux a hundredfold.
+"""
+import numpy as np
+
+JUPITER_RADIUS_EARTH = 11.209
+JUPITER_MASS_EARTH = 317.83
+EARTH_EQUILIBRIUM_TEMPERATURE = 255.0  # K, with Earth's 0.3 albedo
+EARTH_ALBEDO = 0.3
+
+# ESI weight exponents per property (Schulze-Makuch et al. 2011, table 1)
+ESI_WEIGHTS = {'radius': 0.57, 'density': 1.07, 'escape_velocity': 0.70, 'temperature': 5.58}
+
+# Which formula produced each ESI value (see esi_scores)
+ESI_METHODS = ['radius_flux', 'interior']
+
+
+def _array(values):
+    if values is None:
+        return None
+    return np.asarray(values, dtype=np.float64)
+
+
+def similarity(x, reference, weight, n):
+    """One ESI factor: (1 - |x - x0| / (x + x0)) ** (weight / n), NaN where x is missing."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (1 - np.abs(x - reference) / (x + reference)) ** (weight / n)
+
+
+def radius_from_mass(mass_earth):
+    """
+    Radius in Earth radii from mass in Earth masses, for planets measured by
+    radial velocity only (Chen & Kipping 2017 power laws).
+    """
+    mass_earth = _array(mass_earth)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rocky = mass_earth ** 0.279
+        neptunian = 1.008 * 2.04 ** 0.279 * (mass_earth / 2.04) ** 0.589
+        jovian = 1.008 * 2.04 ** 0.279 * (132 / 2.04) ** 0.589 * (mass_earth / 132) ** -0.044
+    return np.where(mass_earth < 2.04, rocky, np.where(mass_earth < 132, neptunian, jovian))
+
+
+def flux_from_period(period_days, stellar_mass, stellar_luminosity):
+    """
+    Stellar flux in Earth units, S = L / a^2, with a [AU] from Kepler's third
+    law: a^3 = M* P^2 (P in years, M* and L in solar units).
+    """
+    years = _array(period_days) / 365.25
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = (_array(stellar_mass) * years ** 2) ** (1 / 3)
+        return _array(stellar_luminosity) / a ** 2
+
+
+def equilibrium_temperature(flux, albedo=EARTH_ALBEDO):
+    """Equilibrium temperature (K) for a stellar flux in Earth units."""
+    flux = _array(flux)
+    with np.errstate(invalid='ignore'):
+        return EARTH_EQUILIBRIUM_TEMPERATURE * (flux * (1 - albedo) / (1 - EARTH_ALBEDO)) ** 0.25
+
+
+def esi_scores(radius=None, mass=None, flux=None, temperature=None, period=None,
+               stellar_mass=None, stellar_luminosity=None):
+    """
+    Habitability scores for arrays of planets (any argument may be None or contain NaN).
+
+    radius, mass: Jupiter units; flux: Earth units; temperature: equilibrium
+    temperature in K; period: orbital period in days, used with the host's
+    mass and luminosity (solar units; mass defaults to 1) to estimate a
+    missing flux.
+
+    Returns a dict of arrays: ESI (radius/flux, else interior, see 'method'),
+    ESI_radius_flux, ESI_interior, ESI_surface, ESI_global, plus the derived
+    radius/mass/density/escape velocity (Earth units), flux and temperature.
+    """
+    columns = [_array(c) for c in (radius, mass, flux, temperature, period, stellar_mass, stellar_luminosity)]
+    n = max((len(c) for c in columns if c is not None), default=0)
+    radius, mass, flux, temperature, period, stellar_mass, stellar_luminosity = (
+        np.full(n, np.nan) if c is None else c for c in columns)
+    stellar_mass = np.where(np.isnan(stellar_mass), 1.0, stellar_mass)
+
+    radius_e = radius * JUPITER_RADIUS_EARTH
+    mass_e = mass * JUPITER_MASS_EARTH
+    radius_e = np.where(np.isnan(radius_e), radius_from_mass(mass_e), radius_e)
+    flux = np.where(np.isnan(flux), flux_from_period(period, stellar_mass, stellar_luminosity), flux)
+    temperature = np.where(np.isnan(temperature), equilibrium_temperature(flux), temperature)
+    # Flux back from temperature when only the temperature was given
+    flux = np.where(np.isnan(flux), (temperature / EARTH_EQUILIBRIUM_TEMPERATURE) ** 4, flux)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        density = mass_e / radius_e ** 3
+        escape_velocity = np.sqrt(mass_e / radius_e)
+
+    interior = (similarity(radius_e, 1.0, ESI_WEIGHTS['radius'], 2) *
+                similarity(density, 1.0, ESI_WEIGHTS['density'], 2))
+    surface = (similarity(escape_velocity, 1.0, ESI_WEIGHTS['escape_velocity'], 2) *
+               similarity(temperature, EARTH_EQUILIBRIUM_TEMPERATURE, ESI_WEIGHTS['temperature'], 2))
+    global_esi = np.sqrt(interior * surface)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        radius_flux = 1 - np.sqrt(0.5 * ((flux - 1) / (flux + 1)) ** 2 + 0.5 * ((radius_e - 1) / (radius_e + 1)) ** 2)
+
+    method = np.select([~np.isnan(radius_flux), ~np.isnan(interior)], [0, 1], default=-1).astype(np.int8)
+    esi = np.select([method == 0, method == 1], [radius_flux, interior], default=np.nan)
+    return {
+        'ESI': esi,
+        'method': method,  # index into ESI_METHODS, -1 if nothing could be computed
+        'ESI_radius_flux': radius_flux,
+        'ESI_interior': interior,
+        'ESI_surface': surface,
+        'ESI_global': global_esi,
+        'radius': radius_e,
+        'mass': mass_e,
+        'density': density,
+        'escape_velocity': escape_velocity,
+        'flux': flux,
+        'temperature': temperature,
+    }
+
+
+def compute_esi(radius=None, mass=None, flux=None, temperature=None, period=None,
+                stellar_mass=None, stellar_luminosity=None):
+    """ESI only (NaN where nothing could be computed), rounded to the catalog's two decimals."""
+    scores = esi_scores(radius, mass, flux, temperature, period, stellar_mass, stellar_luminosity)
+    return np.round(scores['ESI'], 2)
+
+
+# DataFrame columns read by fill_missing_esi, in compute_esi's argument order
+ESI_INPUT_COLUMNS = ['Radius', 'Mass', 'Insolation', 'EqTemperature', 'OrbitalPeriod',
+                     'StellarMass', 'StellarLuminosity']
+
+
+def fill_missing_esi(df):
+    """Fill NaN/absent ESI in a DataFrame from the ESI_INPUT_COLUMNS it has."""
+    esi = np.array(df['ESI'], dtype=np.float64) if 'ESI' in df else np.full(len(df), np.nan)
+    missing = np.isnan(esi)
+    if missing.any():
+        def column(name):
+            return df[name].to_numpy(dtype=np.float64)[missing] if name in df else None
+        esi[missing] = compute_esi(*(column(name) for name in ESI_INPUT_COLUMNS))
+        df['ESI'] = esi
+    return df
@@ -0,0 +1,189 @@
+"""
+Bulk loader for exoplanet catalogs (the repo's ESI-sorted CSVs or a NASA
+Exoplanet Archive export, as CSV or Parquet) into the exoplanet database.
+
+Files are streamed in chunks, mapped onto the DB schema, missing ESI values
+are computed from the physical parameters (habitability.py), rows are scored
+with the explore model one chunk at a time and upserted by planet name
+inside a single transaction. With --only-changed, rows identical to the
+planet already stored under the same name are dropped before scoring, so
+re-importing a mostly unchanged catalog only writes what changed (this is
+how archive_sync.py applies a fresh archive download).
+
+    python ingest.py "Exoplanets Info - Exoplanet_Data_Sorted_by_ESI (2).csv"
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from habitability import fill_missing_esi
+from model_server import get_model
+from store import get_store, INPUT_COLUMNS
+
+# Headers used by the CSVs in this repo -> DB columns
+CSV_COLUMN_MAP = {
+    'Exoplanet': 'Name',
+    'ESI': 'ESI',
+    'Distance': 'Distance',
+    'Distance (ly)': 'Distance',
+    'Mass (Compared to Jupiter)': 'Mass',
+    'Radius compared to Jupiter': 'Radius',
+    'Incline Angle(deg)': 'Inclination',
+    'Magnitude': 'Magnitude',
+    'Eccentricity': 'Eccentricity',
+    'Orbital Period (days)': 'OrbitalPeriod',
+    'Discovery Method': 'DiscoveryMethod',
+    'Longitude': 'Longitude',
+    'Latitude': 'Latitude',
+    'Galactic Longitude': 'Longitude',
+    'Galactic Latitude': 'Latitude',
+    'Explore': 'Explore',
+}
+
+# NASA Exoplanet Archive (pscomppars) column names -> DB columns
+ARCHIVE_COLUMN_MAP = {
+    'pl_name': 'Name',
+    'sy_dist': 'Distance',       # parsecs, converted below
+    'pl_bmassj': 'Mass',
+    'pl_radj': 'Radius',
+    'pl_orbincl': 'Inclination',
+    'sy_vmag': 'Magnitude',
+    'pl_orbeccen': 'Eccentricity',
+    'pl_orbper': 'OrbitalPeriod',
+    'discoverymethod': 'DiscoveryMethod',
+    'glon': 'Longitude',
+    'glat': 'Latitude',
+    # Only used to compute missing ESI values, not stored
+    'pl_insol': 'Insolation',
+    'pl_eqt': 'EqTemperature',
+    'st_mass': 'StellarMass',
+    'st_lum': 'StellarLuminosity',  # log10(L / Lsun), converted below
+}
+PARSEC_TO_LY = 3.26156
+
+DEFAULT_CHUNKSIZE = 5000
+
+# Columns compared to decide whether an imported row changed (Explore is
+# recomputed from the others)
+DIFF_COLUMNS = [col for col in INPUT_COLUMNS if col not in ('Name', 'Explore')]
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most chunksize rows without loading the whole file."""
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq  # only needed for Parquet input
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        # Archive exports start with '#' comment lines describing the columns
+        yield from pd.read_csv(path, chunksize=chunksize, comment='#')
+
+
+def normalize_chunk(chunk):
+    """Rename a raw chunk onto the DB schema and convert units."""
+    if 'pl_name' in chunk.columns:
+        chunk = chunk.rename(columns=ARCHIVE_COLUMN_MAP)
+        chunk['Distance'] = chunk['Distance'] * PARSEC_TO_LY
+        if 'StellarLuminosity' in chunk:
+            chunk['StellarLuminosity'] = 10 ** chunk['StellarLuminosity']
+    else:
+        chunk = chunk.rename(columns=CSV_COLUMN_MAP)
+    chunk = chunk.loc[:, ~chunk.columns.duplicated()]
+
+    # Planets are upserted by name, so unnamed rows can't be matched on re-import
+    chunk = chunk[chunk['Name'].notna()].copy()
+    chunk['Name'] = chunk['Name'].astype(str).str.strip()
+    return chunk
+
+
+def score_explore(chunk, model=None, keep_explore=False):
+    """Fill the Explore column for a whole chunk with one model call."""
+    model = model or get_model()
+    # Missing values stay NaN; the model fills them with its training fill values
+    features = pd.DataFrame({field: chunk[field] if field in chunk else np.nan for field in model.app_fields})
+    predictions = model.predict_many(features.astype(float))
+    if keep_explore and 'Explore' in chunk:
+        chunk['Explore'] = chunk['Explore'].fillna(pd.Series(predictions, index=chunk.index)).astype(int)
+    else:
+        chunk['Explore'] = predictions
+    return chunk
+
+
+def changed_rows(chunk, existing):
+    """
+    Mask of chunk rows that are new or differ from existing (store.fetch_named)
+    in any DIFF_COLUMNS. A column the chunk lacks would be written as NULL,
+    so it only matches a NULL.
+    """
+    old = existing.reindex(chunk['Name'])  # all-NaN rows for names not stored yet
+    changed = ~chunk['Name'].isin(existing.index).to_numpy()
+    for column in DIFF_COLUMNS:
+        new_values = chunk[column].to_numpy() if column in chunk else np.full(len(chunk), None, dtype=object)
+        old_values = old[column].to_numpy()
+        same = (pd.isna(new_values) & pd.isna(old_values)) | (new_values == old_values)
+        changed |= ~same
+    return changed
+
+
+def ingest_file(path, store=None, model=None, chunksize=DEFAULT_CHUNKSIZE, keep_explore=False,
+                only_changed=False):
+    """
+    Stream a catalog file into the database in one transaction.
+    With only_changed, rows that match what is already stored are left out.
+    Returns a dict with rows read, inserted, updated, unchanged and skipped.
+    """
+    store = store or get_store()
+    store.create_table()
+    totals = {'read': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'esi_computed': 0}
+
+    with store.transaction() as conn:
+        existing = store.fetch_named(conn) if only_changed else None
+        for raw in iter_chunks(path, chunksize):
+            chunk = normalize_chunk(raw)
+            totals['read'] += len(raw)
+            totals['skipped'] += len(raw) - len(chunk)
+            if chunk.empty:
+                continue
+            # The same planet can appear twice in an export; the last row wins
+            chunk = chunk.drop_duplicates('Name', keep='last')
+            missing_esi = int(chunk['ESI'].isna().sum()) if 'ESI' in chunk else len(chunk)
+            chunk = fill_missing_esi(chunk)
+            totals['esi_computed'] += missing_esi - int(chunk['ESI'].isna().sum())
+            if existing is not None:
+                changed = changed_rows(chunk, existing)
+                totals['unchanged'] += int(np.count_nonzero(~changed))
+                chunk = chunk[changed]
+                if chunk.empty:
+                    continue
+            chunk = score_explore(chunk, model, keep_explore)
+            inserted, updated = store.upsert_many(chunk, conn)
+            totals['inserted'] += inserted
+            totals['updated'] += updated
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load exoplanet catalogs into the database')
+    parser.add_argument('paths', nargs='+', help='CSV or Parquet files')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--keep-explore', action='store_true',
+                        help="Use the file's Explore values where present instead of rescoring")
+    parser.add_argument('--only-changed', action='store_true',
+                        help='Skip rows identical to the stored planet of the same name')
+    args = parser.parse_args()
+
+    for path in args.paths:
+        start = time.perf_counter()
+        totals = ingest_file(path, chunksize=args.chunksize, keep_explore=args.keep_explore,
+                             only_changed=args.only_changed)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {totals['read']} rows read, {totals['inserted']} inserted, "
+              f"{totals['updated']} updated, {totals['unchanged']} unchanged, {totals['skipped']} skipped, "
+              f"{totals['esi_computed']} ESI values computed "
+              f"in {elapsed:.2f}s ({totals['read'] / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
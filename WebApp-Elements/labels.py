@@ -0,0 +1,22 @@
+import numpy as np
+
+from transport import figure_column
+
+# Hover text is formatted by Plotly in the browser from customdata,
+# so the server only ships numbers instead of one pre-formatted string per planet.
+# Distance comes from the catalog's float32 column: 6 significant digits with
+# trailing zeros trimmed shows it as entered (31.2, not 31.200000762939453)
+HOVER_FIELDS = ['Explore', 'Distance', 'ESI']
+HOVER_TEMPLATE = (
+    'Exoplanet: %{customdata[0]}<br>'
+    'Distance: %{customdata[1]:.6~g}<br>'
+    'ESI: %{customdata[2]}'
+    '<extra></extra>'
+)
+
+
+# customdata rows for the hover template, one [Explore, Distance, ESI] per planet
+# (nested lists, or one 2D typed array with the binary transport)
+def hover_customdata(df, binary=None):
+    return figure_column(np.column_stack([np.asarray(df[field], dtype=np.float64) for field in HOVER_FIELDS]), binary)
+
@@ -0,0 +1,162 @@
+"""
+Load test: starts serve.py against a throwaway database of synthetic planets
+with each worker count in turn, hammers it from several client processes
+and reports requests/sec and latency percentiles.
+
+Scenarios:
+  figure      the globe callback a new browser tab makes (full figure)
+  page        GET / (the Dash page shell)
+
+    python load_test.py [--workers 1 2 4] [--clients 8] [--duration 10] [--planets 10000]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from store import ExoplanetStore
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FIGURE_CALLBACK = {
+    'output': '..exoplanet-globe.figure...last-seen.data...metric-colors.data..',
+    'outputs': [{'id': 'exoplanet-globe', 'property': 'figure'},
+                {'id': 'last-seen', 'property': 'data'},
+                {'id': 'metric-colors', 'property': 'data'}],
+    'inputs': [{'id': 'interval-component', 'property': 'n_intervals', 'value': 0},
+               {'id': 'exoplanet-globe', 'property': 'relayoutData', 'value': None}],
+    'state': [{'id': 'last-seen', 'property': 'data', 'value': None},
+              {'id': 'color-metric', 'property': 'data', 'value': 'ESI'}],
+    'changedPropIds': ['interval-component.n_intervals'],
+}
+SCENARIOS = {
+    'figure': ('POST', '/_dash-update-component', json.dumps(FIGURE_CALLBACK),
+               {'Content-Type': 'application/json'}),
+    'page': ('GET', '/', None, {}),
+}
+
+
+def synthetic_planets(n, rng):
+    return [{
+        'Name': f'Synthetic-{i} b',
+        'Magnitude': float(rng.uniform(2, 16)),
+        'Distance': float(rng.uniform(4, 3000)),
+        'ESI': float(rng.uniform(0, 1)),
+        'Radius': float(rng.uniform(0.3, 20)),
+        'Mass': float(10 ** rng.uniform(-3, 1.5)),
+        'Inclination': float(rng.uniform(0, 90)),
+        'OrbitalPeriod': float(10 ** rng.uniform(-1, 5)),
+        'Explore': int(rng.integers(0, 2)),
+    } for i in range(n)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def client(port, scenario, duration, results):
+    """One client: requests back to back on a keep-alive connection until duration is up."""
+    method, path, body, headers = SCENARIOS[scenario]
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    latencies = []
+    errors = 0
+    stop = time.monotonic() + duration
+    while time.monotonic() < stop:
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.close()
+    results.put((latencies, errors))
+
+
+def run(port, scenario, clients, duration):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client, args=(port, scenario, duration, results))
+                 for _ in range(clients)]
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        client_latencies, client_errors = results.get()
+        latencies += client_latencies
+        errors += client_errors
+    for process in processes:
+        process.join()
+    return np.array(latencies) * 1000, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario')
+    parser.add_argument('--planets', type=int, default=10_000)
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   EXOPLANET_DB_PATH=os.path.join(tmp, 'load.db'),
+                   SHARED_CACHE_PATH=os.path.join(tmp, 'load_cache.db'))
+        store = ExoplanetStore(env['EXOPLANET_DB_PATH'])
+        store.create_table()
+        store.insert_many(synthetic_planets(args.planets, np.random.default_rng(0)))
+        store.close()
+        print(f'{args.planets:,} planets, {args.clients} client processes, {args.duration:g} s per scenario '
+              f'({os.cpu_count()} CPUs)')
+        print(f"{'workers':>7s} {'scenario':12s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>6s}")
+
+        for workers in args.workers:
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(HERE, 'serve.py'), '--port', str(port), '--workers', str(workers)],
+                cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(port)
+                for scenario in args.scenarios:
+                    run(port, scenario, 1, 0.5)  # warm up every worker's model and caches
+                    latencies, errors = run(port, scenario, args.clients, args.duration)
+                    if len(latencies):
+                        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                    else:
+                        p50 = p95 = p99 = float('nan')
+                    print(f'{workers:7d} {scenario:12s} {len(latencies) / args.duration:8.1f} '
+                          f'{p50:8.1f} {p95:8.1f} {p99:8.1f} {errors:6d}')
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+
+# Most individual markers we send to the browser before switching to level-of-detail mode
+LOD_POINT_BUDGET = int(os.environ.get('LOD_POINT_BUDGET', 5000))
+# Bins per axis for the aggregate density layer
+LOD_BINS = int(os.environ.get('LOD_BINS', 16))
+
+# Plotly's default camera eye (1.25, 1.25, 1.25) sits this far from the scene center
+DEFAULT_EYE_DISTANCE = float(np.sqrt(3 * 1.25 ** 2))
+
+
+def camera_from_relayout(relayout_data):
+    """Pull the 3D camera out of a dcc.Graph relayoutData event, or None."""
+    if not relayout_data:
+        return None
+    return relayout_data.get('scene.camera')
+
+
+def detail_region(x, y, z, camera):
+    """
+    Approximate the region the camera is looking at as a sphere in data units.
+    Plotly camera coordinates are normalized to the scene box, so the look-at
+    center maps onto the data extent and zooming in (a shorter eye vector)
+    shrinks the radius proportionally.
+    """
+    lo = np.array([x.min(), y.min(), z.min()])
+    hi = np.array([x.max(), y.max(), z.max()])
+    mid = (lo + hi) / 2
+    half = np.maximum((hi - lo) / 2, 1e-9)
+
+    if camera is None:
+        return mid, float(np.linalg.norm(half))
+
+    center = camera.get('center') or {'x': 0, 'y': 0, 'z': 0}
+    eye = camera.get('eye') or {'x': 1.25, 'y': 1.25, 'z': 1.25}
+    center_n = np.array([center['x'], center['y'], center['z']], dtype=float)
+    eye_n = np.array([eye['x'], eye['y'], eye['z']], dtype=float)
+
+    zoom = np.linalg.norm(eye_n - center_n) / DEFAULT_EYE_DISTANCE
+    return mid + center_n * half, float(np.linalg.norm(half) * zoom)
+
+
+def density_layer(x, y, z, values, bins=LOD_BINS):
+    """
+    Aggregate points into a bins^3 voxel grid.
+    Returns centroid x/y/z, point count and mean value for every non-empty voxel.
+    values may be 2D (one column per quantity); missing (NaN) values are left out of the mean.
+    """
+    points = np.column_stack([x, y, z])
+    lo = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lo, 1e-9)
+    cells = np.minimum(((points - lo) / span * bins).astype(np.int64), bins - 1)
+    flat = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+
+    voxel, inverse, counts = np.unique(flat, return_inverse=True, return_counts=True)
+    values = np.asarray(values, dtype=np.float64)
+    columns = values.reshape(len(values), -1)
+    known = ~np.isnan(columns)
+    k = columns.shape[1]
+    sums = np.zeros((len(voxel), 3 + 2 * k))
+    np.add.at(sums, inverse, np.column_stack([points, np.where(known, columns, 0), known]))
+    means = sums[:, :3] / counts[:, None]
+    with np.errstate(invalid='ignore'):
+        value = sums[:, 3:3 + k] / sums[:, 3 + k:]
+    value = value.reshape((len(voxel),) + values.shape[1:])
+    return {'x': means[:, 0], 'y': means[:, 1], 'z': means[:, 2], 'count': counts, 'value': value}
+
+
+def level_of_detail(df, camera=None, budget=LOD_POINT_BUDGET, bins=LOD_BINS, value_column='ESI', color_values=None):
+    """
+    Split the catalog into full-resolution points and an aggregate density layer.
+    Points inside the camera's detail region are kept individually (the highest
+    value_column ones if there are more than budget); everything else is binned.
+    The density layer averages color_values (default: value_column) per bin.
+    Returns (detail_df, density) where density is None when no binning was needed.
+    """
+    if len(df) <= budget:
+        return df, None
+
+    x, y, z = (np.asarray(df[axis], dtype=np.float64) for axis in ('x', 'y', 'z'))
+    center, radius = detail_region(x, y, z, camera)
+    dist2 = (x - center[0]) ** 2 + (y - center[1]) ** 2 + (z - center[2]) ** 2
+    near = np.flatnonzero(dist2 <= radius ** 2)
+
+    if len(near) > budget:
+        values = np.asarray(df[value_column])[near]
+        keep = near[np.argpartition(-np.nan_to_num(values, nan=-np.inf), budget - 1)[:budget]]
+    else:
+        keep = near
+    keep.sort()
+
+    rest = np.ones(len(df), dtype=bool)
+    rest[keep] = False
+    if not rest.any():
+        return df.take(keep), None
+    if color_values is None:
+        color_values = np.asarray(df[value_column])
+    density = density_layer(x[rest], y[rest], z[rest], np.asarray(color_values)[rest], bins=bins)
+    return df.take(keep), density
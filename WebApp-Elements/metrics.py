@@ -0,0 +1,223 @@
+"""
+Lightweight timing and counters for the hot paths.
+
+    @timed('store.fetch_page')          # decorator
+    def fetch_page(...): ...
+
+    with timer('update_figure.lod'):    # context manager
+        ...
+
+    count('submissions', len(batch))
+
+Every timed stage feeds one histogram (exoplanet_stage_seconds{stage=...}),
+rendered in Prometheus text format at /metrics. With METRICS_LOG_INTERVAL
+set, a snapshot is also written to the 'metrics' logger every N seconds.
+
+With METRICS_ENABLED=0 decorators return the function unchanged and timer()
+returns one shared no-op context manager, so disabled instrumentation costs
+a function call at most.
+
+Each server worker process keeps its own numbers; series are labelled with
+the worker's pid so scrapes landing on different workers don't mix.
+"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') not in ('0', 'false', 'no')
+METRICS_LOG_INTERVAL = float(os.environ.get('METRICS_LOG_INTERVAL', 0))  # seconds, 0 = off
+
+# Histogram upper bounds in seconds (+Inf is implied)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_METRIC = 'exoplanet_stage_seconds'
+EVENT_METRIC = 'exoplanet_events_total'
+
+logger = logging.getLogger('metrics')
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (inf if past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    def __init__(self):
+        self.stages = {}  # stage -> Histogram
+        self.events = {}  # event -> count
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, event, n=1):
+        with self._lock:
+            self.events[event] = self.events.get(event, 0) + n
+
+    def clear(self):
+        with self._lock:
+            self.stages = {}
+            self.events = {}
+
+    def snapshot(self):
+        """{'stages': {stage: {count, mean_ms, p50_ms, p95_ms, ...}}, 'events': {...}}"""
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'total_ms': h.sum * 1000,
+                    'mean_ms': h.sum / h.count * 1000 if h.count else 0.0,
+                    'p50_ms': h.quantile(0.5) * 1000,
+                    'p95_ms': h.quantile(0.95) * 1000,
+                }
+                for stage, h in sorted(self.stages.items())
+            }
+            return {'stages': stages, 'events': dict(sorted(self.events.items()))}
+
+    def render_prometheus(self):
+        pid = os.getpid()
+        lines = [f'# HELP {STAGE_METRIC} Time spent in each instrumented stage.',
+                 f'# TYPE {STAGE_METRIC} histogram']
+        with self._lock:
+            for stage, h in sorted(self.stages.items()):
+                labels = f'stage="{stage}",worker="{pid}"'
+                cumulative = 0
+                bounds = [repr(bound) for bound in h.buckets] + ['+Inf']
+                for bound, n in zip(bounds, h.counts):
+                    cumulative += n
+                    lines.append(f'{STAGE_METRIC}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{STAGE_METRIC}_sum{{{labels}}} {h.sum!r}')
+                lines.append(f'{STAGE_METRIC}_count{{{labels}}} {h.count}')
+            lines += [f'# HELP {EVENT_METRIC} Count of instrumented events.',
+                      f'# TYPE {EVENT_METRIC} counter']
+            for event, n in sorted(self.events.items()):
+                lines.append(f'{EVENT_METRIC}{{event="{event}",worker="{pid}"}} {n}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage):
+    """Context manager that records how long its block takes under stage."""
+    return _Timer(stage) if METRICS_ENABLED else _NULL_TIMER
+
+
+def timed(stage):
+    """Decorator version of timer(); a no-op when metrics are disabled."""
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def observe(stage, seconds):
+    """Record a duration measured elsewhere (e.g. a whole HTTP request)."""
+    if METRICS_ENABLED:
+        registry.observe(stage, seconds)
+
+
+def count(event, n=1):
+    if METRICS_ENABLED:
+        registry.count(event, n)
+
+
+def log_snapshot():
+    snapshot = registry.snapshot()
+    for stage, s in snapshot['stages'].items():
+        logger.info('%s: n=%d mean=%.2fms p50<=%.2fms p95<=%.2fms',
+                    stage, s['count'], s['mean_ms'], s['p50_ms'], s['p95_ms'])
+    for event, n in snapshot['events'].items():
+        logger.info('%s: %d', event, n)
+
+
+# pid of the process whose log thread is running: threads don't survive fork(),
+# so a forked worker sees another pid here and starts its own
+_log_pid = None
+_log_lock = threading.Lock()
+
+
+def start_log_dump(interval=METRICS_LOG_INTERVAL):
+    """
+    Log a snapshot every interval seconds from a daemon thread (no-op if
+    interval is 0). Cheap once running, so it can be called on every request.
+    """
+    global _log_pid
+    if not METRICS_ENABLED or interval <= 0 or _log_pid == os.getpid():
+        return
+    with _log_lock:
+        if _log_pid != os.getpid():
+            if not logging.getLogger().handlers:
+                logging.basicConfig()
+            logger.setLevel(logging.INFO)
+
+            def run():
+                while True:
+                    time.sleep(interval)
+                    log_snapshot()
+            threading.Thread(target=run, name='metrics-log', daemon=True).start()
+            _log_pid = os.getpid()
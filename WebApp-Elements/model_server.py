@@ -0,0 +1,233 @@
+import importlib
+import os
+import sys
+import threading
+
+import numpy as np
+
+from catalog import PlanetCatalog
+
+# Default location of the model written by AI_Model/AITraining.py and Interactive_AItest.py
+AI_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'AI_Model')
+DEFAULT_MODEL_PATH = os.environ.get(
+    'EXPLORE_MODEL_PATH',
+    os.path.join(AI_MODEL_DIR, 'exoplanet_explore_model.pkl')
+)
+
+
+def ai_model_module(name):
+    """A module from AI_Model/ (appended to sys.path, so the web app's own modules win)."""
+    if AI_MODEL_DIR not in sys.path:
+        sys.path.append(AI_MODEL_DIR)
+    return importlib.import_module(name)
+
+
+# Planets at or above this ESI are exploration candidates; defined once, with the
+# training labels (AI_Model/dataset.py, NumPy only)
+EXPLORE_ESI_THRESHOLD = ai_model_module('dataset').EXPLORE_ESI_THRESHOLD
+
+# Web app field names -> column names used when training the model
+APP_TO_TRAINING = {
+    'ESI': 'ESI',
+    'Mass': 'Mass (Compared to Jupiter)',
+    'Radius': 'Radius compared to Jupiter',
+    'Magnitude': 'Magnitude',
+    'Distance': 'Distance',
+    'Inclination': 'Incline Angle(deg)',
+}
+TRAINING_TO_APP = {training: app_name for app_name, training in APP_TO_TRAINING.items()}
+
+# Batches up to this size use the compiled NumPy forest; bigger ones (bulk ingest)
+# go through sklearn, whose C tree traversal wins once the per-call overhead is amortized
+COMPILED_MAX_ROWS = int(os.environ.get('EXPLORE_COMPILED_MAX_ROWS', 2000))
+
+
+# Rule used when no trained model is available (same logic the app used to hard-code)
+def rule_based_explore(X):
+    """
+    Vectorized version of the original dummy model.
+    X is a 2D array with columns ordered as ESI, Mass, Radius, Magnitude.
+    """
+    esi, mass, radius, magnitude = X[:, 0], X[:, 1], X[:, 2], X[:, 3]
+    explore = ((esi >= 0.93) &
+               (mass >= 0.1) & (mass <= 0.5) &
+               (radius >= 0.5) & (radius <= 0.8) &
+               (magnitude < 15))
+    return explore.astype(np.int64)
+
+
+def model_version(model_path=DEFAULT_MODEL_PATH):
+    """Version tag of the model file on disk: its mtime, or 'rules' if there is none."""
+    try:
+        return str(os.path.getmtime(model_path))
+    except OSError:
+        return 'rules'
+
+
+def forest_engine():
+    """AI_Model/forest_engine.py (NumPy only, no sklearn)."""
+    return ai_model_module('forest_engine')
+
+
+def compile_model(model):
+    """Flatten the forest with AI_Model/forest_engine.py; None if the model isn't a forest."""
+    if not hasattr(model, 'estimators_'):
+        return None
+    return forest_engine().compile_forest(model)
+
+
+def load_compiled_model(model_path=DEFAULT_MODEL_PATH):
+    """The compiled forest saved next to the .pkl, if it is at least as new as the .pkl; else None."""
+    engine = forest_engine()
+    npz_path = engine.compiled_path(model_path)
+    if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(model_path):
+        return engine.CompiledForest.load(npz_path)
+    return None
+
+
+def export_compiled_model(model_path=DEFAULT_MODEL_PATH):
+    """
+    Write the compiled forest next to the .pkl unless an up-to-date one is
+    there, so later startups skip sklearn. Returns its path (None without a model).
+    """
+    if not os.path.exists(model_path):
+        return None
+    if load_compiled_model(model_path) is None:
+        return forest_engine().export_forest(model_path)
+    return forest_engine().compiled_path(model_path)
+
+
+class ExploreModel:
+    """
+    Loads the trained RandomForest once and scores whole batches of exoplanets.
+    Falls back to the rule-based model when no .pkl has been trained yet.
+
+    When the compiled forest (.npz, see export_compiled_model) is up to date
+    it is all that gets loaded: the sklearn model, and sklearn itself, are
+    only unpickled if a batch too big for the compiled forest comes along.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, mmap_mode='r'):
+        self.model_path = model_path
+        self.mmap_mode = mmap_mode
+        self.trained = os.path.exists(model_path)
+        self.forest = None
+        self.version = 'rules'
+        # Training fill value per feature (NaN where none was recorded), None for models saved without them
+        self.fill_values = None
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        if self.trained:
+            self.forest = load_compiled_model(model_path)
+            if self.forest is None:
+                self.forest = compile_model(self.model)
+            if self.forest is not None:
+                self.feature_names = self._validate_feature_names(self.forest.feature_names)
+                self.classes = list(self.forest.classes)
+                self.fill_values = self.forest.fill_values
+            else:
+                self.feature_names = self._validate_feature_names(getattr(self.model, 'feature_names_in_', []))
+                self.classes = list(self.model.classes_)
+                fills = getattr(self.model, 'fill_values_', None)
+                if fills is not None:
+                    self.fill_values = np.array([fills.get(name, np.nan) for name in self.feature_names])
+            self.version = model_version(model_path)
+        else:
+            self.feature_names = [APP_TO_TRAINING[name] for name in ('ESI', 'Mass', 'Radius', 'Magnitude')]
+
+        # App field names in the exact order the model expects them
+        self.app_fields = [TRAINING_TO_APP[name] for name in self.feature_names]
+
+    @property
+    def model(self):
+        """The sklearn model, unpickled on first use (None if there is no .pkl)."""
+        if self._model is None and self.trained:
+            with self._model_lock:
+                if self._model is None:
+                    import joblib  # pulls in sklearn, ~1 s
+                    # Memory-map the tree arrays so several workers share the same pages
+                    self._model = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+        return self._model
+
+    @staticmethod
+    def _validate_feature_names(feature_names):
+        feature_names = [str(name) for name in feature_names]
+        if not feature_names:
+            raise ValueError('Model was not trained on a DataFrame, feature order cannot be checked')
+        unknown = [name for name in feature_names if name not in TRAINING_TO_APP]
+        if unknown:
+            raise ValueError(f'Model expects features the web app does not collect: {unknown}')
+        return feature_names
+
+    def to_matrix(self, rows):
+        """Build the (n_rows, n_features) float matrix in the model's feature order."""
+        if isinstance(rows, PlanetCatalog):
+            return np.column_stack([np.asarray(rows[field], dtype=np.float64) for field in self.app_fields])
+        if isinstance(rows, (list, tuple)):
+            return np.array([[row[field] for field in self.app_fields] for row in rows], dtype=np.float64)
+        return rows[self.app_fields].to_numpy(dtype=np.float64)  # DataFrame
+
+    def impute(self, X):
+        """
+        Fill missing inputs with the values the training data was filled with
+        (AI_Model/dataset.py), so every caller scores a planet with gaps the
+        same way. Older models without them fall back to the trees' own
+        missing-value routing, which sklearn and the compiled forest share.
+        """
+        if self.fill_values is None:
+            return X
+        return np.where(np.isnan(X), self.fill_values, X)
+
+    def _sklearn_frame(self, X):
+        # One DataFrame per batch keeps sklearn's feature-name check happy
+        import pandas as pd
+        return pd.DataFrame(X, columns=self.feature_names)
+
+    def predict_many(self, rows):
+        """
+        Score a batch of exoplanets in one model call.
+        rows is a list of dicts (or a DataFrame) keyed by the app field names.
+        Returns a NumPy array of 0/1 explore flags.
+        """
+        X = self.impute(self.to_matrix(rows))
+        if len(X) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if not self.trained:
+            return rule_based_explore(X)
+        if self.forest is not None and len(X) <= COMPILED_MAX_ROWS:
+            return self.forest.predict(X).astype(np.int64)
+        return self.model.predict(self._sklearn_frame(X)).astype(np.int64)
+
+    def predict_proba_many(self, rows):
+        """
+        Probability of Explore = 1 for each row (same batching as predict_many).
+        The rule-based model has no probabilities, so it gives 0.0 or 1.0.
+        """
+        X = self.impute(self.to_matrix(rows))
+        if len(X) == 0:
+            return np.zeros(0)
+        if not self.trained:
+            return rule_based_explore(X).astype(np.float64)
+        if 1 not in self.classes:
+            return np.zeros(len(X))
+        column = self.classes.index(1)
+        if self.forest is not None and len(X) <= COMPILED_MAX_ROWS:
+            return self.forest.predict_proba(X)[:, column]
+        return self.model.predict_proba(self._sklearn_frame(X))[:, column]
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+# Shared model instance, loaded on first use and reused by every request.
+# Reloaded when a newly trained .pkl replaces the one it was loaded from.
+def get_model():
+    global _model
+    version = model_version()
+    if _model is None or _model.version != version:
+        with _model_lock:
+            if _model is None or _model.version != version:
+                _model = ExploreModel()
+    return _model
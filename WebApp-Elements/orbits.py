@@ -0,0 +1,213 @@
+"""
+Kepler-orbit propagation for every planet at once.
+
+Each planet's position around its own star is found by solving Kepler's
+equation M = E - e sin E with Newton iterations over whole NumPy arrays
+(frames x planets), so there is no per-planet Python loop.
+
+The catalog only has period, eccentricity and inclination, so:
+  - the semi-major axis comes from Kepler's third law for a Sun-like host,
+    a [AU] = (P [years]) ** (2/3)
+  - argument of periapsis and ascending node are taken as 0
+  - the starting phase is spread deterministically by id, so planets with
+    the same period don't move in lockstep
+  - missing eccentricity counts as a circular orbit, missing inclination as
+    face-on; planets without a period are left out
+
+OrbitFrameCache keeps a window of animation frames per catalog version, so
+playback (app.py) only slices out one precomputed frame per tick.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DAYS_PER_YEAR = 365.25
+ORBIT_FRAMES = int(os.environ.get('ORBIT_FRAMES', 360))
+ORBIT_WINDOW_DAYS = float(os.environ.get('ORBIT_WINDOW_DAYS', DAYS_PER_YEAR))
+ORBIT_CACHE_SIZE = int(os.environ.get('ORBIT_CACHE_SIZE', 2))  # frame sets kept per process
+ORBIT_TICK_MS = int(os.environ.get('ORBIT_TICK_MS', 100))  # playback interval in the browser
+# Newton stops once every correction is below this (float32 can't resolve much below 1e-6 rad)
+KEPLER_TOLERANCE = {np.dtype('float64'): 1e-10, np.dtype('float32'): 2e-6}
+KEPLER_MAX_ITERATIONS = 16
+# Frames are solved (and lazily filled in) this many at a time
+FRAME_CHUNK = 32
+# Golden-ratio spacing of the starting mean anomaly by planet id
+PHASE_STEP = (np.sqrt(5) - 1) / 2
+
+
+def semi_major_axis(period_days):
+    """Semi-major axis in AU for a Sun-like host (Kepler's third law)."""
+    return (np.asarray(period_days, dtype=np.float64) / DAYS_PER_YEAR) ** (2 / 3)
+
+
+def initial_phase(ids):
+    """Mean anomaly at t = 0, spread over [0, 2pi) by id."""
+    return 2 * np.pi * ((np.asarray(ids, dtype=np.float64) * PHASE_STEP) % 1.0)
+
+
+def solve_kepler(mean_anomaly, eccentricity, tol=None, max_iterations=KEPLER_MAX_ITERATIONS):
+    """
+    Eccentric anomaly E for arrays of mean anomaly M and eccentricity e
+    (broadcast together), in M's float dtype. Newton steps run over the
+    whole array at once; elements drop out as soon as their correction is
+    below tol, so the few high-eccentricity stragglers don't cost a pass
+    over everything.
+    """
+    M = np.remainder(mean_anomaly, 2 * np.pi)
+    M, e = np.broadcast_arrays(M, np.asarray(eccentricity, dtype=M.dtype))
+    tol = KEPLER_TOLERANCE.get(M.dtype, 1e-10) if tol is None else tol
+    shape = M.shape
+    M, e = M.ravel(), np.ascontiguousarray(e).ravel()
+    # Danby's starting value converges for every e < 1
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    active = np.arange(E.size)
+    for _ in range(max_iterations):
+        Ea, ea = E[active], e[active]
+        step = (Ea - ea * np.sin(Ea) - M[active]) / (1 - ea * np.cos(Ea))
+        E[active] = Ea - step
+        active = active[np.abs(step) >= tol]
+        if not active.size:
+            break
+    return E.reshape(shape)
+
+
+def orbit_elements(catalog):
+    """(ids, period, eccentricity, inclination in radians) of the planets that have a period."""
+    period = np.asarray(catalog['OrbitalPeriod'], dtype=np.float64)
+    keep = np.isfinite(period) & (period > 0)
+    eccentricity = np.asarray(catalog['Eccentricity'], dtype=np.float64)[keep]
+    eccentricity = np.clip(np.nan_to_num(eccentricity, nan=0.0), 0.0, 0.99)
+    inclination = np.radians(np.nan_to_num(np.asarray(catalog['Inclination'], dtype=np.float64)[keep], nan=0.0))
+    return np.asarray(catalog['id'])[keep], period[keep], eccentricity, inclination
+
+
+def orbit_positions(ids, period, eccentricity, inclination, times, dtype=np.float32):
+    """
+    Positions in AU relative to each planet's star, shape (len(times), 3, planets).
+    times are in days from the start of the window. The mean anomaly is
+    reduced to [0, 2pi) in float64; Kepler's equation is then solved in
+    dtype (float32 runs several times faster and is plenty for plotting).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    a = semi_major_axis(period).astype(dtype)
+    b = (a * np.sqrt(1 - eccentricity ** 2)).astype(dtype)
+    e = eccentricity.astype(dtype)
+    phase = initial_phase(ids)
+    cos_i, sin_i = np.cos(inclination).astype(dtype), np.sin(inclination).astype(dtype)
+    out = np.empty((len(times), 3, len(ids)), dtype=dtype)
+    for start in range(0, len(times), FRAME_CHUNK):
+        t = times[start:start + FRAME_CHUNK, None]
+        M = np.remainder(2 * np.pi * t / period + phase, 2 * np.pi).astype(dtype)
+        E = solve_kepler(M, e)
+        # In the orbital plane, then tilted about the x axis by the inclination
+        y = b * np.sin(E)
+        out[start:start + FRAME_CHUNK, 0] = a * (np.cos(E) - e)
+        out[start:start + FRAME_CHUNK, 1] = y * cos_i
+        out[start:start + FRAME_CHUNK, 2] = y * sin_i
+    return out
+
+
+def display_positions(positions):
+    """Compress distances to sqrt(AU) so 0.05 AU and 50 AU orbits fit in one view."""
+    r = np.sqrt(np.einsum('...ij,...ij->...j', positions, positions))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(r > 0, 1 / np.sqrt(r), 0.0).astype(positions.dtype)
+    return positions * scale[..., None, :]
+
+
+class OrbitFrames:
+    """
+    One animation window: ids, frame times (days) and display positions
+    (frames, 3, planets). Frames are solved FRAME_CHUNK at a time the first
+    time one of them is asked for, so playback can start right away.
+    """
+
+    def __init__(self, ids, period, eccentricity, inclination, times):
+        self.ids = ids
+        self.period = period
+        self.eccentricity = eccentricity
+        self.inclination = inclination
+        self.times = times
+        self.positions = np.empty((len(times), 3, len(ids)), dtype=np.float32)
+        self._ready = np.zeros(-(-len(times) // FRAME_CHUNK), dtype=bool)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.times)
+
+    def _fill(self, chunk):
+        with self._lock:
+            if self._ready[chunk]:
+                return
+            frames = slice(chunk * FRAME_CHUNK, (chunk + 1) * FRAME_CHUNK)
+            positions = orbit_positions(self.ids, self.period, self.eccentricity, self.inclination,
+                                        self.times[frames])
+            self.positions[frames] = display_positions(positions)
+            self._ready[chunk] = True
+
+    def frame(self, index):
+        """(x, y, z) of frame index, wrapping around at the end of the window."""
+        index %= len(self.times)
+        chunk = index // FRAME_CHUNK
+        if not self._ready[chunk]:
+            self._fill(chunk)
+        return self.positions[index]
+
+    def compute_all(self):
+        for chunk in range(len(self._ready)):
+            self._fill(chunk)
+        return self
+
+    def extent(self):
+        """Largest display distance from the star (the biggest apoapsis, in sqrt(AU))."""
+        if not len(self.ids):
+            return 1.0
+        return float(np.sqrt(np.max(semi_major_axis(self.period) * (1 + self.eccentricity))))
+
+
+def orbit_frames(catalog, n_frames=ORBIT_FRAMES, window_days=ORBIT_WINDOW_DAYS):
+    """Animation window for the catalog's planets (frames are solved on first use)."""
+    ids, period, eccentricity, inclination = orbit_elements(catalog)
+    times = np.linspace(0, window_days, n_frames, endpoint=False)
+    return OrbitFrames(ids, period, eccentricity, inclination, times)
+
+
+class OrbitFrameCache:
+    """
+    Animation windows per catalog version (and frame count / window), reused
+    by every playback tick. Only the most recent few are kept; at 10k
+    planets x 360 frames one window is ~43 MB of float32.
+    """
+
+    def __init__(self, maxsize=ORBIT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, catalog, version, n_frames=ORBIT_FRAMES, window_days=ORBIT_WINDOW_DAYS):
+        key = (version, n_frames, window_days)
+        with self._lock:
+            frames = self._entries.get(key)
+            if frames is not None:
+                self._entries.move_to_end(key)
+                return frames
+            frames = self._entries[key] = orbit_frames(catalog, n_frames, window_days)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return frames
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# Shared orbit frame cache used by the playback callback
+def get_orbit_frame_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OrbitFrameCache()
+    return _cache
@@ -0,0 +1,135 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from model_server import TRAINING_TO_APP
+
+# Decimal places each feature is rounded to before lookup, so near-identical
+# submissions (e.g. ESI 0.9312 vs 0.9309) share one cached prediction
+QUANTIZE_DECIMALS = {
+    'ESI': 3,
+    'Mass': 3,
+    'Radius': 3,
+    'Magnitude': 2,
+    'Distance': 1,
+    'Inclination': 1,
+}
+DEFAULT_DECIMALS = 3
+
+CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))  # seconds
+
+
+def quantize(value, decimals):
+    value = float(value)
+    # NaN never equals itself, so it could never be found again as a key
+    return None if math.isnan(value) else round(value, decimals)
+
+
+def feature_key(row, fields, version):
+    """
+    Cache key: model version plus the rounded features, in model order.
+    fields may be app field names or the training column names.
+    """
+    return (version,) + tuple(
+        quantize(row[field], QUANTIZE_DECIMALS.get(TRAINING_TO_APP.get(field, field), DEFAULT_DECIMALS))
+        for field in fields
+    )
+
+
+class PredictionCache:
+    """
+    LRU cache of explore predictions, bounded by entry count and age.
+    Keys include the model version, and the whole cache is dropped the
+    first time a different version is seen, so retraining the .pkl never
+    serves stale predictions.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (expires_at, prediction)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, prediction):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def check_version(self, version):
+        """Drop every entry when the model version changes."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'model_version': self.version,
+            }
+
+    def predict_many(self, model, rows):
+        """Cached predictions for a list of rows; the misses are scored in one model call."""
+        self.check_version(model.version)
+        keys = [feature_key(row, model.app_fields, model.version) for row in rows]
+        predictions = [self.get(key) for key in keys]
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if missing:
+            scored = model.predict_many([rows[i] for i in missing])
+            for i, prediction in zip(missing, scored.tolist()):
+                predictions[i] = prediction
+                self.put(keys[i], prediction)
+        return predictions
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# Shared prediction cache used by the submission callback
+def get_prediction_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache()
+    return _cache
@@ -0,0 +1,273 @@
+"""
+Top-K exploration candidates: "the best N planets under these constraints".
+
+Every planet gets a composite score,
+
+    score = P(explore) x ESI x 1 / (1 + Distance / RANK_DISTANCE_SCALE)
+
+(P from the explore model, see model_server.py), computed once when the
+planet reaches the frame cache and kept in a ScoreIndex. Planets without an
+ESI or a distance have no score and are not ranked.
+
+    from ranking import top_candidates
+    top_candidates(10, {'Distance': (None, 100), 'Magnitude': (None, 15)})
+
+Filters map a column to (low, high), meaning low <= value < high; either
+end may be None. Queries never sort or scan the whole catalog, see
+ScoreIndex.top_k.
+"""
+import os
+import threading
+
+import numpy as np
+
+from catalog import CATALOG_DTYPE, MISSING_CODE, as_entered
+from frame_cache import get_frame_cache
+from model_server import get_model
+
+RANK_DISTANCE_SCALE = float(os.environ.get('RANK_DISTANCE_SCALE', 100))  # ly at which the penalty halves
+# Columns top-K queries can filter on; each keeps a sorted copy for range lookups
+RANK_FILTER_COLUMNS = ['Distance', 'Magnitude', 'ESI', 'Radius', 'Mass']
+# Rows checked per step when walking down the score order
+RANK_BLOCK = 1024
+# Columns returned by top_candidates, after rank/id/Name/score/probability
+RESULT_COLUMNS = ['ESI', 'Distance', 'Magnitude', 'Radius', 'Mass', 'Explore']
+
+
+def distance_penalty(distance):
+    """1 on Earth's doorstep, 1/2 at RANK_DISTANCE_SCALE light-years, 1/3 at twice that."""
+    distance = np.clip(np.asarray(distance, dtype=np.float64), 0.0, None)
+    return 1 / (1 + distance / RANK_DISTANCE_SCALE)
+
+
+def composite_score(probability, esi, distance):
+    return np.asarray(probability, dtype=np.float64) * np.asarray(esi, dtype=np.float64) * distance_penalty(distance)
+
+
+class ScoreIndex:
+    """
+    Planets ordered by descending score, plus a sorted copy of each filter
+    column (RANK_FILTER_COLUMNS) pointing back into that order.
+    Inserts go to a small unsorted pending buffer that every query checks by
+    brute force; the sorted arrays are rebuilt once the buffer grows past
+    rebuild_fraction of the indexed planets (the same scheme as
+    spatial.SpatialIndex), so inserts stay cheap.
+    """
+
+    # Explore and Name (a code into the catalog's name table) ride along, so a
+    # result carries everything top_candidates shows without going back to the catalog
+    FIELDS = ['id', 'score', 'probability'] + RANK_FILTER_COLUMNS + ['Explore', 'Name']
+    INT_FIELDS = ('id', 'Explore', 'Name')
+
+    def __init__(self, rebuild_fraction=0.1, min_rebuild=1024):
+        self.rebuild_fraction = rebuild_fraction
+        self.min_rebuild = min_rebuild
+        self.main = self._empty()
+        self.pending = self._empty()
+        # column -> (values sorted ascending with NaN last, their positions in main, non-NaN count)
+        self.by_column = {}
+        self._index_columns()
+
+    @classmethod
+    def _empty(cls):
+        return {field: np.zeros(0, dtype=np.int64 if field in cls.INT_FIELDS else np.float64) for field in cls.FIELDS}
+
+    def __len__(self):
+        return len(self.main['id']) + len(self.pending['id'])
+
+    def add(self, columns):
+        """columns: dict of equal-length arrays for every field in FIELDS; unscored rows are dropped."""
+        keep = np.isfinite(np.asarray(columns['score'], dtype=np.float64))
+        for field in self.FIELDS:
+            values = np.asarray(columns[field], dtype=self.pending[field].dtype)[keep]
+            self.pending[field] = np.concatenate([self.pending[field], values])
+        if len(self.pending['id']) > max(self.min_rebuild, self.rebuild_fraction * len(self.main['id'])):
+            self.rebuild()
+
+    def rebuild(self):
+        merged = {field: np.concatenate([self.main[field], self.pending[field]]) for field in self.FIELDS}
+        order = np.argsort(-merged['score'], kind='stable')
+        self.main = {field: values[order] for field, values in merged.items()}
+        self.pending = self._empty()
+        self._index_columns()
+
+    def _index_columns(self):
+        for column in RANK_FILTER_COLUMNS:
+            values = self.main[column]
+            positions = np.argsort(values, kind='stable')
+            sorted_values = values[positions]
+            self.by_column[column] = (sorted_values, positions, int(np.count_nonzero(~np.isnan(values))))
+
+    @staticmethod
+    def _matches(block, filters, rows=slice(None)):
+        mask = np.ones(len(block['id'][rows]), dtype=bool)
+        for column, (low, high) in filters.items():
+            values = block[column][rows]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values < high
+        return mask
+
+    def _range(self, column, low, high):
+        """(start, stop) of low <= value < high in the column's sorted values."""
+        sorted_values, _, finite = self.by_column[column]
+        start = 0 if low is None else int(np.searchsorted(sorted_values[:finite], low, side='left'))
+        stop = finite if high is None else int(np.searchsorted(sorted_values[:finite], high, side='left'))
+        return start, max(start, stop)
+
+    def _top_main(self, k, filters):
+        """Positions in main (= rank order) of the k best matching planets."""
+        n = len(self.main['id'])
+        # The narrowest filter range, found with binary searches
+        narrowest = None
+        for column, (low, high) in filters.items():
+            start, stop = self._range(column, low, high)
+            if narrowest is None or stop - start < narrowest[1] - narrowest[0]:
+                narrowest = (start, stop, column)
+        limit = n if narrowest is None else narrowest[1] - narrowest[0]
+
+        # Plan 1: walk down the score order until k planets match. Cheap when
+        # the filters are loose; given up after as many rows as plan 2 would read.
+        found = []
+        total = 0
+        scanned = 0
+        block = max(RANK_BLOCK, 2 * k)
+        while scanned < min(n, limit):
+            rows = slice(scanned, min(n, scanned + block))
+            hits = np.flatnonzero(self._matches(self.main, filters, rows)) + scanned
+            found.append(hits)
+            total += len(hits)
+            scanned = rows.stop
+            if total >= k:
+                return np.concatenate(found)[:k]
+            block *= 2
+        if scanned >= n:
+            return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+        # Plan 2: every planet in the narrowest range, check the other filters,
+        # keep the k best. Positions are ranks, so the best are the smallest.
+        start, stop, column = narrowest
+        candidates = self.by_column[column][1][start:stop]
+        candidates = candidates[self._matches(self.main, filters, candidates)]
+        if len(candidates) > k:
+            candidates = np.partition(candidates, k - 1)[:k]
+        return np.sort(candidates)
+
+    def top_k(self, k, filters=None):
+        """
+        The k highest-scoring planets with low <= column < high for every
+        column: (low, high) in filters. Returns a dict of arrays (FIELDS),
+        best first.
+
+        Costs O(log n) per filter plus the smaller of the rows walked from the
+        top of the score order and the rows in the narrowest filter range, and
+        a pass over the pending buffer; never a full sort or scan unless the
+        filters themselves match most of the catalog.
+        """
+        filters = {column: bounds for column, bounds in (filters or {}).items()
+                   if bounds is not None and bounds != (None, None)}
+        unknown = [column for column in filters if column not in RANK_FILTER_COLUMNS]
+        if unknown:
+            raise ValueError(f'Cannot filter rankings on {unknown}; use one of {RANK_FILTER_COLUMNS}')
+        if k <= 0:
+            return self._empty()
+        positions = self._top_main(k, filters)
+        result = {field: self.main[field][positions] for field in self.FIELDS}
+        pending = self._matches(self.pending, filters)
+        if pending.any():
+            result = {field: np.concatenate([result[field], self.pending[field][pending]]) for field in self.FIELDS}
+            order = np.argsort(-result['score'], kind='stable')[:k]
+            result = {field: values[order] for field, values in result.items()}
+        return result
+
+
+class CandidateRanking:
+    """
+    ScoreIndex kept in step with the frame cache: rows past the last id seen
+    are scored in one model call and added. Starts over when the cache
+    reloads (existing planets changed) or a retrained model is picked up.
+    """
+
+    def __init__(self):
+        self.index = ScoreIndex()
+        self.last_id = 0
+        self.generation = None
+        self.model_version = None
+        self.names = None  # StringTable the index's Name codes point into
+        self._lock = threading.Lock()
+
+    def add_rows(self, catalog):
+        if catalog.empty:
+            return
+        probability = get_model().predict_proba_many(catalog)
+        columns = {column: catalog[column] for column in RANK_FILTER_COLUMNS}
+        columns['id'] = catalog['id']
+        columns['Explore'] = catalog['Explore']
+        columns['Name'] = catalog.rows['Name']
+        columns['probability'] = probability
+        columns['score'] = composite_score(probability, catalog['ESI'], catalog['Distance'])
+        self.index.add(columns)
+        self.names = catalog.strings['Name']
+        self.last_id = max(self.last_id, int(catalog['id'][-1]))
+
+    def sync(self, cache=None):
+        """Score and add any rows the frame cache has that the ranking has not seen yet."""
+        cache = cache or get_frame_cache()
+        with self._lock:
+            new_rows = cache.rows_after(self.last_id)
+            model_version = get_model().version
+            if cache.generation != self.generation or model_version != self.model_version:
+                self.index = ScoreIndex()
+                self.last_id = 0
+                self.generation = cache.generation
+                self.model_version = model_version
+                new_rows = cache.catalog
+            self.add_rows(new_rows)
+        return self
+
+    def top_k(self, k, filters=None):
+        """ScoreIndex.top_k, with Name decoded from the same index state that ranked the planets."""
+        with self._lock:
+            top = self.index.top_k(k, filters)
+            names = self.names
+        top['Name'] = np.array([names.values[code] if code != MISSING_CODE else None for code in top['Name']],
+                               dtype=object)
+        return top
+
+
+_ranking = None
+_ranking_lock = threading.Lock()
+
+
+# Shared ranking, synced with the latest inserts on every call
+def get_ranking():
+    global _ranking
+    if _ranking is None:
+        with _ranking_lock:
+            if _ranking is None:
+                _ranking = CandidateRanking()
+    return _ranking.sync()
+
+
+def top_candidates(k=10, filters=None):
+    """
+    DataFrame of the k best exploration candidates matching filters
+    (see the module docstring), best first, with their name and RESULT_COLUMNS.
+    """
+    import pandas as pd
+    # Everything comes from the one index snapshot that ranked the planets, so a
+    # catalog reload (re-import, sync) can't attach details to the wrong planet
+    top = get_ranking().top_k(k, filters)
+    result = pd.DataFrame({
+        'rank': np.arange(1, len(top['id']) + 1),
+        'id': top['id'],
+        'Name': top['Name'],
+        'score': top['score'],
+        'probability': top['probability'],
+    })
+    for column in RESULT_COLUMNS:
+        # Columns the catalog stores as float32, widened without float32 noise
+        values = top[column]
+        result[column] = as_entered(values) if CATALOG_DTYPE[column] == np.float32 else values
+    return result
@@ -0,0 +1,111 @@
+"""
+Production server for the web app: several worker processes, no debug reloader.
+
+    python serve.py --workers 4 --port 8050
+
+Uses gunicorn when it is installed (same as `gunicorn -w 4 -b :8050 app:server`).
+Otherwise the listening socket is opened here and each forked worker runs a
+threaded Werkzeug server on it, so the workers share one port the same way.
+On platforms without fork() a single threaded process is started instead.
+
+Workers share the globe figure and submission tickets through the on-disk
+shared cache (shared_cache.py) and the planets through the SQLite store.
+The catalog is loaded once, from the startup snapshot when it is current,
+before the workers are forked; the snapshot is rewritten here when the
+catalog has moved on since it was saved (see startup_snapshot.py).
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+
+from werkzeug.serving import make_server
+
+from app import server, create_exoplanet_table, save_startup_snapshot, startup_snapshot
+from frame_cache import get_frame_cache
+from shared_cache import get_shared_cache
+from startup_snapshot import STARTUP_SNAPSHOT
+from store import get_store
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn does not run on Windows
+    BaseApplication = None
+
+DEFAULT_WORKERS = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+DEFAULT_THREADS = int(os.environ.get('WEB_THREADS', 8))
+
+
+def run_gunicorn(host, port, workers, threads):
+    class GunicornApp(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+
+        def load(self):
+            return server
+
+    GunicornApp().run()
+
+
+def run_prefork(host, port, workers, threads):
+    """Pre-forked Werkzeug workers accepting on one shared socket."""
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            make_server(host, port, server, threaded=True, fd=sock.fileno()).serve_forever()
+            os._exit(0)
+        children.append(pid)
+    print(f'Serving on http://{host}:{port} with {workers} worker(s)', flush=True)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help='threads per worker (gunicorn only)')
+    args = parser.parse_args()
+
+    create_exoplanet_table()
+    # Warm the catalog in the parent (workers inherit it) and keep the snapshot current for the next start
+    cache = get_frame_cache()
+    cache.refresh()
+    if STARTUP_SNAPSHOT and (startup_snapshot is None or startup_snapshot['last_id'] != cache.last_id
+                             or startup_snapshot['generation'] != cache.generation):
+        save_startup_snapshot()
+    # Workers open their own connections; don't hand them the parent's
+    get_store().close()
+    get_shared_cache('figures').close()
+
+    if BaseApplication is not None:
+        run_gunicorn(args.host, args.port, args.workers, args.threads)
+    elif hasattr(os, 'fork'):
+        run_prefork(args.host, args.port, args.workers, args.threads)
+    else:
+        print(f'Serving on http://{args.host}:{args.port} (single process, no fork() here)', flush=True)
+        make_server(args.host, args.port, server, threaded=True).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
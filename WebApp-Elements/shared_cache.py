@@ -0,0 +1,131 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from metrics import count
+from store import DEFAULT_DB_PATH, CONNECTION_PRAGMAS
+
+# Cache file shared by every worker process on this machine (next to the database by default)
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH', os.path.splitext(DEFAULT_DB_PATH)[0] + '_cache.db')
+
+# name -> (max entries, seconds an entry stays valid or None)
+NAMESPACES = {
+    'figures': (16, None),     # full globe figures, keyed by catalog version
+    'tickets': (10000, 3600),  # submission status, so any worker can answer a poll
+}
+
+CREATE_SQL = 'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB, created REAL, expires REAL)'
+SELECT_SQL = 'SELECT value FROM {table} WHERE key = ? AND (expires IS NULL OR expires > ?)'
+UPSERT_SQL = 'INSERT OR REPLACE INTO {table} (key, value, created, expires) VALUES (?, ?, ?, ?)'
+# Drop expired entries, then the oldest beyond max entries
+PRUNE_SQL = '''DELETE FROM {table} WHERE expires <= ? OR key NOT IN (
+    SELECT key FROM {table} ORDER BY created DESC LIMIT ?)'''
+CLEAR_SQL = 'DELETE FROM {table}'
+
+
+class SharedCache:
+    """
+    Key/value cache in a local SQLite file, shared by all worker processes,
+    so the first worker to build something (e.g. the globe figure for the
+    current catalog) saves the others from building it again.
+    Values are pickled; the file is local and only the app writes to it.
+    Keys should include whatever version they depend on; old entries are
+    simply pruned once the namespace is over its max entries.
+    """
+
+    def __init__(self, name, max_entries=64, ttl=None, path=SHARED_CACHE_PATH):
+        if not name.isidentifier():
+            raise ValueError(f'Invalid cache name: {name!r}')
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._sql = {key: sql.format(table=f'cache_{name}') for key, sql in
+                     [('create', CREATE_SQL), ('select', SELECT_SQL), ('upsert', UPSERT_SQL),
+                      ('prune', PRUNE_SQL), ('clear', CLEAR_SQL)]}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """This thread's connection (one per thread, as in store.py)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            conn.execute(self._sql['create'])
+            conn.commit()
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self.connection().execute(self._sql['select'], (key, time.time())).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                count(f'shared_cache.{self.name}.misses')
+                return default
+            self.hits += 1
+        count(f'shared_cache.{self.name}.hits')
+        return pickle.loads(row[0])
+
+    def put_many(self, items):
+        """Store several (key, value) pairs in one commit."""
+        now = time.time()
+        expires = None if self.ttl is None else now + self.ttl
+        values = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, expires) for key, value in items]
+        conn = self.connection()
+        with conn:
+            conn.executemany(self._sql['upsert'], values)
+            conn.execute(self._sql['prune'], (now, self.max_entries))
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def get_or_build(self, key, build):
+        """Cached value for key, or build() it and share the result."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        conn = self.connection()
+        with conn:
+            conn.execute(self._sql['clear'])
+
+    def stats(self):
+        with self._lock:
+            return {'name': self.name, 'hits': self.hits, 'misses': self.misses, 'pid': os.getpid()}
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# Shared cache for one of NAMESPACES
+def get_shared_cache(name):
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                max_entries, ttl = NAMESPACES[name]
+                cache = _caches[name] = SharedCache(name, max_entries, ttl)
+    return cache
@@ -0,0 +1,183 @@
+import threading
+
+import numpy as np
+
+from frame_cache import get_frame_cache
+from model_server import EXPLORE_ESI_THRESHOLD
+
+# Earth/Sun sits at the origin of the precomputed galactic x/y/z
+EARTH = (0.0, 0.0, 0.0)
+
+
+class SpatialIndex:
+    """
+    KD-tree over (x, y, z) points keyed by planet id.
+    Inserts go to a small pending buffer that is searched by brute force;
+    the tree is rebuilt once the buffer grows past rebuild_fraction of the
+    indexed points, so inserts stay cheap and queries stay logarithmic.
+    """
+
+    def __init__(self, rebuild_fraction=0.1, min_rebuild=1024):
+        self.rebuild_fraction = rebuild_fraction
+        self.min_rebuild = min_rebuild
+        self.tree = None
+        self.tree_ids = np.zeros(0, dtype=np.int64)
+        self.pending_points = np.zeros((0, 3))
+        self.pending_ids = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.tree_ids) + len(self.pending_ids)
+
+    def add(self, ids, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = np.isfinite(points).all(axis=1)
+        self.pending_points = np.concatenate([self.pending_points, points[keep]])
+        self.pending_ids = np.concatenate([self.pending_ids, ids[keep]])
+        if len(self.pending_ids) > max(self.min_rebuild, self.rebuild_fraction * len(self.tree_ids)):
+            self.rebuild()
+
+    def rebuild(self):
+        # scipy is imported on the first rebuild rather than at startup (~0.3 s)
+        from scipy.spatial import cKDTree
+        points = self.pending_points
+        ids = self.pending_ids
+        if self.tree is not None:
+            points = np.concatenate([self.tree.data, points])
+            ids = np.concatenate([self.tree_ids, ids])
+        self.tree = cKDTree(points) if len(ids) else None
+        self.tree_ids = ids
+        self.pending_points = np.zeros((0, 3))
+        self.pending_ids = np.zeros(0, dtype=np.int64)
+
+    def within(self, center, radius):
+        """Ids and distances of every point within radius of center, nearest first."""
+        center = np.asarray(center, dtype=np.float64)
+        ids = []
+        dists = []
+        if self.tree is not None:
+            hits = self.tree.query_ball_point(center, radius)
+            if hits:
+                ids.append(self.tree_ids[hits])
+                dists.append(np.linalg.norm(self.tree.data[hits] - center, axis=1))
+        if len(self.pending_ids):
+            d = np.linalg.norm(self.pending_points - center, axis=1)
+            near = d <= radius
+            ids.append(self.pending_ids[near])
+            dists.append(d[near])
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        ids = np.concatenate(ids)
+        dists = np.concatenate(dists)
+        order = np.argsort(dists, kind='stable')
+        return ids[order], dists[order]
+
+    def nearest(self, center, k):
+        """Ids and distances of the k points closest to center, nearest first."""
+        center = np.asarray(center, dtype=np.float64)
+        ids = []
+        dists = []
+        if self.tree is not None and k > 0:
+            d, hits = self.tree.query(center, k=min(k, len(self.tree_ids)))
+            hits = np.atleast_1d(hits)
+            ids.append(self.tree_ids[hits])
+            dists.append(np.atleast_1d(d))
+        if len(self.pending_ids):
+            ids.append(self.pending_ids)
+            dists.append(np.linalg.norm(self.pending_points - center, axis=1))
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        ids = np.concatenate(ids)
+        dists = np.concatenate(dists)
+        order = np.argsort(dists, kind='stable')[:k]
+        return ids[order], dists[order]
+
+
+class PlanetIndex:
+    """
+    Spatial indexes over the planet catalog: one for every planet and one for
+    habitable candidates (ESI above the explore threshold or flagged Explore),
+    kept in step with the frame cache by only adding rows past the last id seen
+    (and rebuilt if the cache reloaded because existing planets changed).
+    """
+
+    def __init__(self, habitable_esi=EXPLORE_ESI_THRESHOLD):
+        self.habitable_esi = habitable_esi
+        self.all = SpatialIndex()
+        self.habitable = SpatialIndex()
+        self.positions = {}
+        self.last_id = 0
+        self.generation = None
+        self._lock = threading.Lock()
+
+    def add_rows(self, df):
+        if df.empty:
+            return
+        ids = np.asarray(df['id'], dtype=np.int64)
+        points = np.column_stack([np.asarray(df[axis], dtype=np.float64) for axis in ('x', 'y', 'z')])
+        habitable = (np.asarray(df['ESI']) >= self.habitable_esi) | (np.asarray(df['Explore']) == 1)
+        self.all.add(ids, points)
+        self.habitable.add(ids[habitable], points[habitable])
+        self.positions.update(zip(ids.tolist(), map(tuple, points.tolist())))
+        self.last_id = max(self.last_id, int(ids.max()))
+
+    def sync(self, cache=None):
+        """Add any rows the frame cache has that the index has not seen yet."""
+        cache = cache or get_frame_cache()
+        with self._lock:
+            new_rows = cache.rows_after(self.last_id)
+            if cache.generation != self.generation:
+                # Existing planets changed: start over from the reloaded cache
+                self.all = SpatialIndex()
+                self.habitable = SpatialIndex()
+                self.positions = {}
+                self.last_id = 0
+                self.generation = cache.generation
+                new_rows = cache.catalog
+            self.add_rows(new_rows)
+        return self
+
+    def position_of(self, origin):
+        """origin is None (Earth), a planet id, or an (x, y, z) tuple."""
+        if origin is None:
+            return EARTH
+        if isinstance(origin, (int, np.integer)):
+            return self.positions[int(origin)]
+        return tuple(origin)
+
+    @staticmethod
+    def _without_origin(ids, dists, origin):
+        # Searching around a planet never lists the planet itself (at 0 ly)
+        if not isinstance(origin, (int, np.integer)):
+            return ids, dists
+        keep = ids != int(origin)
+        return ids[keep], dists[keep]
+
+    def within(self, radius, origin=None):
+        """Planets within radius light-years of Earth, a planet id (not counted), or a point."""
+        with self._lock:
+            ids, dists = self.all.within(self.position_of(origin), radius)
+        return self._without_origin(ids, dists, origin)
+
+    def nearest_habitable(self, k, origin=None):
+        """The k habitable candidates closest to Earth, a planet id (not counted), or a point."""
+        # One extra, in case the origin planet is itself a candidate
+        extra = 1 if isinstance(origin, (int, np.integer)) else 0
+        with self._lock:
+            ids, dists = self.habitable.nearest(self.position_of(origin), k + extra)
+        ids, dists = self._without_origin(ids, dists, origin)
+        return ids[:k], dists[:k]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# Shared index, synced with the latest inserts on every call
+def get_spatial_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PlanetIndex()
+    return _index.sync()
@@ -0,0 +1,103 @@
+"""
+Startup snapshot: the frame cache's catalog and the default globe figures,
+saved to one file so a restarted server is ready without reading every row
+from SQLite and rebuilding the figure. (The model's part of the snapshot is
+the compiled forest next to the .pkl, see model_server.export_compiled_model.)
+
+    python startup_snapshot.py     # after an import or sync; serve.py refreshes it too
+
+load_snapshot() only uses a snapshot that still matches the database: same
+generation, and the last planet it holds still there under the same name.
+Rows added since are then fetched by the frame cache's usual incremental
+refresh. The file is pickled and, like the shared cache, only written by
+the app itself.
+"""
+import os
+import pickle
+import sqlite3
+import time
+
+from catalog import PlanetCatalog
+from frame_cache import get_frame_cache
+from shared_cache import get_shared_cache
+from store import DEFAULT_DB_PATH, get_store
+
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', os.path.splitext(DEFAULT_DB_PATH)[0] + '_snapshot.pkl')
+STARTUP_SNAPSHOT = os.environ.get('STARTUP_SNAPSHOT', '1') not in ('0', 'false', 'no')
+# Bump when the snapshot layout (or catalog.CATALOG_DTYPE) changes
+SNAPSHOT_FORMAT = 1
+
+SELECT_NAME_SQL = 'SELECT Name FROM exoplanets WHERE id = ?'
+
+
+def write_snapshot(build_figures=None, path=SNAPSHOT_PATH, cache=None):
+    """
+    Refresh the frame cache and save its catalog. build_figures(catalog, cache)
+    may return {shared 'figures' cache key: value} to save alongside.
+    Returns the snapshot dict.
+    """
+    cache = cache or get_frame_cache()
+    catalog = cache.refresh()
+    rows, strings = catalog.to_snapshot()
+    snapshot = {
+        'format': SNAPSHOT_FORMAT,
+        'created': time.time(),
+        'generation': cache.generation,
+        'last_id': cache.last_id,
+        'last_name': catalog['Name'][-1] if len(catalog) else None,
+        'rows': rows,
+        'strings': strings,
+        'figures': build_figures(catalog, cache) if build_figures else {},
+    }
+    with open(path + '.part', 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.part', path)
+    return snapshot
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """The snapshot at path, or None if there is none (or it is unreadable or an old format)."""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    return snapshot if snapshot.get('format') == SNAPSHOT_FORMAT else None
+
+
+def is_current(snapshot, store=None):
+    """Whether snapshot still describes the start of the exoplanet table."""
+    if not snapshot or not snapshot['last_id']:
+        return False
+    store = store or get_store()
+    try:
+        generation = store.generation()
+        row = store.connection().execute(SELECT_NAME_SQL, (snapshot['last_id'],)).fetchone()
+    except sqlite3.Error:  # no table yet
+        return False
+    return generation == snapshot['generation'] and row is not None and row[0] == snapshot['last_name']
+
+
+def load_snapshot(path=SNAPSHOT_PATH, store=None, cache=None):
+    """
+    Seed the frame cache and the shared figure cache from the snapshot if it
+    is still current. Returns the snapshot, or None if it was not used.
+    """
+    if not STARTUP_SNAPSHOT:
+        return None
+    snapshot = read_snapshot(path)
+    if not is_current(snapshot, store):
+        return None
+    catalog = PlanetCatalog.from_snapshot(snapshot['rows'], snapshot['strings'])
+    (cache or get_frame_cache()).seed(catalog, snapshot['generation'])
+    if snapshot['figures']:
+        get_shared_cache('figures').put_many(snapshot['figures'].items())
+    return snapshot
+
+
+if __name__ == '__main__':
+    from app import save_startup_snapshot
+    start = time.perf_counter()
+    snapshot = save_startup_snapshot()
+    print(f"Wrote {SNAPSHOT_PATH}: {len(snapshot['rows'])} planets, {len(snapshot['figures'])} figures "
+          f"in {time.perf_counter() - start:.2f}s")
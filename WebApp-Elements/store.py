@@ -0,0 +1,290 @@
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from coordinates import cartesian_columns
+from metrics import timed, timer
+
+DEFAULT_DB_PATH = os.environ.get('EXOPLANET_DB_PATH', 'exoplanet_data.db')
+
+# Columns the app reads and writes, in table order (id is assigned by SQLite)
+EXOPLANET_COLUMNS = ['Magnitude', 'Distance', 'ESI', 'Radius', 'Mass', 'Inclination', 'Explore']
+# Optional sky position (galactic longitude/latitude in degrees)
+POSITION_COLUMNS = ['Longitude', 'Latitude']
+# Descriptive columns filled by catalog imports (Name is the upsert key)
+CATALOG_COLUMNS = ['Name', 'OrbitalPeriod', 'Eccentricity', 'DiscoveryMethod']
+# Precomputed Cartesian coordinates (see coordinates.py), filled in at insert time
+CARTESIAN_COLUMNS = ['x', 'y', 'z']
+INPUT_COLUMNS = EXOPLANET_COLUMNS + POSITION_COLUMNS + CATALOG_COLUMNS
+INSERT_COLUMNS = INPUT_COLUMNS + CARTESIAN_COLUMNS
+
+# Columns added after the original schema; older databases get them via ALTER TABLE
+ADDED_COLUMNS = [
+    ('Longitude', 'REAL'), ('Latitude', 'REAL'),
+    ('x', 'REAL'), ('y', 'REAL'), ('z', 'REAL'),
+    ('Name', 'TEXT'), ('OrbitalPeriod', 'REAL'), ('Eccentricity', 'REAL'), ('DiscoveryMethod', 'TEXT'),
+]
+
+# SQL is kept in constants so sqlite3's per-connection statement cache reuses the prepared statements
+CREATE_TABLE_SQL = '''CREATE TABLE IF NOT EXISTS exoplanets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Magnitude REAL,
+    Distance REAL,
+    ESI REAL,
+    Radius REAL,
+    Mass REAL,
+    Inclination REAL,
+    Explore INTEGER,
+    Longitude REAL,
+    Latitude REAL,
+    x REAL,
+    y REAL,
+    z REAL,
+    Name TEXT,
+    OrbitalPeriod REAL,
+    Eccentricity REAL,
+    DiscoveryMethod TEXT
+)'''
+# Bumped whenever existing rows change, so caches that append by id know to reload
+CREATE_META_SQL = 'CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER)'
+SELECT_GENERATION_SQL = "SELECT value FROM catalog_meta WHERE key = 'generation'"
+BUMP_GENERATION_SQL = '''INSERT INTO catalog_meta (key, value) VALUES ('generation', 1)
+    ON CONFLICT(key) DO UPDATE SET value = value + 1'''
+# Editing a planet's position without also writing new coordinates clears them,
+# so refresh_coordinates() recomputes just that row; the generation is bumped
+# so caches reload the row instead of keeping its old position
+DROP_TRIGGER_SQL = 'DROP TRIGGER IF EXISTS exoplanets_position_changed'
+CREATE_TRIGGER_SQL = f'''CREATE TRIGGER exoplanets_position_changed
+    AFTER UPDATE OF Distance, Inclination, Longitude, Latitude ON exoplanets
+    WHEN NEW.x IS OLD.x AND NEW.y IS OLD.y AND NEW.z IS OLD.z AND (
+        NEW.Distance IS NOT OLD.Distance OR
+        NEW.Longitude IS NOT OLD.Longitude OR
+        NEW.Latitude IS NOT OLD.Latitude OR
+        ((NEW.Longitude IS NULL OR NEW.Latitude IS NULL) AND NEW.Inclination IS NOT OLD.Inclination)
+    )
+BEGIN
+    UPDATE exoplanets SET x = NULL, y = NULL, z = NULL WHERE id = NEW.id;
+    {BUMP_GENERATION_SQL};
+END'''
+# Indexes backing the DataTable's server-side sorting and filtering
+CREATE_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_exoplanets_esi ON exoplanets (ESI)',
+    'CREATE INDEX IF NOT EXISTS idx_exoplanets_distance ON exoplanets (Distance)',
+    'CREATE INDEX IF NOT EXISTS idx_exoplanets_mass ON exoplanets (Mass)',
+    'CREATE INDEX IF NOT EXISTS idx_exoplanets_explore ON exoplanets (Explore)',
+    # Unnamed planets from the form are NULL, which SQLite never treats as duplicates
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_exoplanets_name ON exoplanets (Name)',
+)
+SELECT_ALL_SQL = 'SELECT * FROM exoplanets'
+SELECT_SINCE_SQL = 'SELECT * FROM exoplanets WHERE id > ? ORDER BY id'
+INSERT_SQL = f'''
+    INSERT INTO exoplanets ({', '.join(INSERT_COLUMNS)})
+    VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})
+'''
+# Insert, or update the planet with the same Name; rows whose values are unchanged are left alone
+_UPSERT_UPDATED = [col for col in INSERT_COLUMNS if col != 'Name']
+UPSERT_SQL = INSERT_SQL + f'''    ON CONFLICT(Name) DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in _UPSERT_UPDATED)}
+    WHERE {' OR '.join(f'{col} IS NOT excluded.{col}' for col in _UPSERT_UPDATED)}
+'''
+# Catalog columns of every named planet, for diffing an import against the table.
+# NOT INDEXED: a plain table scan beats one index lookup per row when nearly every row has a name
+SELECT_NAMED_SQL = f"SELECT {', '.join(INPUT_COLUMNS)} FROM exoplanets NOT INDEXED WHERE Name IS NOT NULL"
+SELECT_STALE_SQL = 'SELECT id, Distance, Inclination, Longitude, Latitude FROM exoplanets WHERE x IS NULL'
+UPDATE_CARTESIAN_SQL = 'UPDATE exoplanets SET x = ?, y = ?, z = ? WHERE id = ?'
+
+# Pragmas applied to every new connection
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',     # readers no longer block on a writer (and vice versa)
+    'PRAGMA synchronous=NORMAL',   # safe with WAL, avoids an fsync per commit
+    'PRAGMA cache_size=-16000',    # ~16 MB page cache per connection
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',  # let reads go through the OS page cache
+    'PRAGMA busy_timeout=5000',
+)
+
+
+class ExoplanetStore:
+    """
+    All database access for the exoplanet table.
+    Each thread keeps one long-lived connection, so Dash callbacks don't pay
+    connection setup, and the database runs in WAL mode so reads and inserts
+    from different workers can proceed concurrently.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error."""
+        conn = self.connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def create_table(self):
+        with self.transaction() as conn:
+            conn.execute(CREATE_TABLE_SQL)
+            conn.execute(CREATE_META_SQL)
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(exoplanets)')}
+            for name, sql_type in ADDED_COLUMNS:
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE exoplanets ADD COLUMN {name} {sql_type}')
+            for sql in CREATE_INDEX_SQL:
+                conn.execute(sql)
+            conn.execute(DROP_TRIGGER_SQL)
+            conn.execute(CREATE_TRIGGER_SQL)
+        # Backfill rows written before the coordinate columns existed
+        self.refresh_coordinates()
+
+    def refresh_coordinates(self):
+        """
+        Recompute x/y/z only for rows whose position inputs changed (x is NULL).
+        Rows that still have no position (e.g. no distance) are left NULL.
+        Bumps the generation when any row moved. Returns the rows updated.
+        """
+        with self.transaction() as conn:
+            stale = conn.execute(SELECT_STALE_SQL).fetchall()
+            if not stale:
+                return 0
+            ids, distance, inclination, longitude, latitude = zip(*stale)
+            x, y, z = cartesian_columns(distance, inclination, longitude, latitude)
+            updates = [row for row in zip(x.tolist(), y.tolist(), z.tolist(), ids) if not math.isnan(row[0])]
+            if updates:
+                conn.executemany(UPDATE_CARTESIAN_SQL, updates)
+                conn.execute(BUMP_GENERATION_SQL)
+        return len(updates)
+
+    @staticmethod
+    def _read_sql(sql, conn, **kwargs):
+        # pandas is only imported by the DataFrame readers; the app's own paths use plain tuples
+        import pandas as pd
+        return pd.read_sql(sql, conn, **kwargs)
+
+    def fetch_all(self):
+        return self._read_sql(SELECT_ALL_SQL, self.connection())
+
+    @timed('store.fetch_rows_since')
+    def fetch_rows_since(self, last_id):
+        """
+        (column names, row tuples) of the rows inserted after last_id
+        (the table is append-only, so ids only grow).
+        """
+        cursor = self.connection().execute(SELECT_SINCE_SQL, (last_id,))
+        return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def fetch_named(self, conn=None):
+        """INPUT_COLUMNS of every named planet, as a DataFrame indexed by Name."""
+        return self._read_sql(SELECT_NAMED_SQL, conn or self.connection(), index_col='Name')
+
+    @timed('store.fetch_page')
+    def fetch_page(self, where='', params=(), order_by='ORDER BY id', limit=10, offset=0, columns=EXOPLANET_COLUMNS):
+        """
+        One page of rows as a list of dicts with only the given columns, ready for a DataTable.
+        where/order_by must come from table_query.py, which only emits whitelisted columns;
+        columns are table column names from this module, never user input.
+        """
+        sql = f"SELECT {', '.join(columns)} FROM exoplanets {where} {order_by} LIMIT ? OFFSET ?"
+        rows = self.connection().execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    @timed('store.count')
+    def count(self, where='', params=()):
+        return self.connection().execute(f'SELECT COUNT(*) FROM exoplanets {where}', tuple(params)).fetchone()[0]
+
+    @timed('store.generation')
+    def generation(self):
+        """Counter that changes whenever existing rows are modified (not on plain inserts)."""
+        row = self.connection().execute(SELECT_GENERATION_SQL).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _insert_values(rows):
+        """Parameter tuples for INSERT_SQL from a list of dicts or a DataFrame."""
+        n = len(rows)
+        if isinstance(rows, (list, tuple)):
+            columns = {col: [row.get(col) for row in rows] for col in INPUT_COLUMNS}
+        else:
+            columns = {col: rows[col].tolist() if col in rows else [None] * n for col in INPUT_COLUMNS}
+
+        # Coordinates for the whole batch in one vectorized pass
+        with timer('store.coordinates'):
+            x, y, z = cartesian_columns(columns['Distance'], columns['Inclination'],
+                                        columns['Longitude'], columns['Latitude'])
+        columns.update(x=x.tolist(), y=y.tolist(), z=z.tolist())
+        return list(zip(*(columns[col] for col in INSERT_COLUMNS)))
+
+    def insert(self, exoplanet_data):
+        self.insert_many([exoplanet_data])
+
+    @timed('store.insert_many')
+    def insert_many(self, rows):
+        values = self._insert_values(rows)
+        with self.transaction() as conn:
+            conn.executemany(INSERT_SQL, values)
+
+    def upsert_many(self, rows, conn=None):
+        """
+        Insert planets, or update the existing row with the same Name.
+        Pass conn to join a transaction the caller already holds.
+        Returns (inserted, updated).
+        """
+        values = self._insert_values(rows)
+        if conn is None:
+            with self.transaction() as conn:
+                return self.upsert_many(rows, conn)
+
+        rows_before = conn.execute('SELECT COUNT(*) FROM exoplanets').fetchone()[0]
+        changes_before = conn.total_changes
+        with timer('store.upsert_many'):
+            conn.executemany(UPSERT_SQL, values)
+        inserted = conn.execute('SELECT COUNT(*) FROM exoplanets').fetchone()[0] - rows_before
+        updated = conn.total_changes - changes_before - inserted
+        if updated:
+            conn.execute(BUMP_GENERATION_SQL)
+        return inserted, updated
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Shared store instance used by the app
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ExoplanetStore()
+    return _store
@@ -0,0 +1,169 @@
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from metrics import timer, count
+from model_server import get_model
+from prediction_cache import get_prediction_cache
+from shared_cache import get_shared_cache
+from store import get_store
+
+# How long the worker keeps collecting after the first submission of a batch
+BATCH_WAIT = float(os.environ.get('SUBMISSION_BATCH_WAIT', 0.005))  # seconds
+MAX_BATCH = int(os.environ.get('SUBMISSION_MAX_BATCH', 256))
+# Finished tickets kept around for status polls
+MAX_TICKETS = 10000
+# How long a ticket from another worker counts as queued before it shows up in the shared cache
+PENDING_GRACE = 60  # seconds
+
+logger = logging.getLogger(__name__)
+
+
+def ticket_time(ticket):
+    """Submit time encoded in a ticket, or None if it isn't one of ours."""
+    try:
+        return int(ticket.split('-', 1)[0], 16) / 1000
+    except (AttributeError, ValueError):
+        return None
+
+
+class SubmissionQueue:
+    """
+    Background worker for new exoplanet submissions.
+    submit() returns a ticket immediately; the worker gathers whatever arrives
+    within BATCH_WAIT of the first submission (up to MAX_BATCH), scores the
+    batch with one model call and writes it with one executemany commit.
+    status(ticket) reports 'queued', 'done' (with the Explore flag) or 'error'.
+    Finished tickets are also written to the shared cache (one commit per
+    batch), so with several server workers a poll can be answered by any of them.
+    """
+
+    def __init__(self, store=None, model=None, batch_wait=BATCH_WAIT, max_batch=MAX_BATCH, shared=None):
+        self.store = store
+        self.model = model
+        self.shared = shared
+        self.batch_wait = batch_wait
+        self.max_batch = max_batch
+        self.batches = 0
+        self.processed = 0
+        self._queue = queue.Queue()
+        self._tickets = OrderedDict()  # ticket -> status dict
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, exoplanet_data):
+        submitted = time.time()
+        # The submit time is part of the ticket, so other workers can tell a fresh ticket from a bogus one
+        ticket = f'{int(submitted * 1000):x}-{uuid.uuid4().hex}'
+        with self._lock:
+            self._tickets[ticket] = {'state': 'queued', 'submitted': submitted}
+            while len(self._tickets) > MAX_TICKETS:
+                self._tickets.popitem(last=False)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='submission-queue', daemon=True)
+                self._worker.start()
+        self._queue.put((ticket, dict(exoplanet_data)))
+        return ticket
+
+    def status(self, ticket):
+        with self._lock:
+            status = self._tickets.get(ticket)
+            if status is not None:
+                return dict(status)
+        # Submitted through another worker process: finished, or still in that worker's queue
+        status = (self.shared or get_shared_cache('tickets')).get(ticket)
+        if status is not None:
+            return status
+        submitted = ticket_time(ticket)
+        if submitted is not None and time.time() - submitted < PENDING_GRACE:
+            return {'state': 'queued', 'submitted': submitted}
+        return {'state': 'unknown'}
+
+    def wait(self, ticket, timeout=None):
+        """Block until ticket is finished (used by scripts and benchmarks)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(ticket)
+            if status['state'] != 'queued':
+                return status
+            if deadline is not None and time.monotonic() > deadline:
+                return status
+            time.sleep(0.001)
+
+    def _collect(self):
+        """Block for the first submission, then gather more for up to batch_wait."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except Exception:
+                # Never let one batch stop the worker; later tickets still need answering
+                logger.exception('Submission batch of %d failed', len(batch))
+
+    def _process(self, batch):
+        tickets = [ticket for ticket, _ in batch]
+        rows = [row for _, row in batch]
+        count('submission_batches')
+        count('submissions', len(batch))
+        try:
+            with timer('submission.model'):
+                model = self.model or get_model()
+                explore = get_prediction_cache().predict_many(model, rows)
+            for row, flag in zip(rows, explore):
+                row['Explore'] = int(flag)
+            with timer('submission.insert'):
+                (self.store or get_store()).insert_many(rows)
+            updates = {ticket: {'state': 'done', 'Explore': row['Explore']} for ticket, row in zip(tickets, rows)}
+        except Exception as exc:
+            count('submission_errors', len(batch))
+            updates = {ticket: {'state': 'error', 'error': str(exc)} for ticket in tickets}
+
+        done = time.time()
+        with self._lock:
+            finished = {ticket: dict(self._tickets.get(ticket, {}), **update, finished=done)
+                        for ticket, update in updates.items()}
+        # Shared first, so other workers never lag behind what wait() reports here.
+        # A failed write (e.g. still locked after the busy timeout) is only logged, so
+        # polls landing on this worker still see the result
+        try:
+            (self.shared or get_shared_cache('tickets')).put_many(finished.items())
+        except Exception:
+            count('submission_share_errors', len(finished))
+            logger.exception('Could not publish %d ticket statuses to the shared cache', len(finished))
+        with self._lock:
+            for ticket, status in finished.items():
+                if ticket in self._tickets:
+                    self._tickets[ticket].update(status)
+            self.batches += 1
+            self.processed += len(batch)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+# Shared submission queue used by the submission callback
+def get_submission_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = SubmissionQueue()
+    return _queue
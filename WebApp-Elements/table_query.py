@@ -0,0 +1,73 @@
+from store import EXOPLANET_COLUMNS
+
+# Dash DataTable filter operators -> SQL operators
+# (same parsing approach as the Dash docs' custom filtering example)
+FILTER_OPERATORS = [
+    ['ge ', '>='],
+    ['le ', '<='],
+    ['lt ', '<'],
+    ['gt ', '>'],
+    ['ne ', '!='],
+    ['eq ', '='],
+    ['contains '],
+]
+SQL_OPERATORS = {'ge': '>=', 'le': '<=', 'lt': '<', 'gt': '>', 'ne': '!=', 'eq': '='}
+
+# Only these columns may appear in generated SQL
+QUERYABLE_COLUMNS = set(EXOPLANET_COLUMNS)
+
+
+# Split one "{col} op value" clause of a DataTable filter_query
+def split_filter_part(filter_part):
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+
+                value_part = value_part.strip()
+                v0 = value_part[0] if value_part else ''
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', '`'):
+                    value = value_part[1: -1].replace('\\' + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                return name, operator_type[0].strip(), value
+
+    return [None] * 3
+
+
+def build_where(filter_query):
+    """
+    Turn a DataTable filter_query into a parameterized WHERE clause.
+    Returns (sql, params); sql is '' when nothing can be filtered on.
+    """
+    clauses = []
+    params = []
+    for filter_part in (filter_query or '').split(' && '):
+        name, operator, value = split_filter_part(filter_part)
+        if name not in QUERYABLE_COLUMNS:
+            continue
+        if operator == 'contains':
+            clauses.append(f'CAST("{name}" AS TEXT) LIKE ?')
+            params.append(f'%{value}%')
+        else:
+            clauses.append(f'"{name}" {SQL_OPERATORS[operator]} ?')
+            params.append(value)
+    if not clauses:
+        return '', []
+    return 'WHERE ' + ' AND '.join(clauses), params
+
+
+def build_order_by(sort_by):
+    """Turn a DataTable sort_by list into an ORDER BY clause (id breaks ties so pages are stable)."""
+    terms = []
+    for sort in sort_by or []:
+        if sort['column_id'] in QUERYABLE_COLUMNS:
+            direction = 'ASC' if sort['direction'] == 'asc' else 'DESC'
+            terms.append(f'"{sort["column_id"]}" {direction}')
+    terms.append('id ASC')
+    return 'ORDER BY ' + ', '.join(terms)
@@ -0,0 +1,140 @@
+"""
+Offline tests for archive_sync.py against the local fixture server
+(archive_fixture.py): conditional requests, atomic downloads and
+only-changed updates.
+
+    python -m pytest test_archive_sync.py
+"""
+import os
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+from archive_fixture import start_fixture_server
+from archive_sync import HttpCache, archive_url, sync_archive
+from store import ExoplanetStore
+
+PLANETS = 20
+
+
+def archive_frame(n=PLANETS):
+    return pd.DataFrame({
+        'pl_name': [f'Fixture {i} b' for i in range(n)],
+        'sy_dist': [10.0 + i for i in range(n)],
+        'pl_bmassj': [0.01 * (i + 1) for i in range(n)],
+        'pl_radj': [0.1 + 0.01 * i for i in range(n)],
+        'pl_orbincl': [89.0] * n,
+        'sy_vmag': [12.0 + 0.1 * i for i in range(n)],
+        'pl_orbeccen': [0.02] * n,
+        'pl_orbper': [10.0 * (i + 1) for i in range(n)],
+        'discoverymethod': ['Transit'] * n,
+        'glon': [3.0 * i for i in range(n)],
+        'glat': [1.0 * i - 10 for i in range(n)],
+        'pl_insol': [1.0 + 0.1 * i for i in range(n)],
+    })
+
+
+def write_archive(path, df, mtime=None):
+    df.to_csv(path, index=False)
+    mtime = mtime or time.time()
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    csv_path = str(tmp_path / 'pscomppars.csv')
+    write_archive(csv_path, archive_frame())
+    server, base_url = start_fixture_server(csv_path)
+    store = ExoplanetStore(str(tmp_path / 'archive.db'))
+    cache = HttpCache(str(tmp_path / 'http_cache'))
+    yield csv_path, base_url, server, store, cache
+    server.shutdown()
+    store.close()
+
+
+def test_unchanged_archive_is_not_downloaded_again(archive):
+    csv_path, base_url, server, store, cache = archive
+    first = sync_archive(base_url, store=store, cache=cache)
+    assert first['modified'] and first['inserted'] == PLANETS
+
+    second = sync_archive(base_url, store=store, cache=cache)
+    assert second == {'modified': False, 'bytes': 0}
+    assert server.hits == {200: 1, 304: 1}
+    assert len(store.fetch_named()) == PLANETS
+
+
+def test_download_replaces_the_cached_body_only_when_complete(archive, monkeypatch):
+    csv_path, base_url, server, store, cache = archive
+    url = archive_url(base_url)
+    body_path, changed = cache.fetch(url)
+    assert changed
+    assert not os.path.exists(body_path + '.part')
+    with open(body_path, 'rb') as f, open(csv_path, 'rb') as g:
+        good = f.read()
+        assert good == g.read()
+    meta = cache.metadata(url)
+
+    # The next download dies after its first block
+    def broken_iter_content(self, chunk_size=1, decode_unicode=False):
+        yield self.raw.read(16)
+        raise ConnectionError('connection reset')
+
+    monkeypatch.setattr('requests.models.Response.iter_content', broken_iter_content)
+    with pytest.raises(ConnectionError):
+        cache.fetch(url, force=True)
+    with open(body_path, 'rb') as f:
+        assert f.read() == good
+    assert cache.metadata(url) == meta
+
+
+def test_only_changed_rows_are_written(archive, monkeypatch):
+    csv_path, base_url, server, store, cache = archive
+    sync_archive(base_url, store=store, cache=cache)
+    generation = store.generation()
+
+    written = []
+    upsert_many = store.upsert_many
+
+    def recording_upsert_many(rows, conn=None):
+        written.extend(rows['Name'])
+        return upsert_many(rows, conn)
+
+    monkeypatch.setattr(store, 'upsert_many', recording_upsert_many)
+
+    df = archive_frame()
+    df.loc[3, 'sy_vmag'] += 1.5
+    write_archive(csv_path, df, mtime=time.time() + 2)  # Last-Modified has 1 s resolution
+    totals = sync_archive(base_url, store=store, cache=cache)
+
+    assert totals['modified']
+    assert (totals['inserted'], totals['updated'], totals['unchanged']) == (0, 1, PLANETS - 1)
+    assert written == ['Fixture 3 b']
+    assert store.fetch_named().loc['Fixture 3 b', 'Magnitude'] == pytest.approx(12.3 + 1.5)
+    assert store.generation() != generation
+
+
+def test_failed_apply_is_retried_from_the_cached_body(archive, monkeypatch):
+    csv_path, base_url, server, store, cache = archive
+    sync_archive(base_url, store=store, cache=cache)
+
+    df = archive_frame()
+    df.loc[3, 'sy_vmag'] += 1.5
+    write_archive(csv_path, df, mtime=time.time() + 2)
+
+    def locked_upsert_many(rows, conn=None):
+        raise sqlite3.OperationalError('database is locked')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(store, 'upsert_many', locked_upsert_many)
+        with pytest.raises(sqlite3.OperationalError):
+            sync_archive(base_url, store=store, cache=cache)
+    assert store.fetch_named().loc['Fixture 3 b', 'Magnitude'] == pytest.approx(12.3)
+
+    # The archive now answers 304, but the downloaded change was never applied
+    totals = sync_archive(base_url, store=store, cache=cache)
+    assert server.hits == {200: 2, 304: 1}
+    assert totals['modified'] and totals['bytes'] == 0 and totals['updated'] == 1
+    assert store.fetch_named().loc['Fixture 3 b', 'Magnitude'] == pytest.approx(12.3 + 1.5)
+    assert sync_archive(base_url, store=store, cache=cache) == {'modified': False, 'bytes': 0}
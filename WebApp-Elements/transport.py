@@ -0,0 +1,31 @@
+import base64
+import os
+
+import numpy as np
+
+# How the globe's columns are sent to the browser:
+#   'binary' float32 Plotly typed arrays, ~3x smaller and far faster to serialize;
+#            new rows trigger a full (compact) figure (default)
+#   'json'   plain number lists; interval ticks can Patch-extend them
+GLOBE_TRANSPORT = os.environ.get('GLOBE_TRANSPORT', 'binary')
+BINARY_TRANSPORT = GLOBE_TRANSPORT == 'binary'
+
+# Plotly's short dtype names for typed arrays
+PLOTLY_DTYPES = {np.dtype('float32'): 'f4', np.dtype('float64'): 'f8', np.dtype('uint32'): 'u4', np.dtype('int32'): 'i4'}
+
+
+def typed_array(values, dtype=np.float32):
+    """Plotly typed-array spec ({'dtype', 'bdata'}); 2D arrays keep their shape (e.g. customdata)."""
+    values = np.ascontiguousarray(values, dtype=dtype)
+    spec = {'dtype': PLOTLY_DTYPES[values.dtype], 'bdata': base64.b64encode(values.tobytes()).decode()}
+    if values.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in values.shape)
+    return spec
+
+
+def figure_column(values, binary=None):
+    """One figure column in the configured transport: a typed array or a plain list (NaN -> null)."""
+    binary = BINARY_TRANSPORT if binary is None else binary
+    if binary:
+        return typed_array(values)
+    return np.asarray(values, dtype=np.float64).tolist()
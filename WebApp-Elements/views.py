@@ -0,0 +1,12 @@
+# Camera presets for the globe, applied in the browser by assets/globe.js.
+# The Earth view puts the camera at the origin (where Earth sits), as app_backup.py did.
+CAMERA_PRESETS = {
+    'god': {'eye': {'x': 1.25, 'y': 1.25, 'z': 1.25}, 'center': {'x': 0, 'y': 0, 'z': 0}},
+    'earth': {'eye': {'x': 0.00001581, 'y': 0.00001581, 'z': 0.00001581}, 'center': {'x': 0, 'y': 0, 'z': 0}},
+    'top': {'eye': {'x': 0, 'y': 0, 'z': 2.5}, 'center': {'x': 0, 'y': 0, 'z': 0}},
+    'edge': {'eye': {'x': 2.5, 'y': 0, 'z': 0}, 'center': {'x': 0, 'y': 0, 'z': 0}},
+}
+PRESET_LABELS = {'god': 'God view', 'earth': 'Earth view', 'top': 'Top down', 'edge': 'Edge on'}
+DEFAULT_VIEW = 'god'
+# The Toggle View button flips between these two
+TOGGLE_VIEWS = ['god', 'earth']